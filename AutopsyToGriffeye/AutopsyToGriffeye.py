@@ -38,18 +38,131 @@ from org.sleuthkit.autopsy.coreutils import PlatformUtil
 from org.sleuthkit.autopsy.casemodule import Case
 from org.sleuthkit.autopsy.casemodule.services import Services
 from org.sleuthkit.autopsy.casemodule.services import FileManager
+from org.sleuthkit.autopsy.casemodule.services import Blackboard
 from org.sleuthkit.autopsy.datamodel import ContentUtils
 
 import os
+import sys
+import time
+import threading
+from xml.sax.saxutils import escape as escapeXml
 from java.io import File
+from java.util import ArrayList
 from java.util.logging import Level
-import inspect
+
+# Shared code in ExportCommon (placed next to this folder in python_modules)
+pythonModulesDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(pythonModulesDirectory not in sys.path):
+    sys.path.append(pythonModulesDirectory)
+from ExportCommon.griffeyeXmlWriter import GriffeyeXmlWriter
+from ExportCommon.griffeyeXmlWriter import imageTemplate
+from ExportCommon.griffeyeXmlWriter import movieTemplate
+from ExportCommon.exportSession import ExportSession
+from ExportCommon.exportSession import ExportSessionRegistry
+from ExportCommon.exportPaths import ExportPathMapper
+from ExportCommon.exportPaths import parentPathCache
+from ExportCommon.exportWorkers import ExportWorkerPool
+from ExportCommon.exportDedup import ExportDedupIndex
+from ExportCommon.exportDedup import duplicateAlias
+from ExportCommon.exportDedup import duplicateLinked
+from ExportCommon.exportDedup import duplicateWrite
+from ExportCommon.exportManifest import ExportManifest
+from ExportCommon.exportCopy import formatDigests
+from ExportCommon.exportZeroCopy import ZeroCopy
+from ExportCommon.exportSpace import ExportSpace
+from ExportCommon.exportSpace import NoSpaceLeft
+from ExportCommon.exportWrite import ExportWriter
+from ExportCommon.exportWrite import spaceEvent
+from ExportCommon.exportCopy import readBytes
+from ExportCommon.mediaProbe import probeMedia
+from ExportCommon.mediaProbe import headBytes as probeHeadBytes
+from ExportCommon.artifactBatcher import ArtifactBatcher
+from ExportCommon.exportRules import ExportRules
+from ExportCommon.exportLog import ExportLogger
+from ExportCommon.exportKnown import KnownFilter
+from ExportCommon.exportRecord import FileRecord
+from ExportCommon.exportRules import imageMimeTypes
+from ExportCommon.exportRules import movieMimeTypes
+from ExportCommon.exportRules import sqlWhere
 
 # Copy Multimedia Factory ---------------------------------------------------------------------------------------------------
 class AutopsyToGriffeyeFactory(IngestModuleFactoryAdapter):
 
     moduleName = "AutopsyToGriffeye"
 
+    # Export sessions shared by all ingest threads of a job
+    sessions = ExportSessionRegistry()
+
+    # Threads writing exported files (0 = write in the ingest thread) and
+    # number of files that can wait for a writer before process() blocks
+    exportThreads = 4
+    exportQueueSize = 256
+
+    # Files with the same MD5 as a file already exported: "link" = hardlink
+    # to the first copy, "once" = write only the first copy (the others are
+    # listed with it as their exported file), "off" = write all
+    dedupMode = "link"
+
+    # Continue an earlier export: skip files listed in the manifest and append
+    # to the XML files (False = start the export from scratch)
+    resumeExport = True
+
+    # Blackboard artifacts are indexed and announced to the UI in batches of
+    # artifactBatchSize, or every artifactBatchSeconds
+    artifactBatchSize = 100
+    artifactBatchSeconds = 5.0
+
+    # Hashes computed while copying, see exportWrite.py ([] = none)
+    inlineHashes = ["md5"]
+
+    # Skip files Hash Lookup has marked as known (NSRL) and files with an MD5
+    # in one of knownHashSetFiles (text files with one MD5 per line, or NSRL
+    # CSV), before any folder is made or anything is copied
+    skipKnownFiles = True
+    knownHashSetFiles = []
+
+    # Export each data source (disk image, E01, logical file set, phone
+    # extraction) into its own folder named after the data source (False =
+    # all data sources into one tree). The Griffeye <path> and <fullpath>
+    # stay relative to the data source either way.
+    dataSourceFolders = True
+
+    # Copy files of streamCopyBytes or more in chunks, runs of zeros as holes
+    streamCopyBytes = 64 * 1024 * 1024
+    copyChunkBytes = 8 * 1024 * 1024
+    sparseCopy = True
+
+    # Copy files of zeroCopyBytes or more straight from local raw images
+    zeroCopy = True
+    zeroCopyBytes = 1024 * 1024
+
+    # Read width, height and bit depth from the header of each picture and
+    # movie while it is copied, for <bitDepth> and <aspectRatio> in the XML
+    # and the size in <notes> (False = leave them empty)
+    probeMediaHeaders = True
+
+    # Start a new XML file (shard) after xmlMaxRecords records or xmlMaxBytes
+    # bytes: <number><number>_images_0001.xml, .. each a complete ReportIndex,
+    # listed in <number><number>_images_shards.txt (0 and 0 = one images and
+    # one movies XML file)
+    xmlMaxRecords = 0
+    xmlMaxBytes = 0
+
+    # Keep the XML files a complete ReportIndex while the ingest runs, so
+    # Griffeye can import them before the job is done: new records are written
+    # every xmlSnapshotSeconds or xmlSnapshotRecords records, with the closing
+    # tag after them. The manifest and <number>_status.json (records in each
+    # XML file, manifest entries, counters of the job) are written at the same
+    # moment, and when the job is done (0 and 0 = close the XML files at the
+    # end of the job)
+    xmlSnapshotSeconds = 60.0
+    xmlSnapshotRecords = 0
+
+    # Free space to keep on the export disk, and seconds to wait for it
+    # before the export stops (0 = write until the disk is full)
+    minFreeBytes = 1024 * 1024 * 1024
+    spacePauseSeconds = 300
+
     def getModuleDisplayName(self):
         return self.moduleName
 
@@ -67,28 +180,31 @@ class AutopsyToGriffeyeFactory(IngestModuleFactoryAdapter):
     def createFileIngestModule(self, ingestOptions):
         return AutopsyToGriffeye()
 
-# Copy Multimedia ----------------------------------------------------------------------------------------------------------
-class AutopsyToGriffeye(FileIngestModule):
+# Copy Multimedia Session --------------------------------------------------------------------------------------------------
+class AutopsyToGriffeyeSession(ExportSession):
 
-    _logger = Logger.getLogger(AutopsyToGriffeyeFactory.moduleName)
+    _logger = ExportLogger(Logger.getLogger(AutopsyToGriffeyeFactory.moduleName), Level.WARNING)
 
-    def log(self, level, msg):
-        self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
 
-    # Startup
-    def startUp(self, context):
-        # List of images and Movies
-        self.listOfImagesMimeToCopy = ['image/bmp','image/gif', 'image/heic', 'image/jpeg', 'image/png', 'image/tiff',
-                                'image/vnd.adobe.photoshop', 'image/x-raw-nikon', 'image/x-ms-bmp', 'image/x-icon', 'image/webp',
-                                'image/vnd.microsoft.icon', 'image/x-rgb', 'image/x-ms-bmp','image/x-xbitmap','image/x-portable-graymap',
-                                'image/x-portable-bitmap']
+    # Directory the export folder is made in (the report module uses the
+    # report directory)
+    def getBaseDirectory(self):
+        return Case.getCurrentCase().getExportDirectory()
 
-        self.listOfMoviesMimeToCopy = ['video/webm', 'video/3gpp', 'video/3gpp2', 'video/ogg','video/mpeg', 
-                                'video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/x-flv', 'video/x-m4v', 
-                                'video/x-ms-wmv']
+    # Continue an earlier export (the report module always starts over)
+    def isResume(self):
+        return AutopsyToGriffeyeFactory.resumeExport
 
+    # SQL condition for the files of the export, for the disk space estimate
+    def getExportWhere(self):
+        return sqlWhere(imageMimeTypes | movieMimeTypes)
+
+    # Open (first ingest thread of the job)
+    def open(self):
         # Export directory
-        exportDirectory = Case.getCurrentCase().getExportDirectory()
+        exportDirectory = self.getBaseDirectory()
         caseName = Case.getCurrentCase().getName()
         number = Case.getCurrentCase().getNumber()
 
@@ -99,49 +215,205 @@ class AutopsyToGriffeye(FileIngestModule):
         except:
                 pass
 
-	# Files directory
+        # Files directory
         filesDirectory = os.path.join(exportDirectory + "\\Files")
         self.log(Level.INFO, "==> filesDirectory=" + str(filesDirectory))
         try: 
                 os.mkdir(filesDirectory)
         except:
                 pass
-	
 
-	# Image XML file
+        # Free space on the disk of the export
+        self.space = ExportSpace(exportDirectory, AutopsyToGriffeyeFactory.minFreeBytes, AutopsyToGriffeyeFactory.spacePauseSeconds,
+                                  spaceEvent(AutopsyToGriffeyeFactory.moduleName, self.log))
+
+        # Image XML file
         xmlFileImages = os.path.join(exportDirectory, str(number) + str(number) + "_images.xml")
         xmlFileMovies = os.path.join(exportDirectory, str(number) + str(number) + "_movies.xml");
 
-        f = open(xmlFileImages, "w")
-        f.write('<?xml version="1.0" encoding="utf-16"?>\n')
-        f.close()
+        # Manifest of exported files. A file is added when its XML record is
+        # on disk, and the manifest is written right after the XML records.
+        self.manifest = ExportManifest(os.path.join(exportDirectory, str(number) + "_manifest.txt"))
+        self.manifest.open(self.isResume())
+
+        # Open XML writers (kept open until the last ingest thread shuts down)
+        self.xmlWriterImages = GriffeyeXmlWriter(xmlFileImages, imageTemplate, None, None, AutopsyToGriffeyeFactory.xmlMaxRecords, AutopsyToGriffeyeFactory.xmlMaxBytes,
+                                                 AutopsyToGriffeyeFactory.xmlSnapshotSeconds, AutopsyToGriffeyeFactory.xmlSnapshotRecords, self.manifest.flush)
+        self.xmlWriterImages.open(self.isResume())
+        self.xmlWriterMovies = GriffeyeXmlWriter(xmlFileMovies, movieTemplate, None, None, AutopsyToGriffeyeFactory.xmlMaxRecords, AutopsyToGriffeyeFactory.xmlMaxBytes,
+                                                 AutopsyToGriffeyeFactory.xmlSnapshotSeconds, AutopsyToGriffeyeFactory.xmlSnapshotRecords, self.manifest.flush)
+        self.xmlWriterMovies.open(self.isResume())
+
+        # Status file for the review pipeline
+        self.statusFile = os.path.join(exportDirectory, str(number) + "_status.json")
+        self.lastStatus = 0
+        self.statusRecords = 0
+        self.snapshotLock = threading.Lock()
+        self.writeStatus("running")
+
+        # Will the files in the case database fit (less what is exported already)
+        try:
+            self.space.checkStart(Case.getCurrentCase().getSleuthkitCase(), self.getExportWhere(), self.context.getDataSource(),
+                                  sum(entry.size for entry in self.manifest.entries.values()))
+        except:
+            self.log(Level.WARNING, "Could not estimate the size of the export: %s", sys.exc_info()[1])
+
+        # Export paths below Files, one folder per data source
+        self.pathMapper = ExportPathMapper(filesDirectory, AutopsyToGriffeyeFactory.dataSourceFolders)
+
+        # Parent folder cache shared by the export modules (object ids are per case)
+        parentPathCache.useCase(Case.getCurrentCase().getCaseDirectory())
+        self.parentCacheStats = parentPathCache.getStats()
+
+        # Known-good files are skipped (hash sets are read once per job)
+        self.knownFilter = KnownFilter(TskData.FileKnown.KNOWN if AutopsyToGriffeyeFactory.skipKnownFiles else None, AutopsyToGriffeyeFactory.knownHashSetFiles)
+        for hashSetFile, error in self.knownFilter.load():
+            self.log(Level.WARNING, "Could not read known hash set %s: %s", hashSetFile, error)
+        if(self.knownFilter.hashSet.count):
+            self.log(Level.INFO, "==> %d hashes in known hash sets", self.knownFilter.hashSet.count)
+
+        # Export writer threads
+        self.exportPool = ExportWorkerPool(AutopsyToGriffeyeFactory.moduleName, AutopsyToGriffeyeFactory.exportThreads, AutopsyToGriffeyeFactory.exportQueueSize)
+        self.exportPool.start()
+
+        # Copies straight from raw images (image files looked up once per job)
+        self.zeroCopy = None
+        if(AutopsyToGriffeyeFactory.zeroCopy):
+            self.zeroCopy = ZeroCopy(AutopsyToGriffeyeFactory.zeroCopyBytes)
+
+        # MD5 -> first exported copy, for the whole job
+        self.dedupIndex = ExportDedupIndex(AutopsyToGriffeyeFactory.dedupMode)
+        for entry in self.manifest.entries.values():
+            self.dedupIndex.addWritten(entry.md5, entry.extractedFile)
+
+        # Pass parameter
+        self.exportDirectoryGlobal = exportDirectory;
+        self.filesDirectoryGlobal = filesDirectory;
+        self.xmlFileImagesGlobal = xmlFileImages;
+        self.xmlFileMoviesGlobal = xmlFileMovies;
+        self.profileFileGlobal = os.path.join(exportDirectory, str(number) + "_profile")
+
+    # Close (last ingest thread of the job)
+    def close(self):
+        # Wait for the export writers
+        self.exportPool.close()
+
+        # Write end of XML files and close them
+        self.xmlWriterImages.close()
+        self.xmlWriterMovies.close()
+        self.manifest.close()
+
+        # Write profile of the job (time per stage, counters, errors)
+        for name, value in parentPathCache.getStatsSince(self.parentCacheStats).items():
+            self.count(name, value)
+        self.count("duplicates", self.dedupIndex.countDuplicates)
+        self.count("bytesSavedByDedup", self.dedupIndex.bytesSaved)
+        self.count("writeFailures", self.exportPool.countFailures)
+        self.count("bytesReserved", self.space.bytesReserved)
+        self.count("spacePauses", self.space.countPauses)
+        if(self.xmlWriterImages.isSharded()):
+            self.count("xmlShards", len(self.xmlWriterImages.shards) + len(self.xmlWriterMovies.shards))
+        try:
+            self.stats.writeProfile(self.profileFileGlobal)
+        except:
+            self.log(Level.WARNING, "Could not write profile %s", self.profileFileGlobal)
+        self.writeStatus(self.getEndState())
+
+        # Log summaries of repeated errors
+        self._logger.flush()
+
+    # State of the status file at the end of the job: the disk got full,
+    # the job was cancelled (the export was cut short) or it is complete
+    def getEndState(self):
+        if(self.space.stopped):
+            return "stopped"
+        if(self.context.fileIngestIsCancelled()):
+            return "cancelled"
+        return "complete"
+
+    # Snapshot of the export (called for every exported file): the buffered
+    # XML records, then the manifest, then the status file, so the three
+    # describe the same files. Taken every xmlSnapshotSeconds, and right away
+    # when an XML file was written in between (xmlSnapshotRecords or a full
+    # buffer). One thread takes it, the others go on.
+    def snapshot(self):
+        if(not self.xmlWriterImages.keepClosed):
+            return
+        if(time.time() - self.lastStatus < AutopsyToGriffeyeFactory.xmlSnapshotSeconds and
+           self.xmlWriterImages.countWritten + self.xmlWriterMovies.countWritten == self.statusRecords):
+            return
+        if(not self.snapshotLock.acquire(False)):
+            return
+        try:
+            try:
+                self.xmlWriterImages.flush()
+                self.xmlWriterMovies.flush()
+                self.manifest.flush()
+            except:
+                self.stats.countError("xml", sys.exc_info()[1])
+                self.log(Level.SEVERE, "Error could not write XML snapshot")
+            self.writeStatus("running")
+        finally:
+            self.snapshotLock.release()
+
+    # Status file: state, records and bytes in the XML files, manifest
+    # entries, counters
+    def writeStatus(self, state):
+        self.lastStatus = time.time()
+        images = self.xmlWriterImages.getStatus()
+        movies = self.xmlWriterMovies.getStatus()
+        self.statusRecords = images["records"] + movies["records"]
+        try:
+            self.stats.writeStatus(self.statusFile, state, {"images": images, "movies": movies, "manifestEntries": len(self.manifest.entries),
+                                                            "space": self.space.getStatus()})
+        except:
+            self.log(Level.WARNING, "Could not write status %s", self.statusFile)
+
+
+# Copy Multimedia ----------------------------------------------------------------------------------------------------------
+class AutopsyToGriffeye(FileIngestModule):
+
+    # Same logger as the session, so repeated errors are counted for the whole job
+    _logger = AutopsyToGriffeyeSession._logger
+
+    # Session of the job, and whether files get an interesting file artifact
+    # (the report module exports to its own session, without artifacts)
+    sessionClass = AutopsyToGriffeyeSession
+    makeArtifacts = True
 
-        f = open(xmlFileImages, "a")
-        f.write('	<ReportIndex version="2.0" source="Autopsy" dll="Autopsy To Griffeye 1.4">\n')
-        f.close()
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
 
-        f = open(xmlFileMovies, "w")
-        f.write('<?xml version="1.0" encoding="utf-16"?>\n')
-        f.close()
+    # Startup
+    def startUp(self, context):
+        # Images and Movies
+        self.rules = ExportRules()
+        self.addRules(self.rules)
 
-        f = open(xmlFileMovies, "a")
-        f.write('	<ReportIndex version="2.0" source="Autopsy" dll="Autopsy To Griffeye 1.4">\n')
-        f.close()
+        # Export session shared with the other ingest threads of this job
+        self.session = AutopsyToGriffeyeFactory.sessions.acquire(context, self.sessionClass)
 
-	# Pass parameter
-	self.exportDirectoryGlobal = exportDirectory;
-	self.filesDirectoryGlobal = filesDirectory;
-	self.xmlFileImagesGlobal = xmlFileImages;
-	self.xmlFileMoviesGlobal = xmlFileMovies;
-	self.countImages = 0
-	self.countMovies = 0
-	self.countImagesAndMovies = 0
+        # Writes the files (large copies stop when the job is cancelled)
+        self.writer = ExportWriter(self.session, AutopsyToGriffeyeFactory, self.log, context.fileIngestIsCancelled)
 
-	# Write data to log for debug
-	# self.log(Level.INFO, "==> Autopsy To Griffeye start info: exportDirectory=" + str(exportDirectory) + " xmlFileImages=" + str(xmlFileImages) + " xmlFileMovies=" + str(xmlFileMovies))
+        # Artifacts made by this ingest thread
+        self.artifacts = ArtifactBatcher(self.writer.postArtifacts, AutopsyToGriffeyeFactory.artifactBatchSize, AutopsyToGriffeyeFactory.artifactBatchSeconds)
 
         pass
 
+    # Add the files this module wants to the rule table (also used by Export Profiles)
+    def addRules(self, rules):
+        rules.addMimeTypes(imageMimeTypes, self, "Images")
+        rules.addMimeTypes(movieMimeTypes, self, "Movies")
+
+
+    # Skip a known-good file (counted as skippedKnown or skippedHashSet)
+    def skipKnown(self, file):
+        reason = self.session.knownFilter.check(file)
+        if(reason is None):
+            return False
+        self.session.count(reason)
+        return True
 
     # Process
     def process(self, file):
@@ -149,215 +421,180 @@ class AutopsyToGriffeye(FileIngestModule):
         if ((file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNALLOC_BLOCKS) or
             (file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNUSED_BLOCKS) or
             (file.isFile() == False)):
+            self.session.count("skippedNonFile")
             return IngestModule.ProcessResult.OK
 
-        # Blackboard
-        blackboard = Case.getCurrentCase().getServices().getBlackboard()
-
-	# XML Path
-	xmlPath = file.getUniquePath().replace("/", "\\")
-	xmlPath = xmlPath.replace(file.getName(), "")
-	replaceImgNameA = "\\img_" + str(Case.getCurrentCase().getNumber()) + ".001\\"
-	replaceImgNameB = "img_" + str(Case.getCurrentCase().getNumber()) + ".001\\"
-        xmlPath = xmlPath.replace(replaceImgNameA, "");
-        xmlPath = xmlPath.replace(replaceImgNameB, "");
-
-	# XML fullpath
-	xmlFullpath = file.getUniquePath().replace("/", "\\")
-        xmlFullpath = xmlFullpath.replace(replaceImgNameA, "");
-        xmlFullpath = xmlFullpath.replace(replaceImgNameB, "");
-	
-
-	# XML Data
-	xmlId = file.getMd5Hash()
-	xmlCreated = file.getCrtime()
-	xmlAccessed = file.getAtime()
-	xmlWritten = file.getMtime()
-	xmlFileSize = file.getSize()
-	xmlPhysicalLocation = file.getMetaAddr()
-	xmlDeleted = 0
-	xmlMyDescription = "Exisiting"
-	xmlHash = file.getMd5Hash()
-
-        # Start process images -------------------------------------------------------------------------------------
-        if(file.getMIMEType() in self.listOfImagesMimeToCopy):
-		# Count
-		self.countImages = self.countImages+1
-		self.countImagesAndMovies = self.countImagesAndMovies+1
-
-		# XML Data for picture
-		xmlPicture = file.getName()
-
-                # Create directory
-		uniquePathFullLinux = file.getUniquePath();
-                uniquePathFullWindows = uniquePathFullLinux.replace("/", "\\")
-                uniquePathFullWindows = uniquePathFullWindows[1:]
-                fileName = os.path.basename(uniquePathFullWindows)
-                uniquePathWindows = uniquePathFullWindows.replace(replaceImgNameA, "");
-                uniquePathWindows = uniquePathFullWindows.replace(replaceImgNameB, "");
-                splitDir = uniquePathWindows.split("\\")
-                pathToCreate = os.path.join(self.filesDirectoryGlobal, "")
-                for directory in splitDir:
-                        directory = directory.replace(":", "")
-                        pathToCreate = os.path.join(pathToCreate, directory)
-                        # self.log(Level.INFO, "==> directory=" + str(directory) + " pathToCreate=" + str(pathToCreate))
-
-                        try: 
-                                os.mkdir(pathToCreate)
-                        except:
-                                pass
-
-                # Write file (here we can use either file.getName or xmlId
-                try:
-                        extractedFile = os.path.join(pathToCreate, file.getName())
-                        ContentUtils.writeToFile(file, File(extractedFile))
-                except:
-                        self.log(Level.SEVERE, "Error writing File " + file.getName() + " to " + extractedFile)
-
-
-
-		# Write image to XML file
-                try:
-                        f = open(self.xmlFileImagesGlobal, "a")
-                        f.write("		<Image>\n")
-                        f.write("			<path><![CDATA[" + str(xmlPath) + "]]></path>\n")
-                        f.write("			<picture>" + str(xmlPicture) + "</picture>\n")
-                        f.write("			<category>0</category>\n")
-                        f.write("			<id>" + str(xmlId) + "</id>\n")
-                        f.write("			<fileoffset>0</fileoffset>\n")
-                        f.write("			<fullpath><![CDATA[" + str(xmlFullpath) + "]]></fullpath>\n")
-                        f.write("			<created>" + str(xmlCreated) + "</created>\n")
-                        f.write("			<accessed>" + str(xmlAccessed) + "</accessed>\n")
-                        f.write("			<written>" + str(xmlWritten) + "</written>\n")
-                        f.write("			<deleted>" + str(xmlDeleted) + "</deleted>\n")
-                        f.write("			<hash>" + str(xmlHash) + "</hash>\n")
-                        f.write("			<encaseHash>0</encaseHash>\n")
-                        f.write("			<myDescription>" + xmlMyDescription + "</myDescription>\n")
-                        f.write("			<physicalLocation>" + str(xmlPhysicalLocation) + "</physicalLocation>\n")
-                        f.write("			<myUnique>0</myUnique>\n")
-                        f.write("			<tagged>0</tagged>\n")
-                        f.write("			<subCat></subCat>\n")
-                        f.write("			<notes></notes>\n")
-                        f.write("			<fileSize>" + str(xmlFileSize) + "</fileSize>\n")
-                        f.write("			<bitDepth></bitDepth>\n")
-                        f.write("			<aspectRatio></aspectRatio>\n")
-                        f.write("		</Image>\n")
-                        f.close()
-                except:
-                        self.log(Level.SEVERE, "Error could not append to XML file " + self.xmlFileImagesGlobal)
-
-                # Make artifact on blackboard
-                art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
-                att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, AutopsyToGriffeyeFactory.moduleName, "Images")
-                art.addAttribute(att)
-
-                # Index artifact
-                try:
-                        # index the artifact for keyword search
-                        blackboard.indexArtifact(art)
-                except Blackboard.BlackboardException as e:
-                        self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-                # UI
-                IngestServices.getInstance().fireModuleDataEvent(ModuleDataEvent(AutopsyToGriffeyeFactory.moduleName, BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT, None))
-
-
-        # Start process Movies -------------------------------------------------------------------------------------
-        if(file.getMIMEType() in self.listOfMoviesMimeToCopy):
-		# Count
-		self.countMovies = self.countMovies+1
-		self.countImagesAndMovies = self.countImagesAndMovies+1
-
-		# XML Data for picture
-		xmlVideo = file.getName()
-
-                # Create directory
-		uniquePathFullLinux = file.getUniquePath();
-                uniquePathFullWindows = uniquePathFullLinux.replace("/", "\\")
-                uniquePathFullWindows = uniquePathFullWindows[1:]
-                fileName = os.path.basename(uniquePathFullWindows)
-                uniquePathWindows = uniquePathFullWindows.replace(replaceImgNameA, "");
-                uniquePathWindows = uniquePathFullWindows.replace(replaceImgNameB, "");
-                splitDir = uniquePathWindows.split("\\")
-                pathToCreate = os.path.join(self.filesDirectoryGlobal, "")
-                for directory in splitDir:
-                        directory = directory.replace(":", "")
-                        pathToCreate = os.path.join(pathToCreate, directory)
-                        # self.log(Level.INFO, "==> directory=" + str(directory) + " pathToCreate=" + str(pathToCreate))
-
-                        try: 
-                                os.mkdir(pathToCreate)
-                        except:
-                                pass
-
-                # Write file (here we can use either file.getName or xmlId
-                try:
-                        extractedFile = os.path.join(pathToCreate, file.getName())
-                        ContentUtils.writeToFile(file, File(extractedFile))
-                except:
-                        self.log(Level.SEVERE, "Error writing File " + file.getName() + " to " + extractedFile)
-
-
-
-		# Write image to XML file
-                try:
-                        f = open(self.xmlFileMoviesGlobal, "a")
-                        f.write("		<Movie>\n")
-                        f.write("			<path><![CDATA[" + str(xmlPath) + "]]></path>\n")
-                        f.write("			<movie>" + str(xmlMovie) + "</movie>\n")
-                        f.write("			<category>0</category>\n")
-                        f.write("			<id>" + str(xmlId) + "</id>\n")
-                        f.write("			<fileoffset>0</fileoffset>\n")
-                        f.write("			<fullpath><![CDATA[" + str(xmlFullpath) + "]]></fullpath>\n")
-                        f.write("			<created>" + str(xmlCreated) + "</created>\n")
-                        f.write("			<accessed>" + str(xmlAccessed) + "</accessed>\n")
-                        f.write("			<written>" + str(xmlWritten) + "</written>\n")
-                        f.write("			<deleted>" + str(xmlDeleted) + "</deleted>\n")
-                        f.write("			<hash>" + str(xmlHash) + "</hash>\n")
-                        f.write("			<encaseHash>0</encaseHash>\n")
-                        f.write("			<myDescription>" + xmlMyDescription + "</myDescription>\n")
-                        f.write("			<physicalLocation>" + str(xmlPhysicalLocation) + "</physicalLocation>\n")
-                        f.write("			<myUnique>0</myUnique>\n")
-                        f.write("			<tagged>0</tagged>\n")
-                        f.write("			<subCat></subCat>\n")
-                        f.write("			<notes></notes>\n")
-                        f.write("			<fileSize>" + str(xmlFileSize) + "</fileSize>\n")
-                        f.write("		</Movie>\n")
-                        f.close()
-                except:
-                        self.log(Level.SEVERE, "Error could not append to XML file " + self.xmlFileMoviesGlobal)
-
-                # Make artifact on blackboard
-                art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
-                att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, AutopsyToGriffeyeFactory.moduleName, "Movies")
-                art.addAttribute(att)
-
-                # Index artifact
-                try:
-                        # index the artifact for keyword search
-                        blackboard.indexArtifact(art)
-                except Blackboard.BlackboardException as e:
-                        self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-                # UI
-                IngestServices.getInstance().fireModuleDataEvent(ModuleDataEvent(AutopsyToGriffeyeFactory.moduleName, BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT, None))
+        # Images and Movies
+        stats = self.session.stats
+        start = time.time()
+        matches = self.rules.classify(file.getMIMEType())
+        stats.addTime("classify", start)
+        if(not matches):
+            return IngestModule.ProcessResult.OK
 
+        # Known-good files
+        start = time.time()
+        skip = self.skipKnown(file)
+        stats.addTime("known", start)
+        if(skip):
+            return IngestModule.ProcessResult.OK
+
+        start = time.time()
+        parent = parentPathCache.getParent(file)
+        stats.addTime("uniquePath", start)
+        for profile, kind in matches:
+            self.exportMatch(file, kind, parent)
 
         return IngestModule.ProcessResult.OK
 
+    # Export an image (kind "Images") or a movie (kind "Movies")
+    def exportMatch(self, file, kind, parent):
+        record = FileRecord(file, None, parent)
+
+        # Skip files exported by an earlier run
+        if(self.session.manifest.contains(record.getId(), record.getSize(), record.getMd5Hash())):
+            self.session.count("skippedExported")
+            return
+
+        # Count
+        if(kind == "Images"):
+                self.session.count("images")
+                xmlWriter = self.session.xmlWriterImages
+        else:
+                self.session.count("movies")
+                xmlWriter = self.session.xmlWriterMovies
+        self.session.count("imagesAndMovies")
+
+        # XML Data
+        fields = record.getGriffeyeFields()
+
+        # Write file (here we can use either file.getName or xmlId
+        extractedFile = record.getName()
+        try:
+                if(self.session.space.stopped):
+                        raise NoSpaceLeft(self.session.space.message)
+                start = time.time()
+                extractedFile = self.session.pathMapper.getExportFileForParent(parent, record.getName())
+                self.session.stats.addTime("directory", start)
+                self.exportFile(record, extractedFile, xmlWriter, fields)
+        except NoSpaceLeft:
+                self.session.count("skippedNoSpace")
+        except:
+                self.session.stats.countError("directory", sys.exc_info()[1])
+                self.log(Level.SEVERE, "Error writing File %s to %s", record.getName(), extractedFile)
+
+        # Make artifact on blackboard
+        if(not self.makeArtifacts):
+            return
+        art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
+        att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, AutopsyToGriffeyeFactory.moduleName, kind)
+        art.addAttribute(att)
+
+        # Index artifact and update UI (in batches)
+        self.artifacts.add(art)
+
+    # Export file: write it, or link it to an earlier copy with the same MD5
+    def exportFile(self, record, extractedFile, xmlWriter, fields):
+        duplicate = lambda source, action: self.exportDuplicate(source, action, record, extractedFile, xmlWriter, fields)
+        if(self.session.dedupIndex.addFile(record.getMd5Hash(), extractedFile, record.file, record.getSize(), duplicate)):
+            self.session.exportPool.submit(extractedFile, self.writeFile, record.file, extractedFile, record, xmlWriter, fields)
+
+    # Duplicate of an exported file (see exportDedup.py). It is added to the
+    # XML and the manifest when its hardlink or copy is on disk, in dedupMode
+    # "once" with the first copy as its exported file.
+    def exportDuplicate(self, source, action, record, extractedFile, xmlWriter, fields):
+        if(action == duplicateLinked):
+            self.fileExported(record, extractedFile, xmlWriter, fields)
+        elif(action == duplicateAlias):
+            fields["notes"] = "Exported once as Files\\" + escapeXml(os.path.relpath(source, self.session.filesDirectoryGlobal).replace("/", "\\"))
+            self.fileExported(record, source, xmlWriter, fields)
+        elif(action == duplicateWrite):
+            # The first copy could not be written: this one is written from
+            # the image, and is the first copy of the others
+            self.exportFile(record, extractedFile, xmlWriter, fields)
+        else:
+            self.session.exportPool.submit(extractedFile, self.copyDuplicate, source, record, extractedFile, xmlWriter, fields)
+
+    # Copy the first copy to a duplicate that could not be hardlinked (runs
+    # in an export writer thread)
+    def copyDuplicate(self, source, record, extractedFile, xmlWriter, fields):
+        if(self.writer.copyDuplicate(source, record.getSize(), extractedFile)):
+            self.fileExported(record, extractedFile, xmlWriter, fields)
+
+    # Write file (runs in an export writer thread)
+    def writeFile(self, file, extractedFile, record=None, xmlWriter=None, fields=None):
+        md5 = None
+        algorithms = []
+        if(record is not None):
+            md5 = record.getMd5Hash()
+            algorithms = self.writer.getAlgorithms(md5)
+        probe = fields is not None and AutopsyToGriffeyeFactory.probeMediaHeaders
+        extractedFile, result = self.writer.writeFile(file, extractedFile, md5, algorithms, probeHeadBytes if probe else 0)
+        if(result is None):
+            return
+        stats = self.session.stats
+        digests = result.digests
+
+        # Hashes computed while writing go into the XML and the manifest
+        if(not md5 and digests.get("md5")):
+            md5 = digests["md5"]
+            record.setMd5Hash(md5)
+            if(fields is not None):
+                fields["id"] = md5
+                fields["hash"] = md5
+        otherDigests = formatDigests(digests)
+        notes = [otherDigests]
+
+        # Width, height and bit depth from the header read by the copy
+        if(probe):
+            start = time.time()
+            info = probeMedia(result.head, result.size, lambda offset, length: readBytes(file, offset, length))
+            stats.addTime("probe", start)
+            if(info is None):
+                stats.count("probeUnknown")
+            else:
+                stats.count("probed")
+                fields["bitDepth"] = str(info.bitDepth or "")
+                fields["aspectRatio"] = info.getAspectRatio()
+                notes.insert(0, info.getDescription())
+        if(fields is not None):
+            fields["notes"] = " ".join(note for note in notes if note)
+
+        if(xmlWriter is not None):
+            self.fileExported(record, extractedFile, xmlWriter, fields, otherDigests)
+
+    # File is exported: add it to the XML file, and to the manifest when the
+    # record is on disk
+    def fileExported(self, record, extractedFile, xmlWriter, fields, digests=None):
+        stats = self.session.stats
+        manifest = self.session.manifest
+        try:
+            start = time.time()
+            xmlWriter.writeRecord(fields, lambda: manifest.add(record.getId(), record.getSize(), record.getMd5Hash(), extractedFile, digests))
+            stats.addTime("xml", start)
+        except:
+            stats.countError("xml", sys.exc_info()[1])
+            self.log(Level.SEVERE, "Error could not append to XML file %s", xmlWriter.xmlFile)
+            return
+        self.session.snapshot()
+
     # Shutdown
     def shutDown(self):
-	# Write end of XML files
-        f = open(self.xmlFileImagesGlobal, "a")
-        f.write('	</ReportIndex>\n')
-        f.close()
-
-        f = open(self.xmlFileMoviesGlobal, "a")
-        f.write('	</ReportIndex>\n')
-        f.close()
-
-        # As a final part of this example, we'll send a message to the ingest inbox with the number of files found (in this thread)
+        # Post artifacts made by this ingest thread
+        self.artifacts.flush()
+
+        # The last ingest thread of the job closes the XML files
+        if(not AutopsyToGriffeyeFactory.sessions.release(self.session)):
+            return
+
+        # As a final part, we'll send a message to the ingest inbox with the number of files found (in all threads)
+        messageType = IngestMessage.MessageType.DATA
+        spaceMessage = ""
+        if(self.session.space.stopped):
+            messageType = IngestMessage.MessageType.ERROR
+            spaceMessage = self.session.space.message + ", " + str(self.session.getCount("skippedNoSpace")) + " files not written. "
         message = IngestMessage.createMessage(
-            IngestMessage.MessageType.DATA, AutopsyToGriffeyeFactory.moduleName,
-                str(self.countImagesAndMovies) + " files found")
+            messageType, AutopsyToGriffeyeFactory.moduleName,
+                spaceMessage + str(self.session.getCount("imagesAndMovies")) + " files found, " + str(self.session.dedupIndex.countDuplicates) + " duplicates, " + str(self.session.exportPool.countFailures) + " could not be written, " + str(self.session.getCount("skippedExported")) + " exported before, " + str(self.session.getCount("skippedKnown") + self.session.getCount("skippedHashSet")) + " known skipped",
+                self.session.stats.summary())
         ingestServices = IngestServices.getInstance().postMessage(message)
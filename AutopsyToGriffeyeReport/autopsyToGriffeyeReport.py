@@ -0,0 +1,223 @@
+# File: autopsyToGriffeyeReport.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# This is a report module that makes the Griffeye export of AutopsyToGriffeye
+# for a case that has been ingested, without running the ingest again
+# (Generate Report -> Autopsy To Griffeye). The XML files, the manifest and
+# the exported images and movies are written to the report folder, so the
+# export can be made again or with another filter in minutes.
+#
+# The images and movies are read from the case database in pages of pageSize
+# files, one query per page (mime_type IN (..) AND obj_id > <last id of the
+# previous page>, by obj_id), which gives the name, times, size and MD5 of
+# every file of the page. The files are given to AutopsyToGriffeye the same
+# way the ingest gives them: folders come from the parent path cache, the
+# XML is streamed by the XML writers and the files are copied by the export
+# writer threads (exportThreads in AutopsyToGriffeyeFactory). No artifacts are
+# made, the files got theirs when the case was ingested.
+#
+# Set extraWhere to export part of the case, for example "size > 10240" or
+# "data_source_obj_id = 1".
+#
+# When the disk of the report folder gets below minFreeBytes of
+# AutopsyToGriffeyeFactory the export stops and the report ends with an error
+# that says how much was free. A cancelled report ends as cancelled, with the
+# files exported until then, and the status file says "cancelled".
+#
+# The folders AutopsyToGriffeye and ExportCommon have to be in the same
+# python_modules folder as this one.
+
+
+from org.sleuthkit.autopsy.report import GeneralReportModuleAdapter
+from org.sleuthkit.autopsy.report.ReportProgressPanel import ReportStatus
+from org.sleuthkit.autopsy.coreutils import Logger
+from org.sleuthkit.autopsy.casemodule import Case
+
+import os
+import sys
+from java.util.logging import Level
+
+# Shared code in ExportCommon and AutopsyToGriffeye (placed next to this folder in python_modules)
+pythonModulesDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (pythonModulesDirectory, os.path.join(pythonModulesDirectory, "AutopsyToGriffeye")):
+    if(directory not in sys.path):
+        sys.path.append(directory)
+from ExportCommon.exportLog import ExportLogger
+from ExportCommon.exportRules import imageMimeTypes
+from ExportCommon.exportRules import movieMimeTypes
+from ExportCommon.exportRules import sqlWhere
+from AutopsyToGriffeye import AutopsyToGriffeye
+from AutopsyToGriffeye import AutopsyToGriffeyeFactory
+from AutopsyToGriffeye import AutopsyToGriffeyeSession
+
+
+# Report Session -------------------------------------------------------------------------------------------------------------
+class AutopsyToGriffeyeReportSession(AutopsyToGriffeyeSession):
+
+    # Export folder in the report directory
+    def getBaseDirectory(self):
+        return self.context.reportDirectory
+
+    # A report is made from scratch
+    def isResume(self):
+        return False
+
+    # Files of the report, for the disk space estimate
+    def getExportWhere(self):
+        return self.context.where
+
+
+# Report Export --------------------------------------------------------------------------------------------------------------
+class AutopsyToGriffeyeReportExport(AutopsyToGriffeye):
+
+    sessionClass = AutopsyToGriffeyeReportSession
+    makeArtifacts = False
+
+    # Close the session (the report module reports, not the ingest inbox)
+    def shutDown(self):
+        AutopsyToGriffeyeFactory.sessions.release(self.session)
+
+
+# What AutopsyToGriffeye uses of an ingest job context --------------------------------------------------------------------------
+class ReportJobContext(object):
+
+    def __init__(self, reportDirectory, progressBar, where):
+        self.reportDirectory = reportDirectory
+        self.progressBar = progressBar
+        self.where = where
+
+    def getJobId(self):
+        return "report " + self.reportDirectory
+
+    def getDataSource(self):
+        return None
+
+    def fileIngestIsCancelled(self):
+        return self.progressBar.getStatus() == ReportStatus.CANCELED
+
+    def dataSourceIngestIsCancelled(self):
+        return self.fileIngestIsCancelled()
+
+
+# Autopsy To Griffeye Report -------------------------------------------------------------------------------------------------
+class AutopsyToGriffeyeReport(GeneralReportModuleAdapter):
+
+    moduleName = "Autopsy To Griffeye"
+
+    # Files read from the case database per query
+    pageSize = 5000
+
+    # Extra SQL condition on tsk_files ("" = all images and movies)
+    extraWhere = ""
+
+    _logger = ExportLogger(Logger.getLogger(moduleName), Level.WARNING)
+
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
+
+    def getName(self):
+        return self.moduleName
+
+    def getDescription(self):
+        return "Griffeye XML files and export of the images and movies of the case, read from the case database"
+
+    # Images XML file (or its shard list) relative to the report directory
+    def getRelativeFilePath(self):
+        number = str(Case.getCurrentCase().getNumber())
+        name = number + number + "_images.xml"
+        if(AutopsyToGriffeyeFactory.xmlMaxRecords or AutopsyToGriffeyeFactory.xmlMaxBytes):
+            name = number + number + "_images_shards.txt"
+        return os.path.join(number + "AutopsyToGriffeye", name)
+
+    # SQL condition for the images and movies, after lastId (None = from the start)
+    def getWhere(self, lastId=None):
+        where = sqlWhere(imageMimeTypes | movieMimeTypes)
+        if(self.extraWhere):
+            where = where + " AND (" + self.extraWhere + ")"
+        if(lastId is not None):
+            where = where + " AND obj_id > " + str(lastId)
+        return where
+
+    # Pages of files, by object id
+    def findFilePages(self, skCase):
+        lastId = -1
+        while True:
+            files = skCase.findAllFilesWhere(self.getWhere(lastId) + " ORDER BY obj_id LIMIT " + str(self.pageSize))
+            if(files.isEmpty()):
+                return
+            yield files
+            lastId = files.get(files.size() - 1).getId()
+            if(files.size() < self.pageSize):
+                return
+
+    # Autopsy 4.16 and later give report settings, earlier versions the report directory
+    def generateReport(self, reportSettings, progressBar):
+        if(hasattr(reportSettings, "getReportDirectoryPath")):
+            reportDirectory = reportSettings.getReportDirectoryPath()
+        else:
+            reportDirectory = reportSettings
+
+        case = Case.getCurrentCase()
+        skCase = case.getSleuthkitCase()
+        progressBar.setIndeterminate(False)
+        progressBar.start()
+        progressBar.setMaximumProgress(max(skCase.countFilesWhere(self.getWhere()), 1))
+
+        # The export of AutopsyToGriffeye, in the report directory
+        context = ReportJobContext(reportDirectory, progressBar, self.getWhere())
+        module = AutopsyToGriffeyeReportExport()
+        module.startUp(context)
+        session = module.session
+        stats = session.stats
+        try:
+            for files in self.findFilePages(skCase):
+                if(context.fileIngestIsCancelled() or session.space.stopped):
+                    break
+                stats.count("reportPages")
+                progressBar.updateStatusLabel("Exporting %d files from object id %d" % (files.size(), files.get(0).getId()))
+                for file in files:
+                    if(context.fileIngestIsCancelled()):
+                        break
+                    module.process(file)
+                    progressBar.increment()
+        except:
+            self.log(Level.SEVERE, "Error making report: %s", sys.exc_info()[1])
+            module.shutDown()
+            progressBar.complete(ReportStatus.ERROR)
+            return
+
+        # Waits for the export writers and closes the XML files
+        progressBar.updateStatusLabel("Waiting for the export writers")
+        module.shutDown()
+
+        # Cancelled: the XML files have the files exported before that
+        if(context.fileIngestIsCancelled()):
+            records = session.xmlWriterImages.countWritten + session.xmlWriterMovies.countWritten
+            self.log(Level.INFO, "==> Report %s cancelled, %d files exported", reportDirectory, records)
+            progressBar.updateStatusLabel("Cancelled, the export was cut short: " + str(records) + " files exported")
+            progressBar.complete(ReportStatus.CANCELED)
+            return
+
+        # The disk was full: the XML files have the files written before that
+        if(session.space.stopped):
+            self.log(Level.SEVERE, "==> Report %s: %s", reportDirectory, session.space.message)
+            progressBar.updateStatusLabel(session.space.message + ", " + str(session.getCount("skippedNoSpace")) + " files not written")
+            progressBar.complete(ReportStatus.ERROR)
+            return
+
+        xmlFiles = [(session.xmlFileImagesGlobal, "Griffeye images"), (session.xmlFileMoviesGlobal, "Griffeye movies")]
+        if(session.xmlWriterImages.isSharded()):
+            xmlFiles = [(session.xmlWriterImages.getShardManifest(), "Griffeye images shards"),
+                        (session.xmlWriterMovies.getShardManifest(), "Griffeye movies shards")]
+        for xmlFile, description in xmlFiles:
+            case.addReport(xmlFile, self.moduleName, description)
+
+        self.log(Level.INFO, "==> Report %s: %s", reportDirectory, stats.summary().replace("\n", "; "))
+        progressBar.updateStatusLabel(str(session.getCount("imagesAndMovies")) + " files exported, " +
+                                      str(session.dedupIndex.countDuplicates) + " duplicates, " +
+                                      str(session.exportPool.countFailures) + " could not be written")
+        progressBar.complete(ReportStatus.COMPLETE)
@@ -0,0 +1,775 @@
+# File: autopsyStandIns.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Stand-ins for the Autopsy, Sleuth Kit and Java classes the export modules
+# import, so the modules can be loaded and run outside of Autopsy (CPython or
+# Jython). install() puts them in sys.modules under their real package names.
+# Under Jython the real java.* classes are used when they can be imported.
+#
+# The stand-ins only do what the modules need: files have a name, MIME type,
+# unique path, size, MD5 and content; ContentUtils.writeToFile writes the
+# content; the blackboard and ingest services count what they are given.
+
+import os
+import re
+import sys
+import threading
+import types
+
+
+# Counters for calls into Autopsy, shared by all stand-ins
+counters = {}
+countersLock = threading.Lock()
+
+
+# Returns the new value
+def count(name, value=1):
+    countersLock.acquire()
+    try:
+        counters[name] = counters.get(name, 0) + value
+        return counters[name]
+    finally:
+        countersLock.release()
+
+
+def resetCounters():
+    countersLock.acquire()
+    try:
+        counters.clear()
+    finally:
+        countersLock.release()
+
+
+# java.io / java.util / java.util.logging ------------------------------------------------------------------------------------
+class File(object):
+
+    # Simulated disk for getUsableSpace: diskBytes on the disk of
+    # diskDirectory, less the files in it (None = the real free space)
+    diskBytes = None
+    diskDirectory = None
+
+    def __init__(self, path):
+        self.path = path
+
+    def getPath(self):
+        return self.path
+
+    def getUsableSpace(self):
+        count("getUsableSpace")
+        if(File.diskBytes is None):
+            result = os.statvfs(self.path)
+            return result.f_bavail * result.f_frsize
+        used = 0
+        for root, directories, files in os.walk(File.diskDirectory):
+            for name in files:
+                used = used + os.path.getsize(os.path.join(root, name))
+        return max(File.diskBytes - used, 0)
+
+    def toString(self):
+        return self.path
+
+    def __str__(self):
+        return self.path
+
+
+class ArrayList(list):
+
+    def size(self):
+        return len(self)
+
+    def isEmpty(self):
+        return not self
+
+    def get(self, index):
+        return self[index]
+
+
+class Level(object):
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def intValue(self):
+        return self.value
+
+    def __str__(self):
+        return self.name
+
+Level.SEVERE = Level("SEVERE", 1000)
+Level.WARNING = Level("WARNING", 900)
+Level.INFO = Level("INFO", 800)
+Level.CONFIG = Level("CONFIG", 700)
+Level.FINE = Level("FINE", 500)
+
+
+# org.sleuthkit.datamodel ----------------------------------------------------------------------------------------------------
+class TskData(object):
+
+    class TSK_DB_FILES_TYPE_ENUM(object):
+        FS = "FS"
+        CARVED = "CARVED"
+        DERIVED = "DERIVED"
+        LOCAL = "LOCAL"
+        UNALLOC_BLOCKS = "UNALLOC_BLOCKS"
+        UNUSED_BLOCKS = "UNUSED_BLOCKS"
+
+    class FileKnown(object):
+        UNKNOWN = "UNKNOWN"
+        KNOWN = "KNOWN"
+        BAD = "BAD"
+
+
+class BlackboardArtifact(object):
+
+    class ARTIFACT_TYPE(object):
+        TSK_INTERESTING_FILE_HIT = "TSK_INTERESTING_FILE_HIT"
+
+    def __init__(self, artifactType, content):
+        self.artifactType = artifactType
+        self.content = content
+        self.attributes = []
+
+    def addAttribute(self, attribute):
+        self.attributes.append(attribute)
+
+    def getDisplayName(self):
+        return "Interesting Files"
+
+
+class BlackboardAttribute(object):
+
+    class ATTRIBUTE_TYPE(object):
+        TSK_SET_NAME = "TSK_SET_NAME"
+
+    def __init__(self, attributeType, moduleName, value):
+        self.attributeType = attributeType
+        self.moduleName = moduleName
+        self.value = value
+
+
+class AbstractFile(object):
+
+    def __init__(self, objectId, name, mimeType, uniquePath, size, md5, contentSeed=None,
+                 fileType=TskData.TSK_DB_FILES_TYPE_ENUM.FS, isFile=True, known=TskData.FileKnown.UNKNOWN, parentId=None,
+                 dataSource=None, ranges=None):
+        self.objectId = objectId
+        self.parentId = parentId
+        self.dataSource = dataSource
+        self.ranges = ranges or []
+        self.name = name
+        self.mimeType = mimeType
+        self.uniquePath = uniquePath
+        self.size = size
+        self.md5 = md5
+        self.contentSeed = contentSeed or name
+        self.fileType = fileType
+        self._isFile = isFile
+        self.known = known
+
+    def getId(self):
+        return self.objectId
+
+    def getName(self):
+        return self.name
+
+    def getMIMEType(self):
+        return self.mimeType
+
+    def getUniquePath(self):
+        count("getUniquePath")
+        return self.uniquePath
+
+    def getSize(self):
+        return self.size
+
+    def getParentId(self):
+        return self.parentId
+
+    def getDataSourceObjectId(self):
+        return self.dataSource.getId()
+
+    def getDataSource(self):
+        count("getDataSource")
+        return self.dataSource
+
+    # Byte ranges in the raw image (TskFileRange)
+    def getRanges(self):
+        count("getRanges")
+        return ArrayList(self.ranges)
+
+    # Parent path without the image and volume, like in tsk_files.parent_path
+    def getParentPath(self):
+        parts = self.uniquePath.split("/")
+        return "/" + "/".join(parts[3:-1]) + "/"
+
+    def getMd5Hash(self):
+        return self.md5
+
+    def getType(self):
+        return self.fileType
+
+    def isFile(self):
+        return self._isFile
+
+    def getKnown(self):
+        return self.known
+
+    def getCrtime(self):
+        return 1611231960
+
+    def getAtime(self):
+        return 1611231960
+
+    def getMtime(self):
+        return 1611231960
+
+    def getMetaAddr(self):
+        return self.objectId
+
+    # Every failEvery-th read from the start of a file fails as if the disk
+    # was full (0 = never). ContentUtils.writeToFile and copyContent both
+    # read through here, so both copy paths fail the same way.
+    failEvery = 0
+
+    # Content is the seed repeated up to size bytes
+    def read(self, buffer, offset, length):
+        if(offset >= self.size):
+            return -1
+        if(offset == 0 and AbstractFile.failEvery):
+            if(count("readFromStart") % AbstractFile.failEvery == 0):
+                count("readFailed")
+                raise IOError(28, "No space left on device")
+        length = min(length, self.size - offset)
+        count("bytesRead", length)
+        data = self._content(offset, length)
+        buffer[0:length] = data
+        return length
+
+    def _content(self, offset, length):
+        seed = self.contentSeed.encode("utf-8") if not isinstance(self.contentSeed, bytes) else self.contentSeed
+        # Only the window that is read, large files are read in chunks
+        start = offset % len(seed)
+        repeat = (start + length) // len(seed) + 1
+        return (seed * repeat)[start:start + length]
+
+    def newArtifact(self, artifactType):
+        count("newArtifact")
+        return BlackboardArtifact(artifactType, self)
+
+
+# Searches Case.files. Only understands the conditions the report module
+# uses: mime_type IN (..), obj_id > n, ORDER BY obj_id and LIMIT n.
+class SleuthkitCase(object):
+
+    def __init__(self, case):
+        self.case = case
+
+    # Files matching the conditions the modules use: mime_type IN (..) OR
+    # LOWER(name) IN (..), data_source_obj_id = n, obj_id > n, LIMIT n
+    def _where(self, sqlWhereClause):
+        mimeTypes = re.search(r"mime_type IN \(([^)]*)\)", sqlWhereClause)
+        if(mimeTypes):
+            mimeTypes = set(re.findall(r"'([^']*)'", mimeTypes.group(1)))
+        names = re.search(r"LOWER\(name\) IN \(([^)]*)\)", sqlWhereClause)
+        if(names):
+            names = set(re.findall(r"'([^']*)'", names.group(1)))
+        dataSourceId = re.search(r"data_source_obj_id = (\d+)", sqlWhereClause)
+        dataSourceId = int(dataSourceId.group(1)) if dataSourceId else None
+        after = re.search(r"obj_id > (-?\d+)", sqlWhereClause)
+        after = int(after.group(1)) if after else None
+
+        def matches(file):
+            if((mimeTypes or names) and not ((mimeTypes and file.getMIMEType() in mimeTypes) or
+                                             (names and file.getName().lower() in names))):
+                return False
+            if(dataSourceId is not None and file.getDataSourceObjectId() != dataSourceId):
+                return False
+            return after is None or file.getId() > after
+
+        found = [file for file in self.case.files if matches(file)]
+        found.sort(key=lambda file: file.getId())
+        limit = re.search(r"LIMIT (\d+)", sqlWhereClause)
+        if(limit):
+            found = found[:int(limit.group(1))]
+        return found
+
+    def findAllFilesWhere(self, sqlWhereClause):
+        count("findAllFilesWhere")
+        return ArrayList(self._where(sqlWhereClause))
+
+    # Data sources of the case, ordered by object id
+    def getDataSources(self):
+        count("getDataSources")
+        return ArrayList(sorted(self.case.dataSources, key=lambda dataSource: dataSource.getId()))
+
+    def countFilesWhere(self, sqlWhereClause):
+        count("countFilesWhere")
+        return len(self._where(sqlWhereClause))
+
+    # Only SELECT SUM(size) AS total FROM tsk_files WHERE ..
+    def executeQuery(self, query):
+        count("executeQuery")
+        return CaseDbQuery({"total": sum(file.getSize() for file in self._where(query))})
+
+
+class CaseDbQuery(object):
+
+    def __init__(self, row):
+        self.resultSet = ResultSet([row])
+
+    def getResultSet(self):
+        return self.resultSet
+
+    def close(self):
+        pass
+
+
+# java.sql.ResultSet
+class ResultSet(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.row = None
+
+    def next(self):
+        if(not self.rows):
+            return False
+        self.row = self.rows.pop(0)
+        return True
+
+    def getLong(self, name):
+        return self.row[name] or 0
+
+
+class ReadContentInputStream(object):
+    pass
+
+
+class TskFileRange(object):
+
+    def __init__(self, byteStart, byteLen, sequence):
+        self.byteStart = byteStart
+        self.byteLen = byteLen
+        self.sequence = sequence
+
+    def getByteStart(self):
+        return self.byteStart
+
+    def getByteLen(self):
+        return self.byteLen
+
+    def getSequence(self):
+        return self.sequence
+
+
+# org.sleuthkit.autopsy.ingest -----------------------------------------------------------------------------------------------
+class IngestModule(object):
+
+    class ProcessResult(object):
+        OK = "OK"
+        ERROR = "ERROR"
+
+
+class IngestModuleException(Exception):
+    pass
+
+
+class FileIngestModule(IngestModule):
+    pass
+
+
+class DataSourceIngestModule(IngestModule):
+    pass
+
+
+class IngestModuleFactoryAdapter(object):
+
+    def isFileIngestModuleFactory(self):
+        return False
+
+    def isDataSourceIngestModuleFactory(self):
+        return False
+
+
+class GenericIngestModuleJobSettings(object):
+    pass
+
+
+class IngestModuleIngestJobSettingsPanel(object):
+    pass
+
+
+class IngestMessage(object):
+
+    class MessageType(object):
+        DATA = "DATA"
+        INFO = "INFO"
+        WARNING = "WARNING"
+        ERROR = "ERROR"
+
+    def __init__(self, messageType, moduleName, subject, details=None):
+        self.messageType = messageType
+        self.moduleName = moduleName
+        self.subject = subject
+        self.details = details
+
+    @staticmethod
+    def createMessage(messageType, moduleName, subject, details=None):
+        return IngestMessage(messageType, moduleName, subject, details)
+
+
+class ModuleDataEvent(object):
+
+    def __init__(self, moduleName, artifactType, artifacts=None):
+        self.moduleName = moduleName
+        self.artifactType = artifactType
+        self.artifacts = artifacts
+
+
+class IngestServices(object):
+
+    _instance = None
+
+    def __init__(self):
+        self.messages = []
+
+    @staticmethod
+    def getInstance():
+        if(IngestServices._instance is None):
+            IngestServices._instance = IngestServices()
+        return IngestServices._instance
+
+    def postMessage(self, message):
+        count("postMessage")
+        self.messages.append(message)
+
+    def fireModuleDataEvent(self, event):
+        count("fireModuleDataEvent")
+
+
+class DataSourceIngestModuleProgress(object):
+
+    def __init__(self):
+        self.workUnits = 0
+        self.done = 0
+
+    def switchToDeterminate(self, workUnits):
+        self.workUnits = workUnits
+
+    def switchToIndeterminate(self):
+        self.workUnits = 0
+
+    # progress(workUnits), progress(message) or progress(message, workUnits)
+    def progress(self, workUnits, message=None):
+        if(isinstance(workUnits, int)):
+            self.done = workUnits
+        else:
+            count("progressMessage")
+            self.message = workUnits
+            if(message is not None):
+                self.done = message
+
+
+# org.sleuthkit.autopsy.report ------------------------------------------------------------------------------------------------
+class GeneralReportModuleAdapter(object):
+    pass
+
+
+class ReportStatus(object):
+    QUEUING = "QUEUING"
+    RUNNING = "RUNNING"
+    COMPLETE = "COMPLETE"
+    CANCELED = "CANCELED"
+    ERROR = "ERROR"
+
+
+class ReportProgressPanel(object):
+
+    def __init__(self):
+        self.status = ReportStatus.QUEUING
+        self.maximum = 0
+        self.done = 0
+        self.label = ""
+
+    def setIndeterminate(self, indeterminate):
+        pass
+
+    def start(self):
+        self.status = ReportStatus.RUNNING
+
+    def setMaximumProgress(self, maximum):
+        self.maximum = maximum
+
+    def increment(self):
+        self.done = self.done + 1
+
+    def updateStatusLabel(self, label):
+        self.label = label
+
+    def getStatus(self):
+        return self.status
+
+    def complete(self, status):
+        self.status = status
+
+
+class GeneralReportSettings(object):
+
+    def __init__(self, reportDirectory):
+        self.reportDirectory = reportDirectory
+
+    def getReportDirectoryPath(self):
+        return self.reportDirectory
+
+
+# Data source, an image when it has paths (raw image files)
+class Content(object):
+
+    def __init__(self, objectId, name, paths=None):
+        self.objectId = objectId
+        self.name = name
+        self.paths = paths
+
+    def getId(self):
+        return self.objectId
+
+    def getName(self):
+        return self.name
+
+    def getUniquePath(self):
+        return "/" + self.name
+
+    def getPaths(self):
+        return self.paths or []
+
+    def getType(self):
+        return "TSK_IMG_TYPE_RAW" if self.paths else "TSK_IMG_TYPE_DETECT"
+
+    def getSleuthkitCase(self):
+        return Case.getCurrentCase().getSleuthkitCase()
+
+
+class IngestJobContext(object):
+
+    def __init__(self, jobId, dataSource=None):
+        self.jobId = jobId
+        self.dataSource = dataSource
+        self.cancelled = False
+
+    def getJobId(self):
+        return self.jobId
+
+    def getDataSource(self):
+        return self.dataSource
+
+    def fileIngestIsCancelled(self):
+        return self.cancelled
+
+    def dataSourceIngestIsCancelled(self):
+        return self.cancelled
+
+
+# org.sleuthkit.autopsy.coreutils --------------------------------------------------------------------------------------------
+class Logger(object):
+
+    # Messages below this level are dropped (like the default Autopsy log level)
+    level = Level.INFO
+
+    def __init__(self, name):
+        self.name = name
+
+    @staticmethod
+    def getLogger(name):
+        return Logger(name)
+
+    def isLoggable(self, level):
+        return level.intValue() >= Logger.level.intValue()
+
+    def logp(self, level, sourceClass, sourceMethod, msg):
+        count("log")
+        if(level.intValue() >= Level.SEVERE.intValue()):
+            count("logSevere")
+
+    def log(self, level, msg):
+        self.logp(level, None, None, msg)
+
+
+class PlatformUtil(object):
+    pass
+
+
+# org.sleuthkit.autopsy.casemodule -------------------------------------------------------------------------------------------
+class Blackboard(object):
+
+    class BlackboardException(Exception):
+        pass
+
+    def indexArtifact(self, artifact):
+        count("indexArtifact")
+
+
+# Searches Case.files (like SQL LOWER(name) LIKE LOWER(?) without wildcards)
+class FileManager(object):
+
+    def __init__(self, case):
+        self.case = case
+
+    def findFiles(self, dataSource, fileName, parentSubString=None):
+        count("findFiles")
+        fileName = fileName.lower()
+        found = []
+        for file in self.case.files:
+            if(file.getName().lower() != fileName):
+                continue
+            if(dataSource is not None and file.getDataSourceObjectId() != dataSource.getId()):
+                continue
+            if(parentSubString is not None and parentSubString.lower() not in file.getParentPath().lower()):
+                continue
+            found.append(file)
+        return ArrayList(found)
+
+
+class Services(object):
+
+    def __init__(self, case):
+        self.blackboard = Blackboard()
+        self.fileManager = FileManager(case)
+
+    def getBlackboard(self):
+        return self.blackboard
+
+    def getFileManager(self):
+        return self.fileManager
+
+
+class Case(object):
+
+    _current = None
+
+    def __init__(self, caseDirectory, number="1568795", name="Benchmark"):
+        self.caseDirectory = caseDirectory
+        self.number = number
+        self.name = name
+        self.services = Services(self)
+        self.sleuthkitCase = SleuthkitCase(self)
+        self.reports = []
+
+        # Files in the case, searched by FileManager.findFiles
+        self.files = []
+
+        # Data sources added to the case (SleuthkitCase.getDataSources)
+        self.dataSources = []
+
+    @staticmethod
+    def getCurrentCase():
+        return Case._current
+
+    # Made on first use, like in Autopsy
+    def getCaseDirectory(self):
+        return self.caseDirectory
+
+    def getExportDirectory(self):
+        exportDirectory = os.path.join(self.caseDirectory, "Export")
+        if(not os.path.isdir(exportDirectory)):
+            os.makedirs(exportDirectory)
+        return exportDirectory
+
+    def getName(self):
+        return self.name
+
+    def getNumber(self):
+        return self.number
+
+    def getServices(self):
+        return self.services
+
+    def getSleuthkitCase(self):
+        return self.sleuthkitCase
+
+    def addReport(self, localPath, sourceModuleName, reportName):
+        count("addReport")
+        self.reports.append((localPath, sourceModuleName, reportName))
+
+
+# org.sleuthkit.autopsy.datamodel --------------------------------------------------------------------------------------------
+class ContentUtils(object):
+
+    bufferSize = 8 * 1024
+
+    @staticmethod
+    def writeToFile(content, outputFile):
+        count("writeToFile")
+        path = outputFile.getPath()
+        buffer = bytearray(ContentUtils.bufferSize)
+        f = open(path, "wb")
+        try:
+            offset = 0
+            while True:
+                length = content.read(buffer, offset, len(buffer))
+                if(length <= 0):
+                    break
+                f.write(buffer[0:length])
+                offset = offset + length
+        finally:
+            f.close()
+        count("bytesWritten", offset)
+        return offset
+
+
+# Install --------------------------------------------------------------------------------------------------------------------
+def _module(name, **attributes):
+    module = sys.modules.get(name)
+    if(module is None):
+        module = types.ModuleType(name)
+        sys.modules[name] = module
+        parentName, dot, childName = name.rpartition(".")
+        if(parentName):
+            parent = _module(parentName)
+            # Keep classes with the same name as a module (IngestModule)
+            if(not hasattr(parent, childName)):
+                setattr(parent, childName, module)
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    return module
+
+
+def _hasJava():
+    try:
+        import java.io
+        return True
+    except ImportError:
+        return False
+
+
+# Put stand-ins in sys.modules. Set case with setCase() before startUp().
+def install():
+    if(not _hasJava()):
+        _module("java.io", File=File)
+        _module("java.util", ArrayList=ArrayList)
+        _module("java.util.logging", Level=Level)
+
+    _module("org.sleuthkit.datamodel", SleuthkitCase=SleuthkitCase, AbstractFile=AbstractFile,
+            ReadContentInputStream=ReadContentInputStream, BlackboardArtifact=BlackboardArtifact,
+            BlackboardAttribute=BlackboardAttribute, TskData=TskData, TskFileRange=TskFileRange)
+    _module("org.sleuthkit.autopsy.ingest", IngestModule=IngestModule, FileIngestModule=FileIngestModule,
+            DataSourceIngestModule=DataSourceIngestModule, IngestModuleFactoryAdapter=IngestModuleFactoryAdapter,
+            GenericIngestModuleJobSettings=GenericIngestModuleJobSettings,
+            IngestModuleIngestJobSettingsPanel=IngestModuleIngestJobSettingsPanel, IngestMessage=IngestMessage,
+            IngestServices=IngestServices, ModuleDataEvent=ModuleDataEvent)
+    _module("org.sleuthkit.autopsy.ingest.IngestModule", IngestModuleException=IngestModuleException)
+    _module("org.sleuthkit.autopsy.coreutils", Logger=Logger, PlatformUtil=PlatformUtil)
+    _module("org.sleuthkit.autopsy.casemodule", Case=Case)
+    _module("org.sleuthkit.autopsy.casemodule.services", Services=Services, FileManager=FileManager, Blackboard=Blackboard)
+    _module("org.sleuthkit.autopsy.datamodel", ContentUtils=ContentUtils)
+    _module("org.sleuthkit.autopsy.report", GeneralReportModuleAdapter=GeneralReportModuleAdapter,
+            ReportProgressPanel=ReportProgressPanel, GeneralReportSettings=GeneralReportSettings)
+    _module("org.sleuthkit.autopsy.report.ReportProgressPanel", ReportStatus=ReportStatus)
+
+
+def setCase(case):
+    Case._current = case
@@ -0,0 +1,618 @@
+# File: benchExportModules.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Benchmark for the export modules outside of Autopsy. Makes a synthetic
+# population of files, runs startUp/process/shutDown of a module on them with
+# the stand-ins in autopsyStandIns.py and writes the results as JSON:
+#
+#   python Benchmarks/benchExportModules.py --files 20000 --duplicates 0.2 --output results.json
+#
+# Each module is run in its own process (so peak memory is per module) unless
+# --in-process is given. Results hold files/sec, bytes/sec, file system calls
+# (counted at the os/open layer, not real syscalls), peak memory and the calls
+# made into Autopsy. Keep the JSON of each version to spot regressions.
+#
+# With --crash-after n the module is killed (os._exit) after n files, then run
+# again with resumeExport on the same case folder. The result gets a
+# crashResume check: the Griffeye XML files must hold as many records as the
+# manifest lists files, and every file in the manifest must be on disk.
+#
+# The modules need Python 2 (CPython 2.7 or Jython 2.7).
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+
+benchmarksDirectory = os.path.dirname(os.path.abspath(__file__))
+repositoryDirectory = os.path.dirname(benchmarksDirectory)
+sys.path.append(benchmarksDirectory)
+import autopsyStandIns
+
+
+# Exit status of a module killed by --crash-after
+crashExitStatus = 3
+
+
+# Module name -> (folder, python module, factory class, factory settings)
+modules = {"AutopsyToGriffeye": ("AutopsyToGriffeye", "AutopsyToGriffeye", "AutopsyToGriffeyeFactory", {}),
+           "ExportAllImagesVideoesAudio": ("ExportAllImagesVideoesAudio", "exportAllImagesVideoesAudio", "ExportAllImagesVideoesAudioFactory", {}),
+           "ExportSystemFiles": ("ExportSystemFiles", "exportSystemFiles", "ExportSystemFilesFactory", {}),
+           "ExportSystemFilesDataSource": ("ExportSystemFiles", "exportSystemFiles", "ExportSystemFilesFactory", {"dataSourceMode": True}),
+           "ExportProfiles": ("ExportProfiles", "exportProfiles", "ExportProfilesFactory", {}),
+           "AutopsyToGriffeyeReport": ("AutopsyToGriffeyeReport", "autopsyToGriffeyeReport", "AutopsyToGriffeyeReport", {})}
+
+# MIME types used for the population
+populationMimeTypes = {"image": ["image/jpeg", "image/png", "image/gif", "image/bmp"],
+                       "movie": ["video/mp4", "video/quicktime", "video/x-msvideo"],
+                       "audio": ["audio/mpeg", "audio/wav"],
+                       "other": ["text/plain", "application/pdf", "application/x-dosexec", "application/octet-stream"]}
+populationExtensions = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/bmp": ".bmp",
+                        "video/mp4": ".mp4", "video/quicktime": ".mov", "video/x-msvideo": ".avi",
+                        "audio/mpeg": ".mp3", "audio/wav": ".wav", "text/plain": ".txt", "application/pdf": ".pdf",
+                        "application/x-dosexec": ".exe", "application/octet-stream": ".bin"}
+populationSystemNames = ["pagefile.sys", "swapfile.sys", "SAM", "SECURITY", "SOFTWARE", "SYSTEM"]
+
+
+# Population -----------------------------------------------------------------------------------------------------------------
+# Header for the start of a picture or movie of width x height, so the media
+# probe has something to read (b"" for other files)
+def mediaHeader(mimeType, width, height):
+    if(mimeType == "image/jpeg"):
+        return (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00" +
+                b"\xff\xc0" + struct.pack(">HBHHB", 17, 8, height, width, 3) + b"\x01\x22\x00\x02\x11\x01\x03\x11\x01")
+    if(mimeType == "image/png"):
+        return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sIIBBBBBI", 13, b"IHDR", width, height, 8, 2, 0, 0, 0, 0)
+    if(mimeType == "image/gif"):
+        return b"GIF89a" + struct.pack("<HHBBB", width, height, 0xf7, 0, 0)
+    if(mimeType == "image/bmp"):
+        return b"BM" + struct.pack("<IHHIIiiHH", 0, 0, 0, 54, 40, width, height, 1, 24)
+    if(mimeType in ("video/mp4", "video/quicktime")):
+        def box(kind, payload):
+            return struct.pack(">I4s", 8 + len(payload), kind) + payload
+        tkhd = box(b"tkhd", b"\0" * 76 + struct.pack(">II", width << 16, height << 16))
+        return box(b"ftyp", b"isom\0\0\0\0") + box(b"moov", box(b"trak", tkhd))
+    return b""
+
+
+def parseMix(mix):
+    result = {}
+    for part in mix.split(","):
+        kind, value = part.split("=")
+        result[kind.strip()] = float(value)
+    return result
+
+
+# Data sources of the population: the disk image, then an E01 image, a logical file set and a phone extraction
+def makeDataSources(options, number):
+    names = ["img_" + str(number) + ".001", "Laptop.E01", "LogicalFileSet1", "iPhone.zip"]
+    return [autopsyStandIns.Content(1000000000 + i, names[i % len(names)] + ("" if i < len(names) else str(i)))
+            for i in range(max(1, options.data_sources))]
+
+
+# Make synthetic files. Duplicates get the MD5 and content of an earlier file of the same kind.
+def makePopulation(options, number, dataSources):
+    rng = random.Random(options.seed)
+    mix = parseMix(options.mix)
+    kinds = sorted(mix.keys())
+    weights = [mix[kind] for kind in kinds]
+    total = sum(weights)
+    folders = ["Users", "user", "Pictures", "Downloads", "Documents", "AppData", "Local", "Temp", "Cache", "Videos", "Music"]
+    earlier = {}
+    parentIds = {}
+    population = []
+    for objectId in range(1, options.files + 1):
+        # Kind
+        pick = rng.random() * total
+        for kind, weight in zip(kinds, weights):
+            pick = pick - weight
+            if(pick <= 0):
+                break
+
+        # Path
+        depth = rng.randint(1, options.depth)
+        dataSource = dataSources[0]
+        if(len(dataSources) > 1):
+            dataSource = rng.choice(dataSources)
+        directory = dataSource.getUniquePath() + "/vol_vol2/" + "/".join(rng.choice(folders) + str(rng.randint(0, 9)) for i in range(depth))
+        if(kind == "system"):
+            name = rng.choice(populationSystemNames)
+            mimeType = "application/octet-stream"
+        else:
+            mimeType = rng.choice(populationMimeTypes[kind])
+            name = "file" + str(objectId) + populationExtensions[mimeType]
+
+        # Content
+        if(earlier.get(kind) and rng.random() < options.duplicates):
+            size, md5, seed = rng.choice(earlier[kind])
+        else:
+            size = rng.randint(options.min_size, options.max_size)
+            seed = mediaHeader(mimeType, rng.choice((640, 1024, 1920, 4032)), rng.choice((480, 768, 1080, 3024))) + ("seed" + str(objectId)).encode("utf-8")
+            md5 = hashlib.md5(seed).hexdigest()
+            earlier.setdefault(kind, []).append((size, md5, seed))
+
+        # Hash Lookup has not run for some files, and marked some as known (NSRL)
+        if(rng.random() < options.no_md5):
+            md5 = None
+        known = autopsyStandIns.TskData.FileKnown.UNKNOWN
+        if(md5 and rng.random() < options.known):
+            known = autopsyStandIns.TskData.FileKnown.KNOWN
+
+        # Folders get object ids after the files
+        parentId = parentIds.setdefault(directory, options.files + len(parentIds) + 1)
+        population.append(autopsyStandIns.AbstractFile(objectId, name, mimeType, directory + "/" + name, size, md5, seed, known=known, parentId=parentId,
+                                                       dataSource=dataSource))
+    return population
+
+
+# Write the content of the population into one raw image file per data source and give the files their ranges in it.
+# Every third file is stored in two fragments, second half first.
+def writeRawImages(population, dataSources, directory):
+    images = {}
+    for dataSource in dataSources:
+        path = os.path.join(directory, dataSource.getName() + ".raw")
+        dataSource.paths = [path]
+        images[dataSource.getId()] = open(path, "wb")
+    try:
+        for file in population:
+            image = images[file.getDataSourceObjectId()]
+            size = file.getSize()
+            buffer = bytearray(size)
+            file.read(buffer, 0, size)
+            parts = [(0, size)]
+            if(file.getId() % 3 == 0 and size > 1):
+                parts = [(size // 2, size - size // 2), (0, size // 2)]
+            ranges = []
+            for start, length in parts:
+                ranges.append((start, image.tell(), length))
+                image.write(bytes(buffer[start:start + length]))
+            file.ranges = [autopsyStandIns.TskFileRange(offset, length, sequence)
+                           for sequence, (start, offset, length) in enumerate(sorted(ranges))]
+    finally:
+        for image in images.values():
+            image.close()
+
+
+# File system call counters --------------------------------------------------------------------------------------------------
+class FileSystemCalls(object):
+
+    names = ("mkdir", "makedirs", "link", "remove", "rename", "stat", "listdir")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.saved = []
+
+    def _wrap(self, owner, name, key):
+        function = getattr(owner, name)
+        counter = self
+
+        def wrapper(*args, **kwargs):
+            counter.lock.acquire()
+            try:
+                counter.counts[key] = counter.counts.get(key, 0) + 1
+            finally:
+                counter.lock.release()
+            return function(*args, **kwargs)
+        self.saved.append((owner, name, function))
+        setattr(owner, name, wrapper)
+
+    def install(self):
+        for name in self.names:
+            if(hasattr(os, name)):
+                self._wrap(os, name, name)
+        try:
+            import __builtin__ as builtins
+        except ImportError:
+            import builtins
+        self._wrap(builtins, "open", "open")
+        import io
+        self._wrap(io, "open", "open")
+
+    def uninstall(self):
+        for owner, name, function in reversed(self.saved):
+            setattr(owner, name, function)
+        self.saved = []
+
+
+# Peak memory of this process in bytes (None if it can not be read)
+def peakMemory():
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if(sys.platform == "darwin"):
+            return maxrss
+        return maxrss * 1024
+    except ImportError:
+        pass
+    try:
+        from java.lang import Runtime
+        runtime = Runtime.getRuntime()
+        return runtime.totalMemory() - runtime.freeMemory()
+    except ImportError:
+        return None
+
+
+# Run one module -------------------------------------------------------------------------------------------------------------
+def loadModule(moduleName):
+    for name in modules:
+        folder = os.path.join(repositoryDirectory, modules[name][0])
+        if(folder not in sys.path):
+            sys.path.append(folder)
+    folder, pythonModule, factoryName, settings = modules[moduleName]
+    module = __import__(pythonModule)
+    factory = getattr(module, factoryName)
+    for name, value in settings.items():
+        setattr(factory, name, value)
+    return factory
+
+
+# Factory settings from the command line, for the module and the profiles it runs
+def configureFactories(options):
+    for name in modules:
+        folder, pythonModule, factoryName, settings = modules[name]
+        if(pythonModule not in sys.modules):
+            continue
+        factory = getattr(sys.modules[pythonModule], factoryName)
+        if(options.export_threads is not None and hasattr(factory, "exportThreads")):
+            factory.exportThreads = options.export_threads
+        if(options.dedup is not None and hasattr(factory, "dedupMode")):
+            factory.dedupMode = options.dedup
+        if(options.xml_max_records and hasattr(factory, "xmlMaxRecords")):
+            factory.xmlMaxRecords = options.xml_max_records
+        if(options.zero_copy_bytes is not None and hasattr(factory, "zeroCopyBytes")):
+            factory.zeroCopyBytes = options.zero_copy_bytes
+        if(options.xml_snapshot_seconds is not None and hasattr(factory, "xmlSnapshotSeconds")):
+            factory.xmlSnapshotSeconds = options.xml_snapshot_seconds
+        if(options.output_mode is not None and hasattr(factory, "outputMode")):
+            factory.outputMode = options.output_mode
+        if(options.archive_max_bytes is not None and hasattr(factory, "archiveMaxBytes")):
+            factory.archiveMaxBytes = options.archive_max_bytes
+        if(options.min_free_bytes is not None and hasattr(factory, "minFreeBytes")):
+            factory.minFreeBytes = options.min_free_bytes
+        if(options.space_pause_seconds is not None and hasattr(factory, "spacePauseSeconds")):
+            factory.spacePauseSeconds = options.space_pause_seconds
+        if(hasattr(factory, "resumeExport")):
+            factory.resumeExport = options.resume
+
+
+def sizeOfTree(directory):
+    size = 0
+    countFiles = 0
+    for root, directories, files in os.walk(directory):
+        for name in files:
+            size = size + os.path.getsize(os.path.join(root, name))
+            countFiles = countFiles + 1
+    return size, countFiles
+
+
+def runModule(moduleName, options):
+    autopsyStandIns.install()
+    factory = loadModule(moduleName)
+    configureFactories(options)
+
+    caseDirectory = options.case_directory or tempfile.mkdtemp(prefix="benchExport")
+    case = autopsyStandIns.Case(caseDirectory)
+    autopsyStandIns.setCase(case)
+    dataSources = makeDataSources(options, case.getNumber())
+    population = makePopulation(options, case.getNumber(), dataSources)
+    populationBytes = sum(file.getSize() for file in population)
+    if(options.raw_image):
+        writeRawImages(population, dataSources, caseDirectory)
+    case.files = population
+    case.dataSources = dataSources
+    autopsyStandIns.resetCounters()
+    autopsyStandIns.AbstractFile.failEvery = options.fail_every
+    autopsyStandIns.File.diskBytes = options.disk_bytes
+    autopsyStandIns.File.diskDirectory = caseDirectory
+
+    # Ingest threads take files from a shared iterator, like Autopsy does
+    context = autopsyStandIns.IngestJobContext(1)
+    files = iter(population)
+    filesLock = threading.Lock()
+    errors = []
+    processed = [0]
+
+    def ingestThread(ingestModule):
+        try:
+            while True:
+                filesLock.acquire()
+                try:
+                    file = next(files, None)
+                    processed[0] = processed[0] + 1
+                    if(options.crash_after and processed[0] > options.crash_after):
+                        # Crash: buffers are lost, copies stop half way
+                        os._exit(crashExitStatus)
+                finally:
+                    filesLock.release()
+                if(file is None):
+                    break
+                ingestModule.process(file)
+            ingestModule.shutDown()
+        except Exception as e:
+            errors.append(repr(e))
+
+    calls = FileSystemCalls()
+    calls.install()
+    start = time.time()
+    outputDirectory = case.getExportDirectory()
+    reportStatus = None
+    try:
+        if(hasattr(factory, "generateReport")):
+            # Report module: reads the files from the case database after the ingest
+            outputDirectory = os.path.join(caseDirectory, "Reports", "Benchmark")
+            os.makedirs(outputDirectory)
+            progressBar = autopsyStandIns.ReportProgressPanel()
+            factory().generateReport(autopsyStandIns.GeneralReportSettings(outputDirectory), progressBar)
+            reportStatus = progressBar.getStatus()
+            files = iter([])
+        elif(factory().isDataSourceIngestModuleFactory()):
+            # One call per data source
+            ingestModule = factory().createDataSourceIngestModule(None)
+            ingestModule.startUp(context)
+            for dataSource in dataSources:
+                ingestModule.process(dataSource, autopsyStandIns.DataSourceIngestModuleProgress())
+            ingestModule.shutDown()
+            files = iter([])
+        ingestModules = []
+        for i in range(options.threads if getattr(factory(), "isFileIngestModuleFactory", lambda: False)() else 0):
+            ingestModule = factory().createFileIngestModule(None)
+            ingestModule.startUp(context)
+            ingestModules.append(ingestModule)
+        threads = [threading.Thread(target=ingestThread, args=(ingestModule,)) for ingestModule in ingestModules]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        seconds = max(time.time() - start, 1e-9)
+        calls.uninstall()
+
+    bytesOnDisk, filesOnDisk = sizeOfTree(outputDirectory)
+    if(not options.keep):
+        shutil.rmtree(caseDirectory, True)
+
+    counters = dict(autopsyStandIns.counters)
+    # Bytes read from the image (ContentUtils.writeToFile and own copy loops)
+    bytesWritten = counters.get("bytesRead", 0)
+    return {"module": moduleName,
+            "moduleVersion": getattr(factory(), "getModuleVersionNumber", lambda: None)(),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "files": len(population),
+            "populationBytes": populationBytes,
+            "seconds": seconds,
+            "filesPerSecond": len(population) / seconds,
+            "bytesWritten": bytesWritten,
+            "bytesPerSecond": bytesWritten / seconds,
+            "filesOnDisk": filesOnDisk,
+            "bytesOnDisk": bytesOnDisk,
+            "syscalls": calls.counts,
+            "syscallsTotal": sum(calls.counts.values()),
+            "peakMemoryBytes": peakMemory(),
+            "autopsyCalls": counters,
+            "errors": errors,
+            "reportStatus": reportStatus,
+            "messages": [{"subject": message.subject, "details": message.details} for message in autopsyStandIns.IngestServices.getInstance().messages],
+            "caseDirectory": caseDirectory if options.keep else None}
+
+
+# Records in the Griffeye XML files and entries in the manifest of each
+# export folder below directory, and the files in the manifests that are
+# not on disk. Folders whose XML records and manifest differ are listed.
+def checkExport(directory):
+    containers = {}
+    xmlRecords = 0
+    manifestEntries = 0
+    missingFiles = 0
+    mismatches = []
+    for root, directories, files in os.walk(directory):
+        folderRecords = None
+        folderEntries = 0
+        for name in files:
+            path = os.path.join(root, name)
+            if(name.endswith(".xml") and ("_images" in name or "_movies" in name)):
+                f = open(path, "rb")
+                try:
+                    data = f.read()
+                finally:
+                    f.close()
+                folderRecords = (folderRecords or 0) + data.count(b"</Image>\n") + data.count(b"</Movie>\n")
+            elif(name.endswith("_status.json")):
+                f = open(path, "r")
+                try:
+                    status = json.load(f)
+                finally:
+                    f.close()
+                if(status.get("state") == "complete" and "manifestEntries" in status):
+                    statusRecords = status["images"]["records"] + status["movies"]["records"]
+                    if(statusRecords != status["manifestEntries"]):
+                        mismatches.append("%s: status has %d XML records, %d manifest entries" % (name, statusRecords, status["manifestEntries"]))
+            elif(name.endswith("_manifest.txt")):
+                entries = {}
+                f = open(path, "rb")
+                try:
+                    for line in f:
+                        columns = line.decode("utf-8").rstrip("\n").split("\t")
+                        if(line.endswith(b"\n") and len(columns) in (4, 5)):
+                            entries[columns[0]] = columns[3]
+                finally:
+                    f.close()
+                folderEntries = folderEntries + len(entries)
+                missingFiles = missingFiles + len([extractedFile for extractedFile in entries.values()
+                                                   if not os.path.isfile(extractedFile) and not os.path.isfile(os.path.join(root, extractedFile)) and
+                                                   not isArchiveEntry(extractedFile, containers)])
+        manifestEntries = manifestEntries + folderEntries
+        if(folderRecords is not None):
+            xmlRecords = xmlRecords + folderRecords
+            if(folderRecords != folderEntries):
+                mismatches.append("%s: %d XML records, %d manifest entries" % (os.path.relpath(root, directory), folderRecords, folderEntries))
+    return {"xmlRecords": xmlRecords, "manifestEntries": manifestEntries, "missingFiles": missingFiles, "mismatches": mismatches}
+
+
+# Is path (<container>/<entry name>) an entry of a ZIP or TAR container that
+# opens (containers: names per container, read once)
+def isArchiveEntry(path, containers):
+    for extension in (".zip", ".tar"):
+        position = path.find(extension + os.sep)
+        if(position < 0):
+            continue
+        container = path[:position + len(extension)]
+        if(container not in containers):
+            try:
+                if(extension == ".zip"):
+                    archive = zipfile.ZipFile(container)
+                    containers[container] = set(archive.namelist())
+                else:
+                    archive = tarfile.open(container)
+                    containers[container] = set(archive.getnames())
+                archive.close()
+            except Exception:
+                containers[container] = set()
+        return path[position + len(extension) + 1:] in containers[container]
+    return False
+
+
+# Kill the module after crashAfter files, resume the export in the same case
+# folder and check that the XML files and the manifest agree
+def runCrashResume(moduleName, arguments, crashAfter, keep):
+    caseDirectory = tempfile.mkdtemp(prefix="benchExport")
+    command = [sys.executable, os.path.abspath(__file__), "--in-process", "--modules", moduleName, "--case-directory", caseDirectory, "--resume"] + arguments
+    devnull = open(os.devnull, "w")
+    try:
+        status = subprocess.call(command + ["--crash-after", str(crashAfter)], stdout=devnull)
+    finally:
+        devnull.close()
+    output = subprocess.check_output(command + ["--keep"])
+    if(not isinstance(output, str)):
+        output = output.decode("utf-8")
+    result = json.loads(output)["results"][0]
+
+    check = checkExport(os.path.join(caseDirectory, "Export"))
+    check["crashedAfter"] = crashAfter
+    check["crashed"] = status == crashExitStatus
+    check["consistent"] = check["crashed"] and not check["mismatches"] and not check["missingFiles"]
+    if(not check["consistent"]):
+        result["errors"].append("crash/resume: %s, %d files missing" % ("; ".join(check["mismatches"]) or "no mismatch", check["missingFiles"]))
+    result["crashResume"] = check
+    if(not keep):
+        shutil.rmtree(caseDirectory, True)
+        result["caseDirectory"] = None
+    return result
+
+
+# Run each module in its own process and collect the JSON it prints
+def runIsolated(moduleName, arguments):
+    command = [sys.executable, os.path.abspath(__file__), "--in-process", "--modules", moduleName] + arguments
+    output = subprocess.check_output(command)
+    if(not isinstance(output, str)):
+        output = output.decode("utf-8")
+    return json.loads(output)["results"][0]
+
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(description="Benchmark export modules with stand-in Autopsy objects")
+    parser.add_argument("--modules", default="AutopsyToGriffeye,ExportAllImagesVideoesAudio,ExportSystemFiles,ExportProfiles",
+                        help="comma separated module names")
+    parser.add_argument("--files", type=int, default=5000, help="number of files in the population")
+    parser.add_argument("--mix", default="image=0.4,movie=0.1,audio=0.05,system=0.01,other=0.44",
+                        help="kind=weight for image, movie, audio, system and other")
+    parser.add_argument("--depth", type=int, default=6, help="maximum folder depth below the volume")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="share of files that repeat an earlier file")
+    parser.add_argument("--no-md5", type=float, default=0.0, help="share of files without an MD5 (Hash Lookup not run)")
+    parser.add_argument("--known", type=float, default=0.0, help="share of files Hash Lookup marked as known (NSRL)")
+    parser.add_argument("--min-size", type=int, default=1024, help="smallest file in bytes")
+    parser.add_argument("--max-size", type=int, default=256 * 1024, help="largest file in bytes")
+    parser.add_argument("--data-sources", type=int, default=1, help="number of data sources the files are spread over")
+    parser.add_argument("--raw-image", action="store_true", help="store the files in raw image files, with byte ranges")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the population")
+    parser.add_argument("--threads", type=int, default=2, help="ingest threads")
+    parser.add_argument("--export-threads", type=int, default=None, help="override exportThreads of the factories")
+    parser.add_argument("--dedup", default=None, help="override dedupMode of the factories")
+    parser.add_argument("--output-mode", default=None, help="override outputMode of the factories (files, zip or tar)")
+    parser.add_argument("--archive-max-bytes", type=int, default=None, help="override archiveMaxBytes of the factories")
+    parser.add_argument("--xml-max-records", type=int, default=0, help="override xmlMaxRecords of the factories (XML shards)")
+    parser.add_argument("--xml-snapshot-seconds", type=float, default=None,
+                        help="override xmlSnapshotSeconds of the factories (0 = close the XML files at the end)")
+    parser.add_argument("--zero-copy-bytes", type=int, default=None, help="override zeroCopyBytes of the factories")
+    parser.add_argument("--fail-every", type=int, default=0, help="every n-th file copy fails as if the disk was full")
+    parser.add_argument("--disk-bytes", type=int, default=None,
+                        help="size of a simulated export disk, free space is this less the case folder (CPython)")
+    parser.add_argument("--min-free-bytes", type=int, default=None, help="override minFreeBytes of the factories")
+    parser.add_argument("--space-pause-seconds", type=float, default=None, help="override spacePauseSeconds of the factories")
+    parser.add_argument("--crash-after", type=int, default=0,
+                        help="kill the module after this many files, resume it and check the XML files against the manifest")
+    parser.add_argument("--resume", action="store_true", help="set resumeExport of the factories (continue the export in --case-directory)")
+    parser.add_argument("--case-directory", default=None, help="case folder to use instead of a new temporary one")
+    parser.add_argument("--keep", action="store_true", help="keep the case folder with the exported files")
+    parser.add_argument("--in-process", action="store_true", help="run all modules in this process")
+    parser.add_argument("--output", default=None, help="write JSON to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    options = parseArguments(argv)
+    moduleNames = [name.strip() for name in options.modules.split(",") if name.strip()]
+    for name in moduleNames:
+        if(name not in modules):
+            raise SystemExit("Unknown module " + name + ", use one of " + ", ".join(sorted(modules)))
+
+    results = []
+    if(options.in_process):
+        for name in moduleNames:
+            results.append(runModule(name, options))
+    else:
+        # Pass on all arguments except --modules, --output and --crash-after
+        arguments = []
+        skip = False
+        for argument in argv:
+            if(skip):
+                skip = False
+                continue
+            if(argument in ("--modules", "--output", "--crash-after")):
+                skip = True
+                continue
+            if(argument.startswith("--modules=") or argument.startswith("--output=") or argument.startswith("--crash-after=")):
+                continue
+            arguments.append(argument)
+        for name in moduleNames:
+            if(options.crash_after):
+                results.append(runCrashResume(name, arguments, options.crash_after, options.keep))
+            else:
+                results.append(runIsolated(name, arguments))
+
+    report = {"benchmark": "benchExportModules", "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "population": {"files": options.files, "mix": parseMix(options.mix), "depth": options.depth,
+                             "duplicates": options.duplicates, "noMd5": options.no_md5, "known": options.known, "dataSources": options.data_sources, "minSize": options.min_size, "maxSize": options.max_size,
+                             "seed": options.seed},
+              "threads": options.threads, "results": results}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if(options.output):
+        f = open(options.output, "w")
+        f.write(text + "\n")
+        f.close()
+    else:
+        sys.stdout.write(text + "\n")
+
+    # A failed crash/resume check fails the benchmark
+    failed = [result["module"] for result in results if not result.get("crashResume", {"consistent": True})["consistent"]]
+    if(failed):
+        raise SystemExit("Crash/resume check failed for " + ", ".join(failed))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
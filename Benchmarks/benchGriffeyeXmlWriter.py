@@ -0,0 +1,132 @@
+# File: benchGriffeyeXmlWriter.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Micro-benchmark for writing Griffeye <Image> records. Compares the old way
+# (open file in append mode, one f.write per XML line, close) with
+# ExportCommon.griffeyeXmlWriter.GriffeyeXmlWriter. Runs under CPython and Jython:
+#
+#   python Benchmarks/benchGriffeyeXmlWriter.py [numberOfRecords]
+#
+# Before the benchmark, records of files with and without an MD5 are written
+# with ExportCommon.exportRecord.FileRecord and checked (no "None" in the XML).
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ExportCommon.griffeyeXmlWriter import GriffeyeXmlWriter
+from ExportCommon.griffeyeXmlWriter import imageTemplate
+from ExportCommon.exportRecord import FileRecord
+from autopsyStandIns import AbstractFile
+
+
+# Record used for all writes
+fields = {"path": "vol_vol3\\Users\\user\\Pictures\\", "name": "IMG_0001.jpg", "id": "d41d8cd98f00b204e9800998ecf8427e",
+          "fullpath": "vol_vol3\\Users\\user\\Pictures\\IMG_0001.jpg", "created": "1611231960", "accessed": "1611231960",
+          "written": "1611231960", "deleted": "0", "hash": "d41d8cd98f00b204e9800998ecf8427e",
+          "description": "Exisiting", "physicalLocation": "123456", "fileSize": "204800", "notes": "",
+          "bitDepth": "", "aspectRatio": ""}
+
+
+# Old way: open/append/close per record ---------------------------------------------------------------------------------------
+def writeLegacy(xmlFile, count):
+    f = open(xmlFile, "w")
+    f.write('<?xml version="1.0" encoding="utf-16"?>\n')
+    f.close()
+    for i in range(count):
+        f = open(xmlFile, "a")
+        f.write("		<Image>\n")
+        f.write("			<path><![CDATA[" + fields["path"] + "]]></path>\n")
+        f.write("			<picture>" + fields["name"] + "</picture>\n")
+        f.write("			<category>0</category>\n")
+        f.write("			<id>" + fields["id"] + "</id>\n")
+        f.write("			<fileoffset>0</fileoffset>\n")
+        f.write("			<fullpath><![CDATA[" + fields["fullpath"] + "]]></fullpath>\n")
+        f.write("			<created>" + fields["created"] + "</created>\n")
+        f.write("			<accessed>" + fields["accessed"] + "</accessed>\n")
+        f.write("			<written>" + fields["written"] + "</written>\n")
+        f.write("			<deleted>" + fields["deleted"] + "</deleted>\n")
+        f.write("			<hash>" + fields["hash"] + "</hash>\n")
+        f.write("			<encaseHash>0</encaseHash>\n")
+        f.write("			<myDescription>" + fields["description"] + "</myDescription>\n")
+        f.write("			<physicalLocation>" + fields["physicalLocation"] + "</physicalLocation>\n")
+        f.write("			<myUnique>0</myUnique>\n")
+        f.write("			<tagged>0</tagged>\n")
+        f.write("			<subCat></subCat>\n")
+        f.write("			<notes></notes>\n")
+        f.write("			<fileSize>" + fields["fileSize"] + "</fileSize>\n")
+        f.write("			<bitDepth></bitDepth>\n")
+        f.write("			<aspectRatio></aspectRatio>\n")
+        f.write("		</Image>\n")
+        f.close()
+    f = open(xmlFile, "a")
+    f.write('	</ReportIndex>\n')
+    f.close()
+
+
+# New way: GriffeyeXmlWriter --------------------------------------------------------------------------------------------------
+def writeBuffered(xmlFile, count):
+    writer = GriffeyeXmlWriter(xmlFile, imageTemplate)
+    writer.open()
+    for i in range(count):
+        writer.writeRecord(fields)
+    writer.close()
+
+
+# Check records made by FileRecord ------------------------------------------------------------------------------------------
+def checkRecords(workDirectory):
+    md5 = "d41d8cd98f00b204e9800998ecf8427e"
+    files = [AbstractFile(1, "IMG_0001.jpg", "image/jpeg", "/img_1.001/vol_vol3/Users/IMG_0001.jpg", 1024, md5),
+             AbstractFile(2, "IMG_0002.jpg", "image/jpeg", "/img_1.001/vol_vol3/Users/IMG_0002.jpg", 1024, None)]
+    xmlFile = os.path.join(workDirectory, "check_images.xml")
+    writer = GriffeyeXmlWriter(xmlFile, imageTemplate)
+    writer.open()
+    for file in files:
+        writer.writeRecord(FileRecord(file).getGriffeyeFields())
+    writer.close()
+    f = open(xmlFile, "rb")
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    os.remove(xmlFile)
+
+    # File with an MD5: <id> and <hash>, file without: empty values
+    assert data.count(("<id>" + md5 + "</id>").encode("utf-8")) == 1, "MD5 missing in <id>"
+    assert data.count(("<hash>" + md5 + "</hash>").encode("utf-8")) == 1, "MD5 missing in <hash>"
+    assert data.count(b"<id></id>") == 1 and data.count(b"<hash></hash>") == 1, "File without MD5 needs empty <id> and <hash>"
+    assert b"None" not in data, "None written to the XML"
+    sys.stdout.write("records    ok\n")
+
+
+# Run benchmark and print records/sec ---------------------------------------------------------------------------------------
+def run(count):
+    workDirectory = tempfile.mkdtemp()
+    checkRecords(workDirectory)
+    results = {}
+    for name, function in (("legacy", writeLegacy), ("buffered", writeBuffered)):
+        xmlFile = os.path.join(workDirectory, name + "_images.xml")
+        start = time.time()
+        function(xmlFile, count)
+        seconds = max(time.time() - start, 1e-9)
+        results[name] = count / seconds
+        os.remove(xmlFile)
+    os.rmdir(workDirectory)
+
+    for name in ("legacy", "buffered"):
+        sys.stdout.write("%-10s %12.0f records/sec\n" % (name, results[name]))
+    sys.stdout.write("speedup    %12.1fx\n" % (results["buffered"] / results["legacy"]))
+
+
+if __name__ == "__main__":
+    if(len(sys.argv) > 1):
+        run(int(sys.argv[1]))
+    else:
+        run(20000)
@@ -32,18 +32,112 @@ from org.sleuthkit.autopsy.coreutils import PlatformUtil
 from org.sleuthkit.autopsy.casemodule import Case
 from org.sleuthkit.autopsy.casemodule.services import Services
 from org.sleuthkit.autopsy.casemodule.services import FileManager
+from org.sleuthkit.autopsy.casemodule.services import Blackboard
 from org.sleuthkit.autopsy.datamodel import ContentUtils
 
 import os
+import sys
+import time
 from java.io import File
+from java.util import ArrayList
 from java.util.logging import Level
-import inspect
+
+# Shared code in ExportCommon (placed next to this folder in python_modules)
+pythonModulesDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(pythonModulesDirectory not in sys.path):
+    sys.path.append(pythonModulesDirectory)
+from ExportCommon.exportSession import ExportSession
+from ExportCommon.exportSession import ExportSessionRegistry
+from ExportCommon.exportPaths import ExportPathMapper
+from ExportCommon.exportPaths import parentPathCache
+from ExportCommon.exportWorkers import ExportWorkerPool
+from ExportCommon.exportDedup import ExportDedupIndex
+from ExportCommon.exportDedup import duplicateAlias
+from ExportCommon.exportDedup import duplicateLinked
+from ExportCommon.exportDedup import duplicateWrite
+from ExportCommon.exportManifest import ExportManifest
+from ExportCommon.exportArchive import ExportArchive
+from ExportCommon.exportCopy import formatDigests
+from ExportCommon.exportZeroCopy import ZeroCopy
+from ExportCommon.exportSpace import ExportSpace
+from ExportCommon.exportSpace import NoSpaceLeft
+from ExportCommon.exportWrite import ExportWriter
+from ExportCommon.exportWrite import spaceEvent
+from ExportCommon.artifactBatcher import ArtifactBatcher
+from ExportCommon.exportRules import ExportRules
+from ExportCommon.exportLog import ExportLogger
+from ExportCommon.exportKnown import KnownFilter
+from ExportCommon.exportRules import imageMimeTypes
+from ExportCommon.exportRules import movieMimeTypes
+from ExportCommon.exportRules import audioMimeTypes
+from ExportCommon.exportRules import sqlWhere
 
 # Copy Multimedia Factory ---------------------------------------------------------------------------------------------------
 class ExportAllImagesVideoesAudioFactory(IngestModuleFactoryAdapter):
 
     moduleName = "Export All Images Videoes and Audio"
 
+    # Export sessions shared by all ingest threads of a job
+    sessions = ExportSessionRegistry()
+
+    # Threads writing exported files (0 = write in the ingest thread) and
+    # number of files that can wait for a writer before process() blocks
+    exportThreads = 4
+    exportQueueSize = 256
+
+    # Files with the same MD5 as a file already exported: "link" = hardlink
+    # to the first copy, "once" = write only the first copy (the others are
+    # listed with it as their exported file), "off" = write all
+    dedupMode = "link"
+
+    # Continue an earlier export: skip files listed in the manifest
+    # (False = start the export from scratch)
+    resumeExport = True
+
+    # Blackboard artifacts are indexed and announced to the UI in batches of
+    # artifactBatchSize, or every artifactBatchSeconds
+    artifactBatchSize = 100
+    artifactBatchSeconds = 5.0
+
+    # Hashes computed while copying, see exportWrite.py ([] = none)
+    inlineHashes = ["md5"]
+
+    # Skip files Hash Lookup has marked as known (NSRL) and files with an MD5
+    # in one of knownHashSetFiles (text files with one MD5 per line, or NSRL
+    # CSV), before any folder is made or anything is copied
+    skipKnownFiles = True
+    knownHashSetFiles = []
+
+    # Export each data source (disk image, E01, logical file set, phone
+    # extraction) into its own folder named after the data source (False =
+    # all data sources into one tree)
+    dataSourceFolders = True
+
+    # Copy files of streamCopyBytes or more in chunks, runs of zeros as holes
+    streamCopyBytes = 64 * 1024 * 1024
+    copyChunkBytes = 8 * 1024 * 1024
+    sparseCopy = True
+
+    # Copy files of zeroCopyBytes or more straight from local raw images
+    zeroCopy = True
+    zeroCopyBytes = 1024 * 1024
+
+    # Free space to keep on the export disk, and seconds to wait for it
+    # before the export stops (0 = write until the disk is full)
+    minFreeBytes = 1024 * 1024 * 1024
+    spacePauseSeconds = 300
+
+    # "files" = one file per exported file, in the folders of the image.
+    # "zip" or "tar" = stored (not compressed) entries in containers of at
+    # most archiveMaxBytes, each with an index of where its entries are.
+    # Duplicates are written once in archives and listed in the index as
+    # aliases of the first entry (dedupMode "link" acts as "once").
+    # A writer copies a file into a spool (in memory up to archiveSpoolBytes,
+    # else a temporary file in the export directory) before it is appended.
+    outputMode = "files"
+    archiveMaxBytes = 4 * 1000 * 1000 * 1000
+    archiveSpoolBytes = 8 * 1024 * 1024
+
     def getModuleDisplayName(self):
         return self.moduleName
 
@@ -61,35 +155,22 @@ class ExportAllImagesVideoesAudioFactory(IngestModuleFactoryAdapter):
     def createFileIngestModule(self, ingestOptions):
         return ExportAllImagesVideoesAudio()
 
-# Copy Multimedia ----------------------------------------------------------------------------------------------------------
-class ExportAllImagesVideoesAudio(FileIngestModule):
-
-    _logger = Logger.getLogger(ExportAllImagesVideoesAudioFactory.moduleName)
+# Copy Multimedia Session --------------------------------------------------------------------------------------------------
+class ExportAllImagesVideoesAudioSession(ExportSession):
 
-    def log(self, level, msg):
-        self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
+    _logger = ExportLogger(Logger.getLogger(ExportAllImagesVideoesAudioFactory.moduleName), Level.WARNING)
 
-    # Startup
-    def startUp(self, context):
-        self.filesFound = 0
-
-        # List of images and videoes
-        self.listOfMimeToCopy = ['image/bmp','image/gif', 'image/heic', 'image/jpeg', 'image/png', 'image/tiff',
-                                'image/vnd.adobe.photoshop', 'image/x-raw-nikon', 'image/x-ms-bmp', 'image/x-icon', 'image/webp',
-                                'image/vnd.microsoft.icon', 'image/x-rgb', 'image/x-ms-bmp','image/x-xbitmap','image/x-portable-graymap',
-                                'image/x-portable-bitmap', 
-                                'video/webm', 'video/3gpp', 'video/3gpp2', 'video/ogg','video/mpeg', 
-                                'video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/x-flv', 'video/x-m4v', 
-                                'video/x-ms-wmv', 
-                                'audio/midi', 'audio/mpeg', 'audio/webm', 'audio/ogg', 'audio/wav', 
-                                'audio/vnd.wave', 'audio/x-ms-wma']
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
 
+    # Open (first ingest thread of the job)
+    def open(self):
         # Export directory (C:\Users\user\Documents\cases\1568795\Autopsy\1568795_2020_5060_90_1_sofias_pc\Export)
         exportDirectory = Case.getCurrentCase().getExportDirectory()
         caseName = Case.getCurrentCase().getName()
         number = Case.getCurrentCase().getNumber()
 
-	# Export make C:\Users\user\Documents\cases\1568795\
+        # Export make C:\Users\user\Documents\cases\1568795\
         exportDirectory = exportDirectory.replace("\\Autopsy", "");
         exportDirectory = exportDirectory.replace("\\" + str(number), "");
         exportDirectory = exportDirectory.replace("\\Export", "");
@@ -99,7 +180,7 @@ class ExportAllImagesVideoesAudio(FileIngestModule):
         except:
                 pass
 
-	# Export make C:\Users\user\Documents\cases\1568795\Img_video_audio
+        # Export make C:\Users\user\Documents\cases\1568795\Img_video_audio
         exportDirectory = os.path.join(exportDirectory, "Img_video_audio")
         self.log(Level.INFO, "==> 2) exportDirectory=" + str(exportDirectory) + " number=" + str(number))
         try: 
@@ -107,7 +188,7 @@ class ExportAllImagesVideoesAudio(FileIngestModule):
         except:
                 pass
 
-	# Export make C:\Users\user\Documents\cases\1568795\Img_video_audio\1568795_2020_5060_90_1_sofias_pc
+        # Export make C:\Users\user\Documents\cases\1568795\Img_video_audio\1568795_2020_5060_90_1_sofias_pc
         exportDirectory = os.path.join(exportDirectory, number)
         self.log(Level.INFO, "==> 3) exportDirectory=" + str(exportDirectory) + " number=" + str(number))
         try: 
@@ -115,12 +196,133 @@ class ExportAllImagesVideoesAudio(FileIngestModule):
         except:
                 pass
 
+        # Manifest of exported files
+        self.manifest = ExportManifest(os.path.join(exportDirectory, str(number) + "_manifest.txt"))
+        self.manifest.open(ExportAllImagesVideoesAudioFactory.resumeExport)
+
+        # Free space on the disk of the export, and will the files in the
+        # case database fit (less what is exported already)
+        self.space = ExportSpace(exportDirectory, ExportAllImagesVideoesAudioFactory.minFreeBytes, ExportAllImagesVideoesAudioFactory.spacePauseSeconds,
+                                  spaceEvent(ExportAllImagesVideoesAudioFactory.moduleName, self.log))
+        try:
+            self.space.checkStart(Case.getCurrentCase().getSleuthkitCase(), sqlWhere(imageMimeTypes | movieMimeTypes | audioMimeTypes), self.context.getDataSource(),
+                                  sum(entry.size for entry in self.manifest.entries.values()))
+        except:
+            self.log(Level.WARNING, "Could not estimate the size of the export: %s", sys.exc_info()[1])
+
+        # Export paths, one folder per data source
+        self.pathMapper = ExportPathMapper(exportDirectory, ExportAllImagesVideoesAudioFactory.dataSourceFolders)
+
+        # Parent folder cache shared by the export modules (object ids are per case)
+        parentPathCache.useCase(Case.getCurrentCase().getCaseDirectory())
+        self.parentCacheStats = parentPathCache.getStats()
+
+        # Known-good files are skipped (hash sets are read once per job)
+        self.knownFilter = KnownFilter(TskData.FileKnown.KNOWN if ExportAllImagesVideoesAudioFactory.skipKnownFiles else None, ExportAllImagesVideoesAudioFactory.knownHashSetFiles)
+        for hashSetFile, error in self.knownFilter.load():
+            self.log(Level.WARNING, "Could not read known hash set %s: %s", hashSetFile, error)
+        if(self.knownFilter.hashSet.count):
+            self.log(Level.INFO, "==> %d hashes in known hash sets", self.knownFilter.hashSet.count)
+
+        # Export writer threads
+        self.exportPool = ExportWorkerPool(ExportAllImagesVideoesAudioFactory.moduleName, ExportAllImagesVideoesAudioFactory.exportThreads, ExportAllImagesVideoesAudioFactory.exportQueueSize)
+        self.exportPool.start()
+
+        # Copies straight from raw images (image files looked up once per job)
+        self.zeroCopy = None
+        if(ExportAllImagesVideoesAudioFactory.zeroCopy):
+            self.zeroCopy = ZeroCopy(ExportAllImagesVideoesAudioFactory.zeroCopyBytes)
+
+        # Archive containers instead of files
+        self.archive = None
+        dedupMode = ExportAllImagesVideoesAudioFactory.dedupMode
+        if(ExportAllImagesVideoesAudioFactory.outputMode != "files"):
+            # A container has no hardlinks: duplicates are listed in the
+            # index as aliases of the first entry (dedupMode "link" acts as "once")
+            if(dedupMode == "link"):
+                dedupMode = "once"
+            self.archive = ExportArchive(exportDirectory, str(number), ExportAllImagesVideoesAudioFactory.outputMode, ExportAllImagesVideoesAudioFactory.archiveMaxBytes,
+                                         ExportAllImagesVideoesAudioFactory.archiveSpoolBytes, dedupMode != "off")
+            self.archive.open()
+            for container, count in self.archive.repaired:
+                self.log(Level.WARNING, "Archive container %s was not closed (crash), repaired with %d index lines", container, count)
+            self.count("archiveContainersRepaired", len(self.archive.repaired))
+
+        # MD5 -> first exported copy, for the whole job
+        self.dedupIndex = ExportDedupIndex(dedupMode)
+        for entry in self.manifest.entries.values():
+            self.dedupIndex.addWritten(entry.md5, entry.extractedFile)
+
+        # Pass parameter
+        self.exportDirectoryGlobal = exportDirectory;
+        self.profileFileGlobal = os.path.join(exportDirectory, str(number) + "_profile")
+
+    # Close (last ingest thread of the job)
+    def close(self):
+        # Wait for the export writers
+        self.exportPool.close()
+        if(self.archive is not None):
+            self.archive.close()
+            self.count("archiveContainers", self.archive.countContainers)
+            self.count("archiveEntries", self.archive.countEntries)
+            self.count("archiveAliases", self.archive.countAliases)
+        self.manifest.close()
+
+        # Write profile of the job (time per stage, counters, errors)
+        for name, value in parentPathCache.getStatsSince(self.parentCacheStats).items():
+            self.count(name, value)
+        self.count("duplicates", self.dedupIndex.countDuplicates)
+        self.count("bytesSavedByDedup", self.dedupIndex.bytesSaved)
+        self.count("writeFailures", self.exportPool.countFailures)
+        self.count("bytesReserved", self.space.bytesReserved)
+        self.count("spacePauses", self.space.countPauses)
+        try:
+            self.stats.writeProfile(self.profileFileGlobal)
+        except:
+            self.log(Level.WARNING, "Could not write profile %s", self.profileFileGlobal)
+
+        # Log summaries of repeated errors
+        self._logger.flush()
+
+
+# Copy Multimedia ----------------------------------------------------------------------------------------------------------
+class ExportAllImagesVideoesAudio(FileIngestModule):
+
+    # Same logger as the session, so repeated errors are counted for the whole job
+    _logger = ExportAllImagesVideoesAudioSession._logger
 
-	# Pass parameter
-	self.exportDirectoryGlobal = exportDirectory;
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
+
+    # Startup
+    def startUp(self, context):
+        # Images, videoes and audio
+        self.rules = ExportRules()
+        self.addRules(self.rules)
+
+        # Export session shared with the other ingest threads of this job
+        self.session = ExportAllImagesVideoesAudioFactory.sessions.acquire(context, ExportAllImagesVideoesAudioSession)
+
+        # Writes the files (large copies stop when the job is cancelled)
+        self.writer = ExportWriter(self.session, ExportAllImagesVideoesAudioFactory, self.log, context.fileIngestIsCancelled)
+
+        # Artifacts made by this ingest thread
+        self.artifacts = ArtifactBatcher(self.writer.postArtifacts, ExportAllImagesVideoesAudioFactory.artifactBatchSize, ExportAllImagesVideoesAudioFactory.artifactBatchSeconds)
 
         pass
 
+    # Add the files this module wants to the rule table (also used by Export Profiles)
+    def addRules(self, rules):
+        rules.addMimeTypes(imageMimeTypes | movieMimeTypes | audioMimeTypes, self, "Images, videoes and audio")
+
+
+    # Skip a known-good file (counted as skippedKnown or skippedHashSet)
+    def skipKnown(self, file):
+        reason = self.session.knownFilter.check(file)
+        if(reason is None):
+            return False
+        self.session.count(reason)
+        return True
 
     # Process
     def process(self, file):
@@ -128,75 +330,136 @@ class ExportAllImagesVideoesAudio(FileIngestModule):
         if ((file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNALLOC_BLOCKS) or
             (file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNUSED_BLOCKS) or
             (file.isFile() == False)):
+            self.session.count("skippedNonFile")
+            return IngestModule.ProcessResult.OK
+
+        # Images, videoes and audio
+        stats = self.session.stats
+        start = time.time()
+        matches = self.rules.classify(file.getMIMEType())
+        stats.addTime("classify", start)
+        if(not matches):
             return IngestModule.ProcessResult.OK
 
-        # Blackboard
-        blackboard = Case.getCurrentCase().getServices().getBlackboard()
-
-
-
-
-        # For an example, we will flag files with .txt in the name and make a blackboard artifact.
-        if(file.getMIMEType() in self.listOfMimeToCopy):
-
-                # Recreate path
-                uniquePathFullLinux = file.getUniquePath();
-                
-                # Recreate path Windows
-                uniquePathFullWindows = uniquePathFullLinux.replace("/", "\\")
-                uniquePathFullWindows = uniquePathFullWindows[1:]
-                
-                fileName = os.path.basename(uniquePathFullWindows)
-                uniquePathWindows = uniquePathFullWindows.replace(fileName, "");
-		
-		# uniquePathWindows = img_1568795_2020_5060_90_1_sofias_pc.001\vol_vol3\ProgramData\Microsoft\Windows\SystemData\S-1-5-21-1960575443-3642755368-4161086620-1001\ReadOnly\LockScreen_W\
-		# Remove "img_1568795_2020_5060_90_1_sofias_pc.001\"
-                # self.log(Level.INFO, "==> 4) uniquePathWindows=" + str(uniquePathWindows))
-		replaceImgName = "img_" + str(Case.getCurrentCase().getNumber()) + ".001\\"
-                uniquePathWindows = uniquePathWindows.replace(replaceImgName, "");
-		
-
-                # Create directory
-                splitDir = uniquePathWindows.split("\\")
-                pathToCreate = os.path.join(self.exportDirectoryGlobal, "")
-                for directory in splitDir:
-                        directory = directory.replace(":", "")
-                        pathToCreate = os.path.join(pathToCreate, directory)
-                        # self.log(Level.INFO, "==> directory=" + str(directory) + " pathToCreate=" + str(pathToCreate))
-
-                        try: 
-                                os.mkdir(pathToCreate)
-                        except:
-                                pass
-
-                # Write file
-                try:
-                        extractedFile = os.path.join(pathToCreate, file.getName())
-                        ContentUtils.writeToFile(file, File(extractedFile))
-                except:
-                        self.log(Level.SEVERE, "Error writing File " + file.getName() + " to " + extractedFile)
-
-                # Make artifact on blackboard
-                art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
-                att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, ExportAllImagesVideoesAudioFactory.moduleName, "Images, videoes and audio")
-                art.addAttribute(att)
-
-                # Index artifact
-                try:
-                        # index the artifact for keyword search
-                        blackboard.indexArtifact(art)
-                except Blackboard.BlackboardException as e:
-                        self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-                # UI
-                IngestServices.getInstance().fireModuleDataEvent(ModuleDataEvent(ExportAllImagesVideoesAudioFactory.moduleName, BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT, None))
+        # Known-good files
+        start = time.time()
+        skip = self.skipKnown(file)
+        stats.addTime("known", start)
+        if(skip):
+            return IngestModule.ProcessResult.OK
+
+        start = time.time()
+        parent = parentPathCache.getParent(file)
+        stats.addTime("uniquePath", start)
+        for profile, kind in matches:
+            self.exportMatch(file, kind, parent)
 
         return IngestModule.ProcessResult.OK
 
+    # Export an image, video or audio file
+    def exportMatch(self, file, kind, parent):
+        # Skip files exported by an earlier run
+        if(self.session.manifest.contains(file.getId(), file.getSize(), file.getMd5Hash())):
+            self.session.count("skippedExported")
+            return
+
+        # Write file (the directory is created by the path mapper, in
+        # archive mode extractedFile is the name of the entry)
+        extractedFile = file.getName()
+        try:
+                if(self.session.space.stopped):
+                        raise NoSpaceLeft(self.session.space.message)
+                start = time.time()
+                if(self.session.archive is not None):
+                        extractedFile = self.session.pathMapper.getEntryNameForParent(parent, file.getName())
+                else:
+                        extractedFile = self.session.pathMapper.getExportFileForParent(parent, file.getName())
+                self.session.stats.addTime("directory", start)
+                self.exportFile(file, extractedFile, file.getMd5Hash())
+        except NoSpaceLeft:
+                self.session.count("skippedNoSpace")
+        except:
+                self.session.stats.countError("directory", sys.exc_info()[1])
+                self.log(Level.SEVERE, "Error writing File %s to %s", file.getName(), extractedFile)
+
+        # Count
+        self.session.count("filesFound")
+
+        # Make artifact on blackboard
+        art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
+        att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, ExportAllImagesVideoesAudioFactory.moduleName, kind)
+        art.addAttribute(att)
+
+        # Index artifact and update UI (in batches)
+        self.artifacts.add(art)
+
+    # Export file: write it, or link it to an earlier copy with the same MD5
+    def exportFile(self, file, extractedFile, md5):
+        duplicate = lambda source, action: self.exportDuplicate(source, action, file, extractedFile, md5)
+        if(self.session.dedupIndex.addFile(md5, extractedFile, file, file.getSize(), duplicate)):
+            self.session.exportPool.submit(extractedFile, self.writeFile, file, extractedFile, md5)
+
+    # Duplicate of an exported file (see exportDedup.py). It is added to the
+    # manifest when its hardlink or copy is on disk, in dedupMode "once" with
+    # the first copy as its exported file (in archive mode an alias of the
+    # first entry in the container index).
+    def exportDuplicate(self, source, action, file, extractedFile, md5):
+        if(action == duplicateAlias and self.session.archive is not None):
+            source = self.session.archive.addAlias(extractedFile, file, md5)
+            if(source is None):
+                # No entry with the MD5 in the containers: written as an entry
+                self.session.exportPool.submit(extractedFile, self.writeFile, file, extractedFile, md5)
+                return
+        if(action in (duplicateLinked, duplicateAlias)):
+            if(action == duplicateAlias):
+                extractedFile = source
+            start = time.time()
+            self.session.manifest.add(file.getId(), file.getSize(), md5, extractedFile)
+            self.session.stats.addTime("manifest", start)
+        elif(action == duplicateWrite):
+            # The first copy could not be written: this one is written from
+            # the image, and is the first copy of the others
+            self.exportFile(file, extractedFile, md5)
+        else:
+            self.session.exportPool.submit(extractedFile, self.copyDuplicate, source, file, extractedFile, md5)
+
+    # Copy the first copy to a duplicate that could not be hardlinked (runs
+    # in an export writer thread)
+    def copyDuplicate(self, source, file, extractedFile, md5):
+        if(not self.writer.copyDuplicate(source, file.getSize(), extractedFile)):
+            return
+        start = time.time()
+        self.session.manifest.add(file.getId(), file.getSize(), md5, extractedFile)
+        self.session.stats.addTime("manifest", start)
+
+    # Write file (runs in an export writer thread)
+    def writeFile(self, file, extractedFile, md5=None):
+        extractedFile, result = self.writer.writeFile(file, extractedFile, md5, self.writer.getAlgorithms(md5))
+        if(result is None):
+            return
+
+        # The MD5 is computed while writing when Hash Lookup has not given one
+        start = time.time()
+        self.session.manifest.add(file.getId(), file.getSize(), md5 or result.digests.get("md5"), extractedFile, formatDigests(result.digests))
+        self.session.stats.addTime("manifest", start)
+
     # Shutdown
     def shutDown(self):
-        # As a final part of this example, we'll send a message to the ingest inbox with the number of files found (in this thread)
+        # Post artifacts made by this ingest thread
+        self.artifacts.flush()
+
+        # Only the last ingest thread of the job reports
+        if(not ExportAllImagesVideoesAudioFactory.sessions.release(self.session)):
+            return
+
+        # As a final part, we'll send a message to the ingest inbox with the number of files found (in all threads)
+        messageType = IngestMessage.MessageType.DATA
+        spaceMessage = ""
+        if(self.session.space.stopped):
+            messageType = IngestMessage.MessageType.ERROR
+            spaceMessage = self.session.space.message + ", " + str(self.session.getCount("skippedNoSpace")) + " files not written. "
         message = IngestMessage.createMessage(
-            IngestMessage.MessageType.DATA, ExportAllImagesVideoesAudioFactory.moduleName,
-                str(self.filesFound) + " files found")
+            messageType, ExportAllImagesVideoesAudioFactory.moduleName,
+                spaceMessage + str(self.session.getCount("filesFound")) + " files found, " + str(self.session.dedupIndex.countDuplicates) + " duplicates, " + str(self.session.exportPool.countFailures) + " could not be written, " + str(self.session.getCount("skippedExported")) + " exported before, " + str(self.session.getCount("skippedKnown") + self.session.getCount("skippedHashSet")) + " known skipped",
+                self.session.stats.summary())
         ingestServices = IngestServices.getInstance().postMessage(message)
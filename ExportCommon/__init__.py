@@ -0,0 +1,13 @@
+# File: __init__.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Shared code used by the export ingest modules (AutopsyToGriffeye,
+# ExportAllImagesVideoesAudio and ExportSystemFiles). Place this folder next
+# to the module folders in C:\Users\user\AppData\Roaming\autopsy\python_modules
+#
+# Nothing in this package imports Autopsy classes at module level, so it can
+# also be loaded by the scripts in Benchmarks.
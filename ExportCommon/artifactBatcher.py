@@ -0,0 +1,45 @@
+# File: artifactBatcher.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Collects the blackboard artifacts made by one ingest thread and hands them
+# to postFunction in batches, instead of indexing each artifact and refreshing
+# the UI once per file. A batch is posted when it holds batchSize artifacts or
+# when batchSeconds have passed since the last post. flush() posts the rest
+# and is called from shutDown().
+
+import time
+
+
+# Artifact Batcher -----------------------------------------------------------------------------------------------------------
+class ArtifactBatcher(object):
+
+    # Default batch thresholds
+    defaultBatchSize = 100
+    defaultBatchSeconds = 5.0
+
+    def __init__(self, postFunction, batchSize=None, batchSeconds=None):
+        self.postFunction = postFunction
+        self.batchSize = batchSize or self.defaultBatchSize
+        self.batchSeconds = batchSeconds or self.defaultBatchSeconds
+        self.countPosted = 0
+        self._artifacts = []
+        self._lastPost = time.time()
+
+    # Add artifact, posts the batch when it is full or old enough
+    def add(self, artifact):
+        self._artifacts.append(artifact)
+        if(len(self._artifacts) >= self.batchSize or time.time() - self._lastPost >= self.batchSeconds):
+            self.flush()
+
+    # Post collected artifacts
+    def flush(self):
+        artifacts = self._artifacts
+        self._artifacts = []
+        self._lastPost = time.time()
+        if(artifacts):
+            self.countPosted = self.countPosted + len(artifacts)
+            self.postFunction(artifacts)
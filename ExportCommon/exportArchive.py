@@ -0,0 +1,471 @@
+# File: exportArchive.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Writes exported files into ZIP or TAR containers instead of one file per
+# exported file, so millions of small pictures cost a few large files on the
+# case storage and in the transfer to the analysis workstation.
+#
+# - Entries are stored, not compressed (pictures and movies are compressed
+#   already), and streamed from the image in chunks (see exportCopy.py).
+# - A new container is started when the next entry would make the current
+#   one larger than maxBytes: <number>_0001.zip, <number>_0002.zip, ..
+#   Numbers of containers from an earlier run are not reused.
+# - Next to each container an index (<container>.index.txt) has one line per
+#   entry:
+#
+#     <data offset> TAB <size> TAB <md5 or -> TAB <object id> TAB <entry name>
+#
+#   Entries are stored, so bytes offset..offset+size of the container are
+#   the file, it can be read without scanning the archive.
+# - With aliases, a file with the same MD5 as an entry is not written again:
+#   addAlias() adds a line with its own object id and name and the offset
+#   and size of the first entry to the index of the container that holds
+#   it. The name of an alias is only in the index, not in the container.
+#
+# ZIP containers use ZIP64 for entries and containers of 4 GB or more. TAR
+# containers use PAX headers (long and non-ASCII names, files over 8 GB).
+#
+# One archive is shared by the export writer threads of a job. Each writer
+# copies its file out of the image into a spool file first (in memory up to
+# spoolBytes, else a temporary file in the export directory), without the
+# archive lock. The lock is only held to append the spooled entry, with the
+# header that has its final size and CRC, to the container.
+#
+# The index line of an entry is written right after the entry. When an
+# export crashes, a ZIP container has no central directory and a TAR
+# container no end blocks. open() repairs such containers from their index:
+# the container is cut after the last entry in the index, and the central
+# directory (ZIP) or the end blocks (TAR) are written.
+
+import codecs
+import os
+import re
+import shutil
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+
+from ExportCommon.exportCopy import streamContent
+
+
+# Archive formats
+archiveFormats = ("zip", "tar")
+
+# Entries up to this size are spooled in memory, larger ones in a temporary file
+defaultSpoolBytes = 8 * 1024 * 1024
+
+# Bytes per read when a spooled entry is appended to the container
+spoolChunkBytes = 1024 * 1024
+
+
+# DOS date and time of a ZIP entry
+def dosDateTime(mtime):
+    t = time.localtime(mtime or 0)
+    if(t.tm_year < 1980):
+        return (1 << 5) | 1, 0
+    return (((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday,
+            (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2))
+
+
+# Lines of an index (bytes, split on "\n" only: names can have other line breaks)
+def readIndexLines(indexFile):
+    f = open(indexFile, "rb")
+    try:
+        return f.read().split(b"\n")
+    finally:
+        f.close()
+
+
+# Index lines of a container (complete lines): (data offset, size, md5, name)
+def readIndex(indexFile):
+    entries = []
+    lines = readIndexLines(indexFile)
+    for line in lines[:-1]:
+        columns = line.decode("utf-8", "replace").split(u"\t", 4)
+        if(len(columns) != 5):
+            break
+        try:
+            entries.append((int(columns[0]), int(columns[1]), columns[2], columns[4]))
+        except ValueError:
+            break
+    return entries
+
+
+# Keep the first count lines of an index
+def truncateIndex(indexFile, count):
+    lines = readIndexLines(indexFile)[:count]
+    f = open(indexFile, "wb")
+    try:
+        f.write(b"".join(line + b"\n" for line in lines))
+    finally:
+        f.close()
+
+
+# ZIP container --------------------------------------------------------------------------------------------------------------
+class _ZipContainer(object):
+
+    extension = ".zip"
+    limit = 0xFFFFFFFF
+
+    # mode "r+b" continues a container (repair)
+    def __init__(self, path, mode="wb"):
+        self.path = path
+        self._file = open(path, mode)
+        self._entries = []
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def countEntries(self):
+        return len(self._entries)
+
+    # Bytes an entry adds besides its content
+    def overhead(self, name):
+        return 2 * (46 + len(name.encode("utf-8")) + 28)
+
+    def _localHeader(self, name, crc, size, date, dosTime, zip64):
+        if(zip64):
+            extra = struct.pack("<HHQQ", 1, 16, size, size)
+            size = self.limit
+        else:
+            extra = b""
+        return struct.pack("<IHHHHHIIIHH", 0x04034b50, 45 if zip64 else 20, 0x0800, 0, dosTime, date,
+                           crc, size, size, len(name), len(extra)) + name + extra
+
+    # Append one entry of size bytes from spool (result has the crc32).
+    # Returns the data offset.
+    def add(self, name, size, mtime, spool, result):
+        name = name.encode("utf-8")
+        date, dosTime = dosDateTime(mtime)
+        crc = int(result.digests.pop("crc32"), 16)
+        offset = self._file.tell()
+        header = self._localHeader(name, crc, size, date, dosTime, size >= self.limit)
+        try:
+            self._file.write(header)
+            shutil.copyfileobj(spool, self._file, spoolChunkBytes)
+        except:
+            self._file.seek(offset)
+            self._file.truncate()
+            raise
+        self._entries.append((name, crc, size, offset, date, dosTime))
+        return offset + len(header)
+
+    # Is the central directory there (end of central directory record at
+    # the end, the containers have no comment)
+    @staticmethod
+    def isComplete(path):
+        if(os.path.getsize(path) < 22):
+            return False
+        f = open(path, "rb")
+        try:
+            f.seek(-22, 2)
+            return f.read(4) == struct.pack("<I", 0x06054b50)
+        finally:
+            f.close()
+
+    # Container of a run that crashed: keep the entries in the index whose
+    # local header is found, cut the rest and write the central directory.
+    # Returns the number of index lines kept (entries and aliases).
+    @classmethod
+    def repair(cls, path, entries):
+        container = cls(path, "r+b")
+        fileSize = os.path.getsize(path)
+        end = 0
+        count = 0
+        for dataOffset, size, md5, name in entries:
+            # Alias of an entry before it
+            if(dataOffset + size <= end):
+                count = count + 1
+                continue
+            name = name.encode("utf-8")
+            header = None
+            for extraLength in (0, 20):
+                headerOffset = dataOffset - 30 - len(name) - extraLength
+                if(headerOffset < end or dataOffset + size > fileSize):
+                    continue
+                container._file.seek(headerOffset)
+                values = struct.unpack("<IHHHHHIIIHH", container._file.read(30))
+                if(values[0] == 0x04034b50 and values[9] == len(name) and values[10] == extraLength):
+                    header = values
+                    break
+            if(header is None):
+                break
+            container._entries.append((name, header[6], size, headerOffset, header[5], header[4]))
+            end = dataOffset + size
+            count = count + 1
+        container._file.seek(end)
+        container._file.truncate()
+        container.close()
+        return count
+
+    # Write the central directory and close
+    def close(self):
+        start = self._file.tell()
+        for name, crc, size, offset, date, dosTime in self._entries:
+            values = []
+            if(size >= self.limit):
+                values.extend((size, size))
+            if(offset >= self.limit):
+                values.append(offset)
+            extra = b""
+            if(values):
+                extra = struct.pack("<HH" + "Q" * len(values), 1, 8 * len(values), *values)
+            self._file.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014b50, 45, 45 if values else 20, 0x0800, 0,
+                                         dosTime, date, crc, min(size, self.limit), min(size, self.limit),
+                                         len(name), len(extra), 0, 0, 0, 0, min(offset, self.limit)) + name + extra)
+        end = self._file.tell()
+        count = len(self._entries)
+
+        if(count >= 0xFFFF or start >= self.limit or end - start >= self.limit):
+            self._file.write(struct.pack("<IQHHIIQQQQ", 0x06064b50, 44, 45, 45, 0, 0, count, count, end - start, start))
+            self._file.write(struct.pack("<IIQI", 0x07064b50, 0, end, 1))
+        self._file.write(struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                                     min(end - start, self.limit), min(start, self.limit), 0))
+        self._file.close()
+
+
+# TAR container --------------------------------------------------------------------------------------------------------------
+class _TarContainer(object):
+
+    extension = ".tar"
+
+    # mode "r+b" continues a container (repair)
+    def __init__(self, path, mode="wb"):
+        self.path = path
+        self._file = open(path, mode)
+        self._count = 0
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def countEntries(self):
+        return self._count
+
+    # Bytes an entry adds besides its content
+    def overhead(self, name):
+        return 3 * tarfile.BLOCKSIZE + 2 * len(name.encode("utf-8"))
+
+    # Append one entry of size bytes from spool. Returns the data offset.
+    def add(self, name, size, mtime, spool, result):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime or 0)
+        info.mode = 0o644
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8")
+
+        offset = self._file.tell()
+        try:
+            self._file.write(header)
+            shutil.copyfileobj(spool, self._file, spoolChunkBytes)
+
+            # Pad to a whole block
+            remainder = size % tarfile.BLOCKSIZE
+            if(remainder):
+                self._file.write(b"\0" * (tarfile.BLOCKSIZE - remainder))
+        except:
+            self._file.seek(offset)
+            self._file.truncate()
+            raise
+        self._count = self._count + 1
+        return offset + len(header)
+
+    # Are the end of archive blocks there
+    @staticmethod
+    def isComplete(path):
+        size = os.path.getsize(path)
+        if(size < 2 * tarfile.BLOCKSIZE or size % tarfile.BLOCKSIZE):
+            return False
+        f = open(path, "rb")
+        try:
+            f.seek(-2 * tarfile.BLOCKSIZE, 2)
+            return f.read() == b"\0" * (2 * tarfile.BLOCKSIZE)
+        finally:
+            f.close()
+
+    # Container of a run that crashed: cut after the last entry in the index
+    # and write the end blocks. Returns the number of index lines kept
+    # (entries and aliases).
+    @classmethod
+    def repair(cls, path, entries):
+        container = cls(path, "r+b")
+        fileSize = os.path.getsize(path)
+        end = 0
+        count = 0
+        for dataOffset, size, md5, name in entries:
+            # Alias of an entry before it
+            if(dataOffset + size <= end):
+                count = count + 1
+                continue
+            if(dataOffset < end or dataOffset + size > fileSize):
+                break
+            end = dataOffset + size
+            if(end % tarfile.BLOCKSIZE):
+                end = end + tarfile.BLOCKSIZE - end % tarfile.BLOCKSIZE
+            count = count + 1
+        container._file.seek(end)
+        container._file.truncate()
+        container.close()
+        return count
+
+    # Write the end of archive blocks and close
+    def close(self):
+        self._file.write(b"\0" * (2 * tarfile.BLOCKSIZE))
+        self._file.close()
+
+
+# Export Archive -------------------------------------------------------------------------------------------------------------
+class ExportArchive(object):
+
+    # Default size of a container
+    defaultMaxBytes = 4 * 1000 * 1000 * 1000
+
+    containerClasses = {"zip": _ZipContainer, "tar": _TarContainer}
+
+    # directory: directory the containers are written to
+    # baseName: first part of the container names, for example the case number
+    # archiveFormat: "zip" or "tar"
+    # aliases: keep where the entry of each MD5 is, for addAlias()
+    def __init__(self, directory, baseName, archiveFormat="zip", maxBytes=None, spoolBytes=None, aliases=False):
+        if(archiveFormat not in self.containerClasses):
+            raise ValueError("Unknown archive format " + str(archiveFormat))
+        self.directory = directory
+        self.baseName = baseName
+        self.containerClass = self.containerClasses[archiveFormat]
+        self.maxBytes = maxBytes or self.defaultMaxBytes
+        self.spoolBytes = spoolBytes or defaultSpoolBytes
+        self.countContainers = 0
+        self.countEntries = 0
+        self.countAliases = 0
+        self.repaired = []
+        self.aliases = aliases
+        self._locations = {}
+        self._number = 0
+        self._container = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    # Continue after the containers of an earlier run, repair the ones a
+    # crash left open. repaired lists (container, index lines kept).
+    def open(self):
+        pattern = re.compile(re.escape(self.baseName) + r"_(\d+)" + re.escape(self.containerClass.extension) + "$")
+        for name in sorted(os.listdir(self.directory)):
+            match = pattern.match(name)
+            if(match):
+                self._number = max(self._number, int(match.group(1)))
+                path = os.path.join(self.directory, name)
+                indexFile = path + ".index.txt"
+                if(os.path.exists(indexFile) and not self.containerClass.isComplete(path)):
+                    entries = readIndex(indexFile)
+                    count = self.containerClass.repair(path, entries)
+                    truncateIndex(indexFile, count)
+                    self.repaired.append((path, count))
+                if(self.aliases and os.path.exists(indexFile)):
+                    for dataOffset, size, md5, entryName in readIndex(indexFile):
+                        self._addLocation(md5, path, dataOffset, size, entryName)
+
+    # Where the first entry with md5 is (caller holds the lock or is open())
+    def _addLocation(self, md5, path, dataOffset, size, entryName):
+        if(md5 != "-" and md5 not in self._locations):
+            self._locations[md5] = (path, dataOffset, size, entryName)
+
+    # Write the content of file as entryName. Returns the container path
+    # and the CopyResult (digests of algorithms).
+    def add(self, entryName, file, algorithms=(), chunkSize=None, isCancelled=None, progress=None):
+        mtime = file.getMtime()
+        if(self.containerClass is _ZipContainer):
+            algorithms = list(algorithms) + ["crc32"]
+
+        # Copy out of the image without the lock
+        spool = tempfile.SpooledTemporaryFile(self.spoolBytes, "w+b", dir=self.directory)
+        try:
+            result = streamContent(file, spool, algorithms, chunkSize, isCancelled, progress)
+            spool.seek(0)
+
+            # Append the entry and its index line
+            self._lock.acquire()
+            try:
+                container = self._container
+                if(container is None or (container.countEntries() and
+                                         container.tell() + result.size + container.overhead(entryName) > self.maxBytes)):
+                    container = self._nextContainer()
+
+                offset = container.add(entryName, result.size, mtime, spool, result)
+
+                # The entry reaches the disk before its index line
+                container.flush()
+                md5 = result.digests.get("md5") or file.getMd5Hash() or "-"
+                self._index.write(u"%d\t%d\t%s\t%d\t%s\n" % (offset, result.size, md5, file.getId(), entryName))
+                self._index.flush()
+                self.countEntries = self.countEntries + 1
+                if(self.aliases):
+                    self._addLocation(md5, container.path, offset, result.size, entryName)
+                return container.path, result
+            finally:
+                self._lock.release()
+        finally:
+            spool.close()
+
+    # List file as entryName, an alias of the entry with the same md5 (not
+    # written again). Returns the path of that entry (<container>/<entry
+    # name>), None if there is no entry with md5 (the caller writes the file).
+    def addAlias(self, entryName, file, md5):
+        self._lock.acquire()
+        try:
+            location = self._locations.get(md5)
+            if(location is None):
+                return None
+            path, dataOffset, size, firstName = location
+            line = u"%d\t%d\t%s\t%d\t%s\n" % (dataOffset, size, md5, file.getId(), entryName)
+            if(self._container is not None and path == self._container.path):
+                self._index.write(line)
+                self._index.flush()
+            else:
+                # The index of a container that is closed already
+                index = codecs.open(path + ".index.txt", "a", "utf-8")
+                try:
+                    index.write(line)
+                finally:
+                    index.close()
+            self.countAliases = self.countAliases + 1
+            return os.path.join(path, firstName)
+        finally:
+            self._lock.release()
+
+    # Close the current container and start the next one
+    def _nextContainer(self):
+        self._closeContainer()
+        self._number = self._number + 1
+        path = os.path.join(self.directory, "%s_%04d%s" % (self.baseName, self._number, self.containerClass.extension))
+        self._container = self.containerClass(path)
+        self._index = codecs.open(path + ".index.txt", "w", "utf-8")
+        self.countContainers = self.countContainers + 1
+        return self._container
+
+    def _closeContainer(self):
+        if(self._container is None):
+            return
+        try:
+            self._container.close()
+        finally:
+            self._index.close()
+            self._container = None
+            self._index = None
+
+    def close(self):
+        self._lock.acquire()
+        try:
+            self._closeContainer()
+        finally:
+            self._lock.release()
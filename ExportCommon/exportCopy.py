@@ -0,0 +1,217 @@
+# File: exportCopy.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Copies the content of a file in the image to the export directory in
+# chunks, and hashes it on the way, so the file is only read once. Used
+# instead of ContentUtils.writeToFile when the file has no MD5 (Hash Lookup has
+# not run), when SHA-1/SHA-256 are wanted, and for large files
+# (pagefile.sys, videos):
+#
+# - The file is read chunkSize bytes at a time into one buffer per thread,
+#   so memory use does not depend on the size of the file.
+# - isCancelled() is checked between chunks. A cancelled copy is removed and
+#   CopyCancelled is raised.
+# - With sparse, blocks of zeros are skipped with seek instead of written,
+#   which leaves holes on file systems that support them (NTFS only does
+#   that for files marked sparse, the content is the same either way).
+# - progress(bytesDone, size) is called every progressSeconds and at the end.
+# - With headBytes, the first bytes of the file are kept in the result for
+#   the media probe (see mediaProbe.py), so it does not read them again.
+#
+# streamContent does the same into a file that is already open (an archive,
+# see exportArchive.py).
+#
+#   result = copyContent(file, extractedFile, ["md5", "sha1"])
+#   result.digests["md5"] -> "d41d8cd98f00b204e9800998ecf8427e"
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+
+# Java byte[] buffers under Jython (AbstractFile.read fills a byte[])
+try:
+    import jarray
+except ImportError:
+    jarray = None
+
+
+# Hashes that can be computed while copying
+hashAlgorithms = ("md5", "sha1", "sha256")
+
+# Bytes read from the image at a time
+defaultChunkSize = 8 * 1024 * 1024
+
+# Whole blocks of zeros of this size are skipped (with sparse)
+sparseBlockSize = 64 * 1024
+
+# Seconds between calls to progress()
+progressSeconds = 5.0
+
+
+# Copy was stopped because the ingest job was cancelled
+class CopyCancelled(Exception):
+    pass
+
+
+# Result of copyContent
+class CopyResult(object):
+
+    __slots__ = ("size", "digests", "sparseBytes", "head")
+
+    def __init__(self, size, digests, sparseBytes, head=b""):
+        self.size = size
+        self.digests = digests
+        self.sparseBytes = sparseBytes
+
+        # First headBytes of the file (for the media probe)
+        self.head = head
+
+
+def newBuffer(size):
+    if(jarray is not None):
+        return jarray.zeros(size, "b")
+    return bytearray(size)
+
+
+# First length bytes of buffer as a byte string
+def bufferBytes(buffer, length):
+    if(jarray is not None):
+        if(length == len(buffer)):
+            return buffer.tostring()
+        return buffer[:length].tostring()
+    return bytes(buffer[:length])
+
+
+# One read buffer per thread and chunk size
+_buffers = threading.local()
+
+
+def _threadBuffer(size):
+    buffer = getattr(_buffers, "buffer", None)
+    if(buffer is None or len(buffer) != size):
+        buffer = newBuffer(size)
+        _buffers.buffer = buffer
+    return buffer
+
+
+# CRC-32 with the interface of hashlib (for ZIP entries)
+class Crc32(object):
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return "%08x" % (self.value & 0xffffffff)
+
+
+# Hash by name, "crc32" or one of hashlib
+def newDigest(name):
+    if(name == "crc32"):
+        return Crc32()
+    return hashlib.new(name)
+
+
+# Hashes to compute while copying a file. The MD5 is only computed when the
+# file does not have one.
+def digestsNeeded(inlineHashes, md5):
+    return [name for name in inlineHashes if name != "md5" or not md5]
+
+
+# Write data, skipping zero blocks of sparseBlockSize. Returns bytes skipped.
+def _writeSparse(f, data):
+    zero = b"\0"
+    length = len(data)
+    skipped = 0
+    pending = 0
+    position = 0
+    while(position < length):
+        end = min(position + sparseBlockSize, length)
+        if(end - position == sparseBlockSize and data.count(zero, position, end) == sparseBlockSize):
+            if(pending < position):
+                f.write(data[pending:position])
+            f.seek(end - position, 1)
+            skipped = skipped + (end - position)
+            pending = end
+        position = end
+    if(pending < length):
+        f.write(data[pending:])
+    return skipped
+
+
+# length bytes of file from offset
+def readBytes(file, offset, length):
+    buffer = newBuffer(length)
+    length = file.read(buffer, offset, length)
+    if(length <= 0):
+        return b""
+    return bufferBytes(buffer, length)
+
+
+# Write the content of file to the open file out (at its position). Returns
+# a CopyResult.
+def streamContent(file, out, algorithms=("md5",), chunkSize=None, isCancelled=None, progress=None, sparse=False, headBytes=0):
+    digests = [(name, newDigest(name)) for name in algorithms]
+    buffer = _threadBuffer(chunkSize or defaultChunkSize)
+    size = file.getSize()
+    offset = 0
+    sparseBytes = 0
+    head = b""
+    lastProgress = time.time()
+    while(offset < size):
+        if(isCancelled is not None and isCancelled()):
+            raise CopyCancelled(file.getName())
+        length = file.read(buffer, offset, min(len(buffer), size - offset))
+        if(length <= 0):
+            break
+        data = bufferBytes(buffer, length)
+        if(len(head) < headBytes):
+            head = head + data[:headBytes - len(head)]
+        for name, digest in digests:
+            digest.update(data)
+        if(sparse):
+            sparseBytes = sparseBytes + _writeSparse(out, data)
+        else:
+            out.write(data)
+        offset = offset + length
+
+        if(progress is not None and time.time() - lastProgress >= progressSeconds):
+            lastProgress = time.time()
+            progress(offset, size)
+
+    if(progress is not None):
+        progress(offset, size)
+    return CopyResult(offset, dict((name, digest.hexdigest()) for name, digest in digests), sparseBytes, head)
+
+
+# Write the content of file to extractedFile. Returns a CopyResult.
+def copyContent(file, extractedFile, algorithms=("md5",), chunkSize=None, isCancelled=None, progress=None, sparse=False, headBytes=0):
+    f = open(extractedFile, "wb")
+    try:
+        result = streamContent(file, f, algorithms, chunkSize, isCancelled, progress, sparse, headBytes)
+
+        # A file ending in a hole needs its size set
+        if(result.sparseBytes):
+            f.truncate(result.size)
+    except CopyCancelled:
+        f.close()
+        os.remove(extractedFile)
+        raise
+    finally:
+        if(not f.closed):
+            f.close()
+    return result
+
+
+# Digests other than MD5 as text for the manifest and the Griffeye notes,
+# for example "sha1:... sha256:..."
+def formatDigests(digests):
+    return " ".join(name + ":" + digests[name] for name in hashAlgorithms if name != "md5" and name in digests)
@@ -0,0 +1,219 @@
+# File: exportDedup.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Index from MD5 hash to the first exported copy of a file, kept for the whole
+# ingest job. The same picture is often found many times in one image
+# (browser caches, thumbnails, app data). Only the first copy is written:
+#
+# - dedupMode "link": later copies become hardlinks to the first copy (or a
+#                     copy of the exported file if hardlinks are not supported)
+# - dedupMode "once": later copies are not written, they are listed (XML,
+#                     manifest) with the first copy as their exported file
+# - dedupMode "off":  every copy is written
+#
+# Files are written by the export writer threads, so a duplicate can show up
+# before its first copy is on disk. Such duplicates wait in the index and are
+# handled when the first copy has been written.
+#
+# The caller hands every duplicate a function duplicate(source, action) and
+# records the duplicate (XML, manifest) from there, once the first copy is
+# on disk:
+#
+# - duplicateLinked: the hardlink to source is made
+# - duplicateCopy:   no hardlink, the caller copies source (through the
+#                    writer pool and the disk space budget)
+# - duplicateAlias:  dedupMode "once", nothing is written: the caller lists
+#                    the duplicate with source as its exported file
+# - duplicateWrite:  the first copy could not be written (source None), the
+#                    caller writes the duplicate from the image
+
+import os
+import shutil
+import threading
+
+
+# Dedup modes
+dedupOff = "off"
+dedupLink = "link"
+dedupOnce = "once"
+
+# What duplicate(source, action) is asked to do
+duplicateLinked = "linked"
+duplicateCopy = "copy"
+duplicateAlias = "alias"
+duplicateWrite = "write"
+
+
+# Create hardlink target -> source, returns True on success. A target left
+# by an export that crashed is replaced (resume).
+def linkFile(source, target):
+    if(hasattr(os, "link")):
+        try:
+            os.link(source, target)
+            return True
+        except OSError:
+            if(not os.path.exists(target)):
+                return False
+        try:
+            os.remove(target)
+            os.link(source, target)
+            return True
+        except OSError:
+            return False
+    try:
+        from java.nio.file import Paths
+        from java.nio.file import Files
+        Files.deleteIfExists(Paths.get(target))
+        Files.createLink(Paths.get(target), Paths.get(source))
+        return True
+    except:
+        return False
+
+
+# Dedup entry, one per hash ----------------------------------------------------------------------------------------------------
+class _DedupEntry(object):
+
+    __slots__ = ("extractedFile", "written", "pending")
+
+    def __init__(self, extractedFile):
+        self.extractedFile = extractedFile
+        self.written = False
+        self.pending = []
+
+
+# Export Dedup Index ---------------------------------------------------------------------------------------------------------
+class ExportDedupIndex(object):
+
+    def __init__(self, dedupMode):
+        self.dedupMode = dedupMode
+        self.countDuplicates = 0
+        self.countLinked = 0
+        self.countCopied = 0
+        self.countFailed = 0
+        self.countAliases = 0
+        self.bytesSaved = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    # Add a file exported by an earlier run of the job (from the manifest)
+    def addWritten(self, md5, extractedFile):
+        if(self.dedupMode == dedupOff or not md5):
+            return
+        self._lock.acquire()
+        try:
+            if(md5 not in self._entries):
+                entry = _DedupEntry(extractedFile)
+                entry.written = True
+                self._entries[md5] = entry
+        finally:
+            self._lock.release()
+
+    # Register a file that is going to be exported. Returns True if the
+    # caller has to write it (first copy, no hash or dedup off). Duplicates
+    # are linked by the index (dedupMode "link"), handed to
+    # duplicate(source, action) and False is returned.
+    def addFile(self, md5, extractedFile, file=None, size=0, duplicate=None):
+        if(self.dedupMode == dedupOff or not md5):
+            return True
+
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(md5)
+            if(entry is None):
+                self._entries[md5] = _DedupEntry(extractedFile)
+                return True
+
+            self.countDuplicates = self.countDuplicates + 1
+            self.bytesSaved = self.bytesSaved + size
+            if(not entry.written):
+                entry.pending.append((extractedFile, file, size, duplicate))
+                return False
+            source = entry.extractedFile
+        finally:
+            self._lock.release()
+
+        self._linkDuplicate(source, extractedFile, duplicate)
+        return False
+
+    # First copy has been written. Hands on the duplicates that came in meanwhile.
+    def fileWritten(self, md5):
+        if(self.dedupMode == dedupOff or not md5):
+            return
+
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(md5)
+            if(entry is None):
+                return
+            entry.written = True
+            pending = entry.pending
+            entry.pending = []
+        finally:
+            self._lock.release()
+
+        for extractedFile, file, size, duplicate in pending:
+            self._linkDuplicate(entry.extractedFile, extractedFile, duplicate)
+
+    # First copy could not be written. The hash is forgotten and the
+    # duplicates that were waiting for it are handed to
+    # duplicate(None, duplicateWrite) so the caller writes them. Returns them
+    # as (extractedFile, file).
+    def fileFailed(self, md5):
+        if(self.dedupMode == dedupOff or not md5):
+            return []
+
+        self._lock.acquire()
+        try:
+            entry = self._entries.pop(md5, None)
+            if(entry is None):
+                return []
+            for extractedFile, file, size, duplicate in entry.pending:
+                self.countDuplicates = self.countDuplicates - 1
+                self.bytesSaved = self.bytesSaved - size
+        finally:
+            self._lock.release()
+
+        for extractedFile, file, size, duplicate in entry.pending:
+            if(duplicate is not None):
+                duplicate(None, duplicateWrite)
+        return [(extractedFile, file) for extractedFile, file, size, duplicate in entry.pending]
+
+    # Copy of a duplicate that could not be linked (the caller has reserved
+    # the space). Raises IOError/OSError when the copy fails.
+    def copyFile(self, source, target):
+        try:
+            shutil.copyfile(source, target)
+        except (IOError, OSError):
+            self._count("countFailed")
+            raise
+        self._count("countCopied")
+
+    # Link a duplicate (dedupMode "link") and tell the caller what to do
+    def _linkDuplicate(self, source, target, duplicate):
+        if(self.dedupMode == dedupOnce):
+            self._count("countAliases")
+            action = duplicateAlias
+        elif(self._link(source, target)):
+            action = duplicateLinked
+        else:
+            action = duplicateCopy
+        if(duplicate is not None):
+            duplicate(source, action)
+
+    # Hardlink target to the first exported copy. Returns True on success.
+    def _link(self, source, target):
+        if(linkFile(source, target)):
+            self._count("countLinked")
+            return True
+        return False
+
+    def _count(self, name):
+        self._lock.acquire()
+        try:
+            setattr(self, name, getattr(self, name) + 1)
+        finally:
+            self._lock.release()
@@ -0,0 +1,131 @@
+# File: exportKnown.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Filter for files that are known good and do not have to be exported:
+# wallpapers, icons and sample media of the operating system.
+#
+# - Files Hash Lookup has marked as known (NSRL and known hash sets in
+#   Autopsy), from file.getKnown().
+# - Files whose MD5 is in one of the known-good hash set files given to the
+#   module. A hash set file is a text file with one MD5 per line, or an NSRL
+#   CSV file; the first 32 hex characters of a line are taken as the MD5.
+#
+# The hash sets are loaded once per job into KnownHashSet: the MD5s are
+# stored as 14 byte suffixes, sorted, in one byte string per 2 byte prefix,
+# so a lookup is a binary search and a hash costs about 14 bytes (also while
+# loading).
+#
+#   knownFilter = KnownFilter(TskData.FileKnown.KNOWN, ["C:\\hashsets\\wallpapers.txt"])
+#   knownFilter.load()
+#   knownFilter.check(file) -> "skippedKnown", "skippedHashSet" or None
+
+import binascii
+import codecs
+import re
+
+
+# MD5 in a line of a hash set file
+md5Pattern = re.compile(r"(?<![0-9a-fA-F])([0-9a-fA-F]{32})(?![0-9a-fA-F])")
+
+
+# Known Hash Set -------------------------------------------------------------------------------------------------------------
+class KnownHashSet(object):
+
+    prefixBytes = 2
+    suffixBytes = 14
+
+    def __init__(self):
+        self.count = 0
+        self._buckets = {}
+
+    # Add the MD5s of hash set files. Returns a list of (file, error) for the
+    # files that could not be read.
+    def load(self, hashSetFiles):
+        pending = {}
+        errors = []
+        for hashSetFile in hashSetFiles:
+            try:
+                f = codecs.open(hashSetFile, "r", "latin-1")
+                try:
+                    for line in f:
+                        match = md5Pattern.search(line)
+                        if(match is None):
+                            continue
+                        digest = binascii.unhexlify(match.group(1).lower())
+                        prefix = digest[:self.prefixBytes]
+                        bucket = pending.get(prefix)
+                        if(bucket is None):
+                            bucket = bytearray()
+                            pending[prefix] = bucket
+                        bucket.extend(digest[self.prefixBytes:])
+                finally:
+                    f.close()
+            except (IOError, OSError) as e:
+                errors.append((hashSetFile, e))
+
+        # Sorted and without doubles, one byte string per prefix (only one
+        # bucket at a time is split up for sorting)
+        size = self.suffixBytes
+        for prefix in list(pending.keys()):
+            bucket = bytes(pending.pop(prefix)) + self._buckets.get(prefix, b"")
+            suffixes = set(bucket[i:i + size] for i in range(0, len(bucket), size))
+            self._buckets[prefix] = b"".join(sorted(suffixes))
+        self.count = sum(len(bucket) for bucket in self._buckets.values()) // self.suffixBytes
+        return errors
+
+    def contains(self, md5):
+        if(not md5 or len(md5) != 32):
+            return False
+        try:
+            digest = binascii.unhexlify(md5.lower())
+        except (TypeError, ValueError):
+            return False
+        bucket = self._buckets.get(digest[:self.prefixBytes])
+        if(bucket is None):
+            return False
+
+        suffix = digest[self.prefixBytes:]
+        size = self.suffixBytes
+        low = 0
+        high = len(bucket) // size
+        while(low < high):
+            middle = (low + high) // 2
+            value = bucket[middle * size:middle * size + size]
+            if(value < suffix):
+                low = middle + 1
+            elif(value > suffix):
+                high = middle
+            else:
+                return True
+        return False
+
+
+# Known Filter ---------------------------------------------------------------------------------------------------------------
+class KnownFilter(object):
+
+    # knownStatus: value of file.getKnown() for known files (TskData.FileKnown.KNOWN),
+    #              None = do not look at the known status
+    # hashSetFiles: known-good hash set files
+    def __init__(self, knownStatus=None, hashSetFiles=()):
+        self.knownStatus = knownStatus
+        self.hashSetFiles = list(hashSetFiles)
+        self.hashSet = KnownHashSet()
+
+    # Load the hash set files, returns a list of (file, error)
+    def load(self):
+        if(not self.hashSetFiles):
+            return []
+        return self.hashSet.load(self.hashSetFiles)
+
+    # Why a file is skipped ("skippedKnown" or "skippedHashSet", used as the
+    # counter name), None if it is exported
+    def check(self, file):
+        if(self.knownStatus is not None and file.getKnown() == self.knownStatus):
+            return "skippedKnown"
+        if(self.hashSet.count and self.hashSet.contains(file.getMd5Hash())):
+            return "skippedHashSet"
+        return None
@@ -0,0 +1,103 @@
+# File: exportLog.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Wrapper around the Autopsy logger used by the export modules:
+#
+# - The level is checked first. The message is a %-format and the arguments
+#   are only put into it when the message will be logged.
+# - The caller name is read from the frame of the caller (sys._getframe),
+#   not with inspect.stack(), which builds the whole stack and reads source
+#   lines.
+# - The same message (same format string from the same method) at WARNING or
+#   above is logged maxRepeats times. After that it is only counted, and a
+#   summary with the count and the last message is logged every
+#   summarySeconds and by flush().
+#
+#   _logger = ExportLogger(Logger.getLogger(moduleName), Level.WARNING)
+#   _logger.log(Level.SEVERE, "Error writing File %s to %s", (name, extractedFile), "AutopsyToGriffeye")
+
+import sys
+import threading
+import time
+
+
+# Export Logger --------------------------------------------------------------------------------------------------------------
+class ExportLogger(object):
+
+    # Times the same warning or error is logged before it is only counted
+    maxRepeats = 10
+
+    # Seconds between summaries of repeated messages
+    summarySeconds = 60.0
+
+    # warningLevel: messages at this level or above are counted as repeats
+    def __init__(self, logger, warningLevel):
+        self.logger = logger
+        self.warningLevel = warningLevel
+        self._lock = threading.Lock()
+        self._repeats = {}
+        self._lastSummary = time.time()
+
+    # Log msg % args. depth is the number of frames between the method that
+    # logs and this call (1 when called through a log() helper of the module).
+    def log(self, level, msg, args=(), sourceClass=None, depth=1):
+        if(not self.logger.isLoggable(level)):
+            return
+        sourceMethod = sys._getframe(depth + 1).f_code.co_name
+
+        if(self._isWarning(level)):
+            key = (sourceMethod, msg)
+            self._lock.acquire()
+            try:
+                repeat = self._repeats.get(key)
+                if(repeat is None):
+                    repeat = [0, 0, None, level, sourceClass]
+                    self._repeats[key] = repeat
+                repeat[0] = repeat[0] + 1
+                if(repeat[0] > self.maxRepeats):
+                    # Only count, summary later
+                    repeat[1] = repeat[1] + 1
+                    repeat[2] = args
+                    summaryDue = time.time() - self._lastSummary >= self.summarySeconds
+                else:
+                    summaryDue = False
+            finally:
+                self._lock.release()
+            if(repeat[0] > self.maxRepeats):
+                if(summaryDue):
+                    self.flush()
+                return
+
+        self.logger.logp(level, sourceClass, sourceMethod, self._format(msg, args))
+
+    # Log summaries of messages that were only counted
+    def flush(self):
+        self._lock.acquire()
+        try:
+            self._lastSummary = time.time()
+            pending = []
+            for key, repeat in self._repeats.items():
+                if(repeat[1] > 0):
+                    pending.append((key, repeat[1], repeat[2], repeat[3], repeat[4]))
+                    repeat[1] = 0
+        finally:
+            self._lock.release()
+
+        for (sourceMethod, msg), countSkipped, args, level, sourceClass in pending:
+            self.logger.logp(level, sourceClass, sourceMethod,
+                             str(countSkipped) + " more times (not logged one by one): " + msg + ", last: " + self._format(msg, args))
+
+    def _isWarning(self, level):
+        return level.intValue() >= self.warningLevel.intValue()
+
+    def _format(self, msg, args):
+        if(not args):
+            return msg
+        try:
+            return msg % args
+        except (TypeError, ValueError):
+            return msg + " " + " ".join(str(arg) for arg in args)
@@ -0,0 +1,139 @@
+# File: exportManifest.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Append-only manifest of files that have been exported, stored in the export
+# directory. One line per file:
+#
+#   <object id> TAB <size> TAB <md5 or -> TAB <exported file> [TAB <digests>]
+#
+# Digests are the other hashes computed while exporting ("sha1:... sha256:...").
+# When an ingest job is restarted, or a new data source is added to the case,
+# the manifest is read back and process() skips the files that are already
+# exported. A line is only added when the file has been written, so a crash
+# at most costs the files that were being written at that moment.
+
+import codecs
+import os
+import threading
+import time
+
+
+# Manifest entry -------------------------------------------------------------------------------------------------------------
+class ManifestEntry(object):
+
+    __slots__ = ("size", "md5", "extractedFile")
+
+    def __init__(self, size, md5, extractedFile):
+        self.size = size
+        self.md5 = md5
+        self.extractedFile = extractedFile
+
+
+# Export Manifest ------------------------------------------------------------------------------------------------------------
+class ExportManifest(object):
+
+    # Default flush thresholds
+    defaultFlushLines = 200
+    defaultFlushSeconds = 5.0
+
+    def __init__(self, manifestFile, flushLines=None, flushSeconds=None):
+        self.manifestFile = manifestFile
+        self.flushLines = flushLines or self.defaultFlushLines
+        self.flushSeconds = flushSeconds or self.defaultFlushSeconds
+        self.entries = {}
+        self._file = None
+        self._buffer = []
+        self._lastFlush = time.time()
+        self._lock = threading.Lock()
+
+    # Read existing manifest (if resume) and open it for appending
+    def open(self, resume=True):
+        if(resume and os.path.exists(self.manifestFile)):
+            lastLineComplete = self._read()
+            self._file = codecs.open(self.manifestFile, "a", "utf-8")
+            if(not lastLineComplete):
+                self._file.write(u"\n")
+        else:
+            self._file = codecs.open(self.manifestFile, "w", "utf-8")
+        self._lastFlush = time.time()
+
+    # Read entries, returns False if the last line was cut off by a crash
+    def _read(self):
+        lastLineComplete = True
+        f = codecs.open(self.manifestFile, "r", "utf-8")
+        try:
+            for line in f:
+                lastLineComplete = line.endswith("\n")
+                if(not lastLineComplete):
+                    continue
+                columns = line.rstrip("\n").split("\t")
+                if(len(columns) not in (4, 5)):
+                    continue
+                try:
+                    objectId = int(columns[0])
+                    size = int(columns[1])
+                except ValueError:
+                    continue
+                md5 = columns[2]
+                if(md5 == "-"):
+                    md5 = None
+                self.entries[objectId] = ManifestEntry(size, md5, columns[3])
+        finally:
+            f.close()
+        return lastLineComplete
+
+    # Has this file been exported before? Size must match, and the MD5 if
+    # both the manifest and the file have one.
+    def contains(self, objectId, size, md5=None):
+        entry = self.entries.get(objectId)
+        if(entry is None or entry.size != size):
+            return False
+        if(md5 and entry.md5 and md5 != entry.md5):
+            return False
+        return True
+
+    # Record a file as exported
+    def add(self, objectId, size, md5, extractedFile, digests=None):
+        if(digests):
+            line = u"%d\t%d\t%s\t%s\t%s\n" % (objectId, size, md5 or "-", extractedFile, digests)
+        else:
+            line = u"%d\t%d\t%s\t%s\n" % (objectId, size, md5 or "-", extractedFile)
+        self._lock.acquire()
+        try:
+            self.entries[objectId] = ManifestEntry(size, md5, extractedFile)
+            self._buffer.append(line)
+            if(len(self._buffer) >= self.flushLines or time.time() - self._lastFlush >= self.flushSeconds):
+                self._flush()
+        finally:
+            self._lock.release()
+
+    def flush(self):
+        self._lock.acquire()
+        try:
+            self._flush()
+        finally:
+            self._lock.release()
+
+    def _flush(self):
+        if(self._buffer):
+            self._file.write(u"".join(self._buffer))
+            self._buffer = []
+        self._file.flush()
+        self._lastFlush = time.time()
+
+    def close(self):
+        self._lock.acquire()
+        try:
+            if(self._file is None):
+                return
+            try:
+                self._flush()
+            finally:
+                self._file.close()
+                self._file = None
+        finally:
+            self._lock.release()
@@ -0,0 +1,369 @@
+# File: exportPaths.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Maps the unique path of a file in the case (/img_1568795.001/vol_vol3/Users/..)
+# to a directory below the export directory (img_1568795.001\vol_vol3\Users\..)
+# and creates it.
+#
+# Directories that have been created are remembered in a bounded LRU, so each
+# directory costs one os.makedirs per job instead of one failing os.mkdir per
+# path segment per exported file. The mapper is shared by all ingest threads
+# of a job.
+#
+# file.getUniquePath() walks all parents of the file in the case database.
+# ParentPathCache keeps the unique path of parent folders by parent object id,
+# so files in the same folder cost one lookup in a dict. Each entry also holds
+# what the modules make from the parent path (export directory, Griffeye
+# path), so that is only worked out once per folder. One cache
+# (parentPathCache) is shared by all export modules.
+#
+# The unique path starts with the data source (/img_1568795.001, /Laptop.E01,
+# /LogicalFileSet1, ..). DataSourceMap resolves the data source of a file with
+# file.getDataSource() once per data source and keeps its unique path prefix
+# and the folder it is exported to, so the path of a file in its data source
+# is one slice. With dataSourceFolders each data source is exported to its
+# own folder (named after the data source), else all into one tree. Data
+# sources with the same name are told apart by the case's list of data
+# sources: the one with the lowest object id keeps the name, the others get
+# _<object id>, so a folder does not depend on which was seen first.
+
+import os
+import threading
+from collections import OrderedDict
+
+
+# Characters Windows does not allow in file and directory names
+invalidCharacters = '<>:"|?*'
+
+
+# Remove characters that can not be used in a file or directory name
+def sanitizeName(name):
+    for character in invalidCharacters:
+        if(character in name):
+            name = name.replace(character, "")
+    return name
+
+
+# Export Path Mapper ---------------------------------------------------------------------------------------------------------
+class ExportPathMapper(object):
+
+    # Max number of created directories to remember
+    defaultMaxDirectories = 20000
+
+    # rootDirectory: directory files are exported to
+    # dataSourceFolders: one folder per data source below rootDirectory
+    def __init__(self, rootDirectory, dataSourceFolders=True, maxDirectories=None):
+        self.rootDirectory = rootDirectory
+        self.dataSourceFolders = dataSourceFolders
+        self.maxDirectories = maxDirectories or self.defaultMaxDirectories
+        self._lock = threading.Lock()
+        self._createdDirectories = OrderedDict()
+
+    # Folder of the parent relative to the export directory, as a list of
+    # sanitized path segments
+    def getRelativeSegments(self, parent):
+        return [sanitizeName(segment) for segment in parent.getRelativeFolder(self.dataSourceFolders).split("/") if segment]
+
+    # Full path the file is exported to, with the directory kept in the parent
+    # entry. Parent entries outlive the job, so the key is the export
+    # directory (not the mapper) and each mapper creates the directory once.
+    def getExportFileForParent(self, parent, fileName):
+        key = ("exportDirectory", self.rootDirectory, self.dataSourceFolders)
+        directory = parent.derived.get(key)
+        if(directory is None):
+            directory = os.path.join(self.rootDirectory, *self.getRelativeSegments(parent))
+            parent.derived[key] = directory
+        self.makeDirectory(directory)
+        return os.path.join(directory, sanitizeName(fileName))
+
+    # Name of the file in an archive (img_1568795.001/vol_vol3/Users/../name),
+    # no directory is created. The folder part is kept in the parent entry.
+    def getEntryNameForParent(self, parent, fileName):
+        key = ("entryName", self.dataSourceFolders)
+        folder = parent.derived.get(key)
+        if(folder is None):
+            folder = "".join(segment + "/" for segment in self.getRelativeSegments(parent))
+            parent.derived[key] = folder
+        return folder + sanitizeName(fileName)
+
+    # Create directory and parents unless it has been created before
+    def makeDirectory(self, directory):
+        self._lock.acquire()
+        try:
+            if(directory in self._createdDirectories):
+                # Move to the end, most recently used
+                del self._createdDirectories[directory]
+                self._createdDirectories[directory] = True
+                return
+        finally:
+            self._lock.release()
+
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Created by another ingest thread, or it was there from before
+            if(not os.path.isdir(directory)):
+                raise
+
+        self._lock.acquire()
+        try:
+            self._createdDirectories[directory] = True
+            while(len(self._createdDirectories) > self.maxDirectories):
+                self._createdDirectories.popitem(last=False)
+        finally:
+            self._lock.release()
+
+
+# Data source of a file, as returned by DataSourceMap ----------------------------------------------------------------------------
+class DataSourceEntry(object):
+
+    __slots__ = ("prefix", "folder")
+
+    def __init__(self, prefix, folder):
+        # Unique path of the data source with "/", for example /img_1568795.001/
+        self.prefix = prefix
+
+        # Folder the data source is exported to, for example img_1568795.001
+        self.folder = folder
+
+    # Path in the data source of a unique path, for example vol_vol3/Users/,
+    # or img_1568795.001/vol_vol3/Users/ with withFolder
+    def getRelativePath(self, path, withFolder=False):
+        if(path.startswith(self.prefix)):
+            path = path[len(self.prefix):]
+        else:
+            path = path.lstrip("/")
+        if(withFolder):
+            return self.folder + "/" + path
+        return path
+
+
+# Key of the data source of a file, without a database lookup
+def dataSourceKey(file):
+    try:
+        return file.getDataSourceObjectId()
+    except AttributeError:
+        return None
+
+
+# Data Source Map ------------------------------------------------------------------------------------------------------------
+class DataSourceMap(object):
+
+    def __init__(self):
+        self.caseKey = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._folders = set()
+
+    # Object ids are only unique within a case
+    def useCase(self, caseKey):
+        self._lock.acquire()
+        try:
+            if(caseKey != self.caseKey):
+                self._entries = {}
+                self._folders = set()
+                self.caseKey = caseKey
+        finally:
+            self._lock.release()
+
+    # Data source of file. Known data sources are read without the lock,
+    # so threads on different data sources do not wait for each other.
+    # uniquePath is used when the data source can not be read.
+    def getEntry(self, file, uniquePath=None):
+        key = dataSourceKey(file)
+        entry = self._entries.get(key)
+        if(entry is not None):
+            return entry
+
+        # First file of the data source
+        earlierNames = None
+        try:
+            dataSource = file.getDataSource()
+            name = dataSource.getName()
+            if(key is None):
+                key = dataSource.getId()
+            prefix = dataSource.getUniquePath()
+            earlierNames = self.getEarlierNames(dataSource)
+        except Exception:
+            # First segment of the unique path
+            if(uniquePath is None):
+                uniquePath = file.getUniquePath()
+            name = uniquePath.lstrip("/").split("/", 1)[0]
+            prefix = "/" + name
+        self._lock.acquire()
+        try:
+            entry = self._entries.get(key)
+            if(entry is None):
+                # Two data sources with the same name get their own folders:
+                # the first added to the case keeps the name, the others get
+                # their object id, in every session
+                folder = sanitizeName(name) or "DataSource"
+                if(earlierNames is None):
+                    taken = folder in self._folders
+                else:
+                    taken = folder in earlierNames
+                if(taken):
+                    folder = folder + "_" + str(key)
+                self._folders.add(folder)
+                entry = DataSourceEntry(prefix.rstrip("/") + "/", folder)
+                entries = dict(self._entries)
+                entries[key] = entry
+                self._entries = entries
+            return entry
+        finally:
+            self._lock.release()
+
+    # Folder names of the data sources added to the case before dataSource
+    # (lower object id), None if the case can not be read
+    def getEarlierNames(self, dataSource):
+        try:
+            dataSources = dataSource.getSleuthkitCase().getDataSources()
+        except Exception:
+            return None
+        names = set()
+        for other in dataSources:
+            if(other.getId() < dataSource.getId()):
+                names.add(sanitizeName(other.getName()) or "DataSource")
+        return names
+
+
+# Shared by all export modules
+dataSourceMap = DataSourceMap()
+
+
+# Parent folder of a file, as returned by ParentPathCache -----------------------------------------------------------------------
+class ParentEntry(object):
+
+    __slots__ = ("uniquePath", "dataSource", "derived")
+
+    def __init__(self, uniquePath, dataSource=None):
+        # Unique path of the parent, for example /img_1568795.001/vol_vol3/Users
+        self.uniquePath = uniquePath
+
+        # DataSourceEntry of the data source the parent is in
+        self.dataSource = dataSource
+
+        # Values made from the path by the modules, by owner
+        self.derived = {}
+
+    # Unique path of a file in this folder (same as file.getUniquePath())
+    def getChildPath(self, fileName):
+        return self.uniquePath + "/" + fileName
+
+    # Folder in the data source ending with "/" (vol_vol3/Users/), with
+    # withFolder below the folder of the data source
+    def getRelativeFolder(self, withFolder=False):
+        path = self.uniquePath + "/"
+        if(self.dataSource is None):
+            return path.lstrip("/")
+        return self.dataSource.getRelativePath(path, withFolder)
+
+
+# Key of the parent folder of a file, None if it can not be read without a
+# database lookup
+def parentKey(file):
+    try:
+        parentId = file.getParentId()
+    except AttributeError:
+        return None
+    # Optional<Long> in newer Sleuth Kit versions
+    if(hasattr(parentId, "isPresent")):
+        if(not parentId.isPresent()):
+            return None
+        parentId = parentId.get()
+    return parentId
+
+
+# Parent Path Cache ----------------------------------------------------------------------------------------------------------
+class ParentPathCache(object):
+
+    # Max number of parent folders to remember
+    defaultMaxEntries = 50000
+
+    def __init__(self, maxEntries=None, dataSources=None):
+        self.maxEntries = maxEntries or self.defaultMaxEntries
+        self.dataSources = dataSources
+        self.caseKey = None
+        self.countHits = 0
+        self.countMisses = 0
+        self.countUncached = 0
+        self.countEvicted = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    # Object ids are only unique within a case: forget everything when the
+    # case changes
+    def useCase(self, caseKey):
+        if(self.dataSources is not None):
+            self.dataSources.useCase(caseKey)
+        self._lock.acquire()
+        try:
+            if(caseKey != self.caseKey):
+                self._entries.clear()
+                self.caseKey = caseKey
+        finally:
+            self._lock.release()
+
+    # Parent folder of file. fileName is file.getName() if the caller has it.
+    def getParent(self, file, fileName=None):
+        key = parentKey(file)
+        if(key is not None):
+            self._lock.acquire()
+            try:
+                parent = self._entries.get(key)
+                if(parent is not None):
+                    # Move to the end, most recently used
+                    del self._entries[key]
+                    self._entries[key] = parent
+                    self.countHits = self.countHits + 1
+                    return parent
+            finally:
+                self._lock.release()
+
+        # Miss: the unique path is the parent unique path + "/" + name
+        if(fileName is None):
+            fileName = file.getName()
+        uniquePath = file.getUniquePath()
+        dataSource = None
+        if(self.dataSources is not None):
+            dataSource = self.dataSources.getEntry(file, uniquePath)
+        if(uniquePath.endswith("/" + fileName)):
+            parent = ParentEntry(uniquePath[:len(uniquePath) - len(fileName) - 1], dataSource)
+        else:
+            parent = ParentEntry(uniquePath.rsplit("/", 1)[0], dataSource)
+
+        self._lock.acquire()
+        try:
+            if(key is None):
+                self.countUncached = self.countUncached + 1
+                return parent
+            self.countMisses = self.countMisses + 1
+            self._entries[key] = parent
+            while(len(self._entries) > self.maxEntries):
+                self._entries.popitem(last=False)
+                self.countEvicted = self.countEvicted + 1
+        finally:
+            self._lock.release()
+        return parent
+
+    # Hit/miss counters, for sizing maxEntries
+    def getStats(self):
+        return {"parentCacheHits": self.countHits, "parentCacheMisses": self.countMisses,
+                "parentCacheUncached": self.countUncached, "parentCacheEvicted": self.countEvicted,
+                "parentCacheSize": len(self._entries)}
+
+    # Counters since an earlier getStats() (size is the current size)
+    def getStatsSince(self, earlier):
+        stats = self.getStats()
+        for name in earlier:
+            if(name != "parentCacheSize"):
+                stats[name] = stats[name] - earlier[name]
+        return stats
+
+
+# Shared by all export modules
+parentPathCache = ParentPathCache(dataSources=dataSourceMap)
@@ -0,0 +1,109 @@
+# File: exportRecord.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Per-file record for a file that is being exported. Values are read from the
+# AbstractFile the first time they are asked for and then kept, so each
+# getter on the file (some of them go to the case database) runs at most once
+# per file, and only for files that matched.
+#
+# With a parent entry from exportPaths.parentPathCache the unique path and the
+# Griffeye <path> are made from the cached parent folder and the file name.
+# The Griffeye paths are relative to the data source (see
+# exportPaths.DataSourceMap), as in the image: the data source folder of
+# dataSourceFolders is only in the export directory.
+
+from ExportCommon.exportPaths import dataSourceMap
+
+
+# Marks a value that has not been read yet
+_notRead = object()
+
+
+# File Record ----------------------------------------------------------------------------------------------------------------
+class FileRecord(object):
+
+    __slots__ = ("file", "parent", "_id", "_name", "_size", "_md5", "_uniquePath")
+
+    def __init__(self, file, uniquePath=None, parent=None):
+        self.file = file
+        self.parent = parent
+        self._id = _notRead
+        self._name = _notRead
+        self._size = _notRead
+        self._md5 = _notRead
+        if(uniquePath is None):
+            self._uniquePath = _notRead
+        else:
+            self._uniquePath = uniquePath
+
+    def getId(self):
+        if(self._id is _notRead):
+            self._id = self.file.getId()
+        return self._id
+
+    def getName(self):
+        if(self._name is _notRead):
+            self._name = self.file.getName()
+        return self._name
+
+    def getSize(self):
+        if(self._size is _notRead):
+            self._size = self.file.getSize()
+        return self._size
+
+    def getMd5Hash(self):
+        if(self._md5 is _notRead):
+            self._md5 = self.file.getMd5Hash()
+        return self._md5
+
+    # MD5 computed while the file was exported
+    def setMd5Hash(self, md5):
+        self._md5 = md5
+
+    def getUniquePath(self):
+        if(self._uniquePath is _notRead):
+            if(self.parent is not None):
+                self._uniquePath = self.parent.getChildPath(self.getName())
+            else:
+                self._uniquePath = self.file.getUniquePath()
+        return self._uniquePath
+
+    # Unique path with backslashes and without the data source prefix,
+    # for example vol_vol3\Users\user\Pictures\IMG_0001.jpg
+    def getFullpath(self):
+        uniquePath = self.getUniquePath()
+        entry = dataSourceMap.getEntry(self.file, uniquePath)
+        return entry.getRelativePath(uniquePath).replace("/", "\\")
+
+    # Griffeye <path> of the parent folder, kept in the parent entry
+    def getParentGriffeyePath(self):
+        key = "griffeyePath"
+        path = self.parent.derived.get(key)
+        if(path is None):
+            path = self.parent.getRelativeFolder().replace("/", "\\")
+            self.parent.derived[key] = path
+        return path
+
+    # Griffeye XML values (see griffeyeXmlWriter.imageTemplate)
+    def getGriffeyeFields(self):
+        name = self.getName()
+        if(self.parent is not None):
+            path = self.getParentGriffeyePath()
+            fullpath = path + name
+        else:
+            fullpath = self.getFullpath()
+            path = fullpath
+            if(path.endswith(name)):
+                path = path[:len(path) - len(name)]
+        # No MD5 (Hash Lookup has not run): empty <id> and <hash>
+        md5 = self.getMd5Hash() or ""
+        file = self.file
+        return {"path": path, "name": name, "id": md5, "fullpath": fullpath,
+                "created": str(file.getCrtime()), "accessed": str(file.getAtime()), "written": str(file.getMtime()),
+                "deleted": "0", "hash": md5, "description": "Exisiting",
+                "physicalLocation": str(file.getMetaAddr()), "fileSize": str(self.getSize()), "notes": "",
+                "bitDepth": "", "aspectRatio": ""}
@@ -0,0 +1,79 @@
+# File: exportRules.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# The MIME types and file names the export modules look for, and a rule table
+# that classifies a file once against all of them. The table maps a MIME type
+# or file name to the (profile, kind) pairs that want the file, so
+# classification is two dict lookups no matter how many profiles are enabled.
+#
+# A profile is an export module (AutopsyToGriffeye, ExportAllImagesVideoesAudio,
+# ExportSystemFiles). Kind is passed back to the profile, for example "Images"
+# or "Movies". File names match in any case (sam, Sam and SAM), like the
+# LOWER(name) query of sqlWhere().
+
+
+# Images
+imageMimeTypes = frozenset(['image/bmp','image/gif', 'image/heic', 'image/jpeg', 'image/png', 'image/tiff',
+                            'image/vnd.adobe.photoshop', 'image/x-raw-nikon', 'image/x-ms-bmp', 'image/x-icon', 'image/webp',
+                            'image/vnd.microsoft.icon', 'image/x-rgb', 'image/x-ms-bmp','image/x-xbitmap','image/x-portable-graymap',
+                            'image/x-portable-bitmap'])
+
+# Movies
+movieMimeTypes = frozenset(['video/webm', 'video/3gpp', 'video/3gpp2', 'video/ogg','video/mpeg',
+                            'video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/x-flv', 'video/x-m4v',
+                            'video/x-ms-wmv'])
+
+# Audio
+audioMimeTypes = frozenset(['audio/midi', 'audio/mpeg', 'audio/webm', 'audio/ogg', 'audio/wav',
+                            'audio/vnd.wave', 'audio/x-ms-wma'])
+
+# System files
+systemFileNames = frozenset(['pagefile.sys','swapfile.sys', 'SAM', 'SECURITY', 'SOFTWARE',
+                             'SYSTEM'])
+
+
+# SQL condition on tsk_files for files with one of the MIME types or one of
+# the names (any case)
+def sqlWhere(mimeTypes=(), names=()):
+    conditions = []
+    if(mimeTypes):
+        conditions.append("mime_type IN (" + ", ".join(sqlQuote(mimeType) for mimeType in sorted(mimeTypes)) + ")")
+    if(names):
+        conditions.append("LOWER(name) IN (" + ", ".join(sqlQuote(name.lower()) for name in sorted(names)) + ")")
+    return "(" + " OR ".join(conditions) + ")"
+
+
+def sqlQuote(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+# Export Rules ---------------------------------------------------------------------------------------------------------------
+class ExportRules(object):
+
+    def __init__(self):
+        self._byMimeType = {}
+        self._byName = {}
+
+    # Profile wants files with one of these MIME types
+    def addMimeTypes(self, mimeTypes, profile, kind):
+        for mimeType in mimeTypes:
+            self._byMimeType[mimeType] = self._byMimeType.get(mimeType, ()) + ((profile, kind),)
+
+    # Profile wants files with one of these names (any case)
+    def addNames(self, names, profile, kind):
+        for name in names:
+            name = name.lower()
+            self._byName[name] = self._byName.get(name, ()) + ((profile, kind),)
+
+    # (profile, kind) pairs that want the file, empty tuple if none
+    def classify(self, mimeType, name=None):
+        matches = self._byMimeType.get(mimeType, ())
+        if(name is not None and self._byName):
+            byName = self._byName.get(name.lower())
+            if(byName):
+                matches = matches + byName
+        return matches
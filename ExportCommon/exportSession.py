@@ -0,0 +1,91 @@
+# File: exportSession.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Autopsy creates one file ingest module instance per ingest thread. State that
+# belongs to the whole ingest job (export directories, XML files, counters) is
+# kept in an ExportSession that all instances of the same job share.
+#
+# Each factory holds an ExportSessionRegistry. startUp() calls acquire() with
+# the job id: the first caller creates the session and runs open(). shutDown()
+# calls release(): the last caller runs close() and the session is removed.
+#
+# Counters and stage timers of the job are kept in an ExportStats (stats).
+# The files are written by an ExportWriter per ingest thread (exportWrite.py).
+
+import threading
+
+from ExportCommon.exportStats import ExportStats
+
+
+# Export Session -------------------------------------------------------------------------------------------------------------
+class ExportSession(object):
+
+    # Used by the write path (see exportWrite.py), set by open() of the
+    # modules that have them
+    zeroCopy = None
+    dedupIndex = None
+    archive = None
+
+    def __init__(self, jobId, context):
+        self.jobId = jobId
+        self.context = context
+        self.lock = threading.RLock()
+        self.refCount = 0
+        self.stats = ExportStats()
+
+    # Called once, by the first module instance of the job. Override.
+    def open(self):
+        pass
+
+    # Called once, by the last module instance of the job. Override.
+    def close(self):
+        pass
+
+    # Thread safe counter
+    def count(self, name, value=1):
+        self.stats.count(name, value)
+
+    def getCount(self, name):
+        return self.stats.getCount(name)
+
+
+# Export Session Registry ----------------------------------------------------------------------------------------------------
+class ExportSessionRegistry(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    # Get session for job, create and open it if this is the first instance
+    def acquire(self, context, sessionClass):
+        jobId = context.getJobId()
+        self._lock.acquire()
+        try:
+            session = self._sessions.get(jobId)
+            if(session is None):
+                session = sessionClass(jobId, context)
+                session.open()
+                self._sessions[jobId] = session
+            session.refCount = session.refCount + 1
+            return session
+        finally:
+            self._lock.release()
+
+    # Release session. Returns True if this was the last instance and the
+    # session was closed.
+    def release(self, session):
+        self._lock.acquire()
+        try:
+            session.refCount = session.refCount - 1
+            if(session.refCount > 0):
+                return False
+            del self._sessions[session.jobId]
+        finally:
+            self._lock.release()
+
+        session.close()
+        return True
@@ -0,0 +1,274 @@
+# File: exportSpace.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Keeps an export from filling the disk it writes to (the case storage, which
+# often also holds the case database and the keyword index):
+#
+# - When the job starts, checkStart() adds up the size of the files in the
+#   case database that the module exports (SUM(size) of the matching MIME
+#   types or names) and warns when they will not fit. On a first ingest the
+#   MIME types are not known yet, so there is no estimate.
+# - Every write reserves the size of the file first. The free space is read
+#   from the disk every checkBytes reserved, and before every write when it
+#   is close to minFreeBytes.
+# - A write that would leave less than minFreeBytes free pauses the writer
+#   threads (the ingest waits on the full export queue) for up to
+#   pauseSeconds, so space can be made. The export continues when there is
+#   checkBytes more than minFreeBytes free. If there is still too little, the
+#   export stops: files that were not written are counted, not written.
+# - A write that fails because the disk is full (ENOSPC, "There is not
+#   enough space on the disk") stops the export the same way.
+#
+# notify(stopped, message) is called when the export pauses, continues and
+# stops, for the log and the ingest inbox.
+#
+#   space = ExportSpace(exportDirectory, 1024 * 1024 * 1024, 300, notify)
+#   space.reserve(file.getSize(), isCancelled)   # raises NoSpaceLeft
+
+import errno
+import os
+import shutil
+import threading
+import time
+
+from ExportCommon.exportCopy import CopyCancelled
+
+# Free space of a directory under Jython (the benchmark stand-in has it too)
+try:
+    from java.io import File as JavaFile
+except ImportError:
+    JavaFile = None
+
+
+# Bytes reserved before the free space is read from the disk again
+defaultCheckBytes = 64 * 1024 * 1024
+
+# Seconds between looks at the free space while the export is paused
+pollSeconds = 5.0
+
+# Texts of disk full errors (Java IOException has no errno)
+noSpaceTexts = ("no space left", "not enough space", "disk full", "disk quota")
+
+
+# The export has stopped because the disk is (almost) full
+class NoSpaceLeft(Exception):
+    pass
+
+
+# Bytes as text, for example "1.5 GB"
+def formatBytes(size):
+    for unit in ("bytes", "KB", "MB", "GB", "TB"):
+        if(abs(size) < 1024 or unit == "TB"):
+            if(unit == "bytes"):
+                return "%d bytes" % size
+            return "%.1f %s" % (size, unit)
+        size = size / 1024.0
+
+
+# Free bytes for a non-privileged user on the disk of directory, None if not known
+def freeBytes(directory):
+    try:
+        return _freeBytes(directory)
+    except (OSError, IOError):
+        return None
+
+
+def _freeBytes(directory):
+    if(JavaFile is not None and hasattr(JavaFile, "getUsableSpace")):
+        if(not os.path.isdir(directory)):
+            return None
+        return JavaFile(directory).getUsableSpace()
+    diskUsage = getattr(shutil, "disk_usage", None)
+    if(diskUsage is not None):
+        return diskUsage(directory).free
+    statvfs = getattr(os, "statvfs", None)
+    if(statvfs is not None):
+        result = statvfs(directory)
+        return result.f_bavail * result.f_frsize
+    return None
+
+
+# Error from a write to a full disk
+def isNoSpace(error):
+    if(getattr(error, "errno", None) in (errno.ENOSPC, getattr(errno, "EDQUOT", errno.ENOSPC))):
+        return True
+    text = str(error).lower()
+    return any(noSpaceText in text for noSpaceText in noSpaceTexts)
+
+
+# Remove a file a failed write left behind. Returns True if there was one.
+def removePartial(extractedFile):
+    try:
+        if(os.path.isfile(extractedFile)):
+            os.remove(extractedFile)
+            return True
+    except OSError:
+        pass
+    return False
+
+
+# Bytes of the files matching the SQL condition on tsk_files (in dataSource
+# if it is given)
+def estimateBytes(skCase, where, dataSource=None):
+    if(dataSource is not None):
+        where = where + " AND data_source_obj_id = " + str(dataSource.getId())
+    dbQuery = skCase.executeQuery("SELECT SUM(size) AS total FROM tsk_files WHERE " + where)
+    try:
+        resultSet = dbQuery.getResultSet()
+        if(resultSet.next()):
+            return resultSet.getLong("total")
+        return 0
+    finally:
+        dbQuery.close()
+
+
+# Export Space ---------------------------------------------------------------------------------------------------------------
+class ExportSpace(object):
+
+    # directory: export directory
+    # minFreeBytes: free space left on the disk (0 = write until it is full)
+    # pauseSeconds: how long writers wait for space before the export stops
+    # notify(stopped, message): the export paused, continues or stopped
+    def __init__(self, directory, minFreeBytes=0, pauseSeconds=0, notify=None, checkBytes=None):
+        self.directory = directory
+        self.minFreeBytes = minFreeBytes
+        self.pauseSeconds = pauseSeconds
+        self.notify = notify
+        self.checkBytes = checkBytes or defaultCheckBytes
+        self.stopped = False
+        self.estimatedBytes = None
+        self.bytesReserved = 0
+        self.countPauses = 0
+        self.message = None
+        self._free = None
+        self._pending = 0
+        self._pausedSince = None
+        self._lock = threading.Lock()
+
+    # Warn when the files in the case database will not fit. exportedBytes:
+    # bytes exported by an earlier run (in the manifest). Returns the estimate.
+    def checkStart(self, skCase, where, dataSource=None, exportedBytes=0):
+        self.estimatedBytes = max(estimateBytes(skCase, where, dataSource) - exportedBytes, 0)
+        free = self.measure()
+        if(free is not None and self.estimatedBytes and free - self.estimatedBytes < self.minFreeBytes):
+            self._notify(False, "Only %s free in %s, the export needs about %s (%s are kept free)" %
+                         (formatBytes(free), self.directory, formatBytes(self.estimatedBytes), formatBytes(self.minFreeBytes)))
+        return self.estimatedBytes
+
+    # Free bytes, read from the disk
+    def measure(self):
+        free = freeBytes(self.directory)
+        self._lock.acquire()
+        try:
+            self._free = free
+            self._pending = 0
+        finally:
+            self._lock.release()
+        return free
+
+    # Free bytes before a write of size bytes (caller holds the lock), read
+    # from the disk every checkBytes and close to minFreeBytes
+    def _available(self, size):
+        if(self._free is None or self._pending + size >= self.checkBytes or
+           self._free - self._pending - size < self.minFreeBytes + self.checkBytes):
+            self._free = freeBytes(self.directory)
+            self._pending = 0
+        if(self._free is None):
+            return None
+        return self._free - self._pending
+
+    # Reserve size bytes before writing them. Pauses while the disk is
+    # below minFreeBytes, raises NoSpaceLeft when the export has stopped and
+    # CopyCancelled when the job is cancelled during a pause.
+    def reserve(self, size, isCancelled=None):
+        while True:
+            if(self.stopped):
+                raise NoSpaceLeft(self.message)
+            reserved = False
+            event = None
+            stopMessage = None
+            self._lock.acquire()
+            try:
+                if(self.stopped):
+                    raise NoSpaceLeft(self.message)
+
+                # A pause ends when there is checkBytes more than minFreeBytes
+                keep = self.minFreeBytes
+                if(self._pausedSince is not None):
+                    keep = keep + self.checkBytes
+                free = self._available(size)
+                if(free is None or free - size >= keep):
+                    reserved = True
+                    self._pending = self._pending + size
+                    self.bytesReserved = self.bytesReserved + size
+                    if(self._pausedSince is not None):
+                        self._pausedSince = None
+                        event = "Export continues, %s free in %s" % (formatBytes(free), self.directory)
+                elif(self.pauseSeconds <= 0 or
+                     (self._pausedSince is not None and time.time() - self._pausedSince >= self.pauseSeconds)):
+                    self._pausedSince = None
+                    stopMessage = self._stop(free)
+                elif(self._pausedSince is None):
+                    self._pausedSince = time.time()
+                    self.countPauses = self.countPauses + 1
+                    event = ("Export paused, only %s free in %s (%s are kept free). Make space within %d seconds or the export stops" %
+                             (formatBytes(free), self.directory, formatBytes(self.minFreeBytes), self.pauseSeconds))
+            finally:
+                self._lock.release()
+
+            if(event is not None):
+                self._notify(False, event)
+            if(stopMessage is not None):
+                self._notify(True, stopMessage)
+            if(reserved):
+                return
+            if(self.stopped):
+                continue
+            if(isCancelled is not None and isCancelled()):
+                raise CopyCancelled(self.directory)
+            time.sleep(min(pollSeconds, self.pauseSeconds))
+
+    # A write failed because the disk is full: stop the export
+    def diskFull(self, error):
+        self.stop(freeBytes(self.directory), error)
+
+    # Stop the export, files are no longer written. Notifies once.
+    def stop(self, free, error=None):
+        self._lock.acquire()
+        try:
+            message = self._stop(free, error)
+        finally:
+            self._lock.release()
+        if(message is not None):
+            self._notify(True, message)
+
+    # Stop (caller holds the lock). Returns the message, None if stopped before.
+    def _stop(self, free, error=None):
+        if(self.stopped):
+            return None
+        if(free is None):
+            message = "Export stopped, the disk of %s is full" % self.directory
+        else:
+            message = "Export stopped, only %s free in %s" % (formatBytes(free), self.directory)
+        if(error is not None):
+            message = message + " (" + str(error) + ")"
+        self.message = message
+        self.stopped = True
+        return message
+
+    def _notify(self, stopped, message):
+        if(self.notify is not None):
+            self.notify(stopped, message)
+
+    # For the status file
+    def getStatus(self):
+        return {"freeBytes": self._free,
+                "minFreeBytes": self.minFreeBytes,
+                "estimatedBytes": self.estimatedBytes,
+                "bytesReserved": self.bytesReserved,
+                "pauses": self.countPauses,
+                "stopped": self.stopped}
@@ -0,0 +1,177 @@
+# File: exportStats.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Timers and counters for the stages of an export job (queries,
+# classification, getUniquePath, directories, writing, XML, manifest,
+# indexing), plus bytes copied, skipped files and errors by cause. Each thread
+# adds to its own tables, so recording a value takes no lock; the tables are
+# added up when the totals are read at the end of the job.
+#
+#   start = time.time()
+#   ContentUtils.writeToFile(file, File(extractedFile))
+#   stats.addTime("write", start)
+#
+# summary() gives text for the ingest message and writeProfile() writes the
+# totals as JSON and CSV to the export directory. writeStatus() writes the
+# counters of a running job to a small JSON file for the review pipeline.
+
+import json
+import os
+import threading
+import time
+
+
+# Stages in the order they happen for a file
+stageNames = ("query", "classify", "known", "uniquePath", "directory", "write", "probe", "xml", "manifest", "index")
+
+
+# Short cause of an error for the error table, for example
+# "IOError: No space left on device" or "IOException"
+def errorCause(error):
+    name = error.__class__.__name__
+    strerror = getattr(error, "strerror", None)
+    if(strerror):
+        return name + ": " + str(strerror)
+    return name
+
+
+# Export Stats ---------------------------------------------------------------------------------------------------------------
+class ExportStats(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tables = []
+        self.started = time.time()
+
+    # Tables of the calling thread: (seconds, calls, counters, errors)
+    def _mine(self):
+        tables = getattr(self._local, "tables", None)
+        if(tables is None):
+            tables = ({}, {}, {}, {})
+            self._local.tables = tables
+            self._lock.acquire()
+            try:
+                self._tables.append(tables)
+            finally:
+                self._lock.release()
+        return tables
+
+    # Add the time since start (from time.time()) to stage
+    def addTime(self, stage, start):
+        seconds, calls, counters, errors = self._mine()
+        seconds[stage] = seconds.get(stage, 0.0) + (time.time() - start)
+        calls[stage] = calls.get(stage, 0) + 1
+
+    def count(self, name, value=1):
+        counters = self._mine()[2]
+        counters[name] = counters.get(name, 0) + value
+
+    # Count error raised in stage, by cause ("write IOError: No space left on device")
+    def countError(self, stage, error):
+        cause = stage + " " + errorCause(error)
+        errors = self._mine()[3]
+        errors[cause] = errors.get(cause, 0) + 1
+
+    # Totals of all threads --------------------------------------------------------------------------------------------------
+    def _total(self, index):
+        self._lock.acquire()
+        try:
+            tables = list(self._tables)
+        finally:
+            self._lock.release()
+        total = {}
+        for table in tables:
+            for name, value in list(table[index].items()):
+                total[name] = total.get(name, 0) + value
+        return total
+
+    def getSeconds(self):
+        return self._total(0)
+
+    def getCalls(self):
+        return self._total(1)
+
+    def getCounters(self):
+        return self._total(2)
+
+    def getErrors(self):
+        return self._total(3)
+
+    def getCount(self, name):
+        return self.getCounters().get(name, 0)
+
+    # Stages first in stageNames order, then any other stage
+    def _orderedStages(self, seconds):
+        stages = [stage for stage in stageNames if stage in seconds]
+        return stages + sorted(stage for stage in seconds if stage not in stageNames)
+
+    # Text for the ingest message
+    def summary(self):
+        seconds = self.getSeconds()
+        counters = self.getCounters()
+        errors = self.getErrors()
+        lines = []
+        if(seconds):
+            lines.append("Time: " + ", ".join(stage + " %.1fs" % seconds[stage] for stage in self._orderedStages(seconds)))
+        if(counters):
+            lines.append("Counts: " + ", ".join(name + " " + str(counters[name]) for name in sorted(counters)))
+        if(errors):
+            lines.append("Errors: " + ", ".join(cause + " " + str(errors[cause]) for cause in sorted(errors)))
+        lines.append("Elapsed: %.1fs" % (time.time() - self.started))
+        return "\n".join(lines)
+
+    # Write <baseFile>.json and <baseFile>.csv
+    def writeProfile(self, baseFile):
+        seconds = self.getSeconds()
+        calls = self.getCalls()
+        counters = self.getCounters()
+        errors = self.getErrors()
+        elapsed = time.time() - self.started
+
+        f = open(baseFile + ".json", "w")
+        try:
+            f.write(json.dumps({"elapsed": elapsed, "seconds": seconds, "calls": calls, "counters": counters, "errors": errors},
+                               indent=2, sort_keys=True))
+        finally:
+            f.close()
+
+        f = open(baseFile + ".csv", "w")
+        try:
+            f.write("type;name;calls;seconds;value\n")
+            for stage in self._orderedStages(seconds):
+                f.write("stage;%s;%d;%.6f;\n" % (stage, calls.get(stage, 0), seconds[stage]))
+            for name in sorted(counters):
+                f.write("counter;%s;;;%d\n" % (name, counters[name]))
+            for cause in sorted(errors):
+                f.write("error;%s;;;%d\n" % (cause.replace(";", ","), errors[cause]))
+            f.write("elapsed;;;%.6f;\n" % elapsed)
+        finally:
+            f.close()
+
+    # Write state ("running" or "complete"), counters and extra values to
+    # statusFile (JSON). The file is written next to it and renamed, so a
+    # reader never gets half a file.
+    def writeStatus(self, statusFile, state, extra=None):
+        status = {"state": state, "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+                  "elapsed": round(time.time() - self.started, 1),
+                  "counters": self.getCounters(), "errors": sum(self.getErrors().values())}
+        if(extra):
+            status.update(extra)
+
+        temporaryFile = statusFile + ".tmp"
+        f = open(temporaryFile, "w")
+        try:
+            f.write(json.dumps(status, indent=2, sort_keys=True))
+        finally:
+            f.close()
+        try:
+            os.rename(temporaryFile, statusFile)
+        except OSError:
+            # Windows does not rename over an existing file
+            os.remove(statusFile)
+            os.rename(temporaryFile, statusFile)
@@ -0,0 +1,92 @@
+# File: exportWorkers.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Pool of writer threads that copy files out of the image, so process() only
+# has to put a copy job on a queue and the ingest thread can go on with the
+# next file. The queue is bounded: when the writers can not keep up, submit()
+# blocks the ingest thread until there is room again (backpressure).
+#
+# With numberOfThreads = 0 the jobs are run directly in the calling thread,
+# the same way the modules used to write files. Jobs submitted by a writer
+# thread (a duplicate copied after its first copy) run in that thread: a
+# writer waiting for room in the queue would wait for itself.
+
+import sys
+import threading
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+
+# Export Worker Pool ---------------------------------------------------------------------------------------------------------
+class ExportWorkerPool(object):
+
+    # Number of failures kept with description and error (all are counted)
+    maxFailuresKept = 100
+
+    def __init__(self, name, numberOfThreads, queueSize):
+        self.name = name
+        self.numberOfThreads = numberOfThreads
+        self.countJobs = 0
+        self.countFailures = 0
+        self.failures = []
+        self._queue = queue.Queue(max(queueSize, 1))
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # Start writer threads
+    def start(self):
+        for number in range(self.numberOfThreads):
+            thread = threading.Thread(target=self._work, name=self.name + " writer " + str(number + 1))
+            thread.setDaemon(True)
+            thread.start()
+            self._threads.append(thread)
+
+    # Queue a job. Description is used when reporting failures. Blocks when
+    # the queue is full.
+    def submit(self, description, function, *args):
+        if(not self._threads or threading.currentThread() in self._threads):
+            self._run(description, function, args)
+            return
+        self._queue.put((description, function, args))
+
+    # Wait for the queue to empty and stop writer threads. Returns the
+    # number of failed jobs.
+    def close(self):
+        if(self._threads):
+            for thread in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        return self.countFailures
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if(job is None):
+                return
+            description, function, args = job
+            self._run(description, function, args)
+
+    def _run(self, description, function, args):
+        try:
+            function(*args)
+            error = None
+        except:
+            error = sys.exc_info()[1]
+
+        self._lock.acquire()
+        try:
+            self.countJobs = self.countJobs + 1
+            if(error is not None):
+                self.countFailures = self.countFailures + 1
+                if(len(self.failures) < self.maxFailuresKept):
+                    self.failures.append((description, str(error)))
+        finally:
+            self._lock.release()
@@ -0,0 +1,221 @@
+# File: exportWrite.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# The write path of the export modules. Each ingest thread has an
+# ExportWriter for the session of its job, and the export writer threads call
+# it for every file:
+#
+# - The size of the file is reserved on the export disk first (see
+#   exportSpace.py), which waits while the disk is below minFreeBytes.
+# - The file is then copied straight from a raw image (see exportZeroCopy.py)
+#   when no hash has to be computed, else in chunks with the hashes and the
+#   media header on the way (see exportCopy.py), else with
+#   ContentUtils.writeToFile. In archive mode it is an entry of the current
+#   container (see exportArchive.py).
+# - A copy that fails is counted and logged, the partial file is removed and
+#   a full disk stops the export. The dedup index (see exportDedup.py) is told
+#   whether the first copy of an MD5 was written, so the duplicates waiting
+#   for it are linked or written from the image.
+#
+# The settings are read from the factory of the module (moduleName,
+# inlineHashes, streamCopyBytes, copyChunkBytes, sparseCopy). The module adds
+# the written file to its manifest (and XML). Autopsy classes are imported
+# when they are used, so the scripts in Benchmarks can load this file.
+
+import os
+import sys
+import time
+
+from ExportCommon.exportCopy import CopyCancelled
+from ExportCommon.exportCopy import CopyResult
+from ExportCommon.exportCopy import copyContent
+from ExportCommon.exportCopy import digestsNeeded
+from ExportCommon.exportSpace import NoSpaceLeft
+from ExportCommon.exportSpace import isNoSpace
+from ExportCommon.exportSpace import removePartial
+
+try:
+    from java.util.logging import Level
+except ImportError:
+    Level = None
+
+
+# Space event ----------------------------------------------------------------------------------------------------------------
+# notify(stopped, message) for ExportSpace: the export paused, continues or
+# stopped for disk space, to the log and the ingest inbox
+def spaceEvent(moduleName, log):
+    def notify(stopped, message):
+        from org.sleuthkit.autopsy.ingest import IngestMessage
+        from org.sleuthkit.autopsy.ingest import IngestServices
+        log(Level.SEVERE if stopped else Level.WARNING, "%s", message)
+        messageType = IngestMessage.MessageType.ERROR if stopped else IngestMessage.MessageType.WARNING
+        IngestServices.getInstance().postMessage(IngestMessage.createMessage(messageType, moduleName, message))
+    return notify
+
+
+# Export Writer --------------------------------------------------------------------------------------------------------------
+class ExportWriter(object):
+
+    def __init__(self, session, settings, log, isCancelled=None):
+        # Session of the job (stats, space, zeroCopy, dedupIndex, archive)
+        # and factory of the module
+        self.session = session
+        self.settings = settings
+        self.log = log
+
+        # Large copies stop when the job is cancelled, and report progress
+        # every few seconds (the data source module shows it in its progress bar)
+        self.isCancelled = isCancelled
+        self.reportProgress = self.logProgress
+
+    # Hashes to compute while writing a file with this MD5 (None = no MD5)
+    def getAlgorithms(self, md5):
+        return digestsNeeded(self.settings.inlineHashes, md5)
+
+    # Write file to extractedFile (runs in an export writer thread). Returns
+    # the path written (in archive mode the entry in its container) and the
+    # CopyResult, or (None, None) if there was no space or the copy was
+    # cancelled. Other errors are counted, logged and raised. headBytes of
+    # the file are kept in the result for the media probe.
+    def writeFile(self, file, extractedFile, md5, algorithms, headBytes=0):
+        stats = self.session.stats
+        dedupIndex = self.session.dedupIndex
+        archive = self.session.archive
+        progress = lambda done, size: self.reportProgress(file.getName(), done, size)
+        result = None
+        try:
+            # Waits while the disk is below minFreeBytes
+            self.session.space.reserve(file.getSize(), self.isCancelled)
+
+            start = time.time()
+            if(archive is not None):
+                # Entry in the current archive container
+                container, result = archive.add(extractedFile, file, algorithms, self.settings.copyChunkBytes, self.isCancelled, progress)
+                extractedFile = os.path.join(container, extractedFile)
+                stats.count("copyArchive")
+            else:
+                if(not algorithms):
+                    result = self.copyZeroCopy(file, extractedFile, headBytes)
+                if(result is not None):
+                    stats.count("copyZeroCopy")
+                elif(algorithms or headBytes or file.getSize() >= self.settings.streamCopyBytes):
+                    # One read of the file for the copy, the hashes and the media header, in chunks
+                    result = copyContent(file, extractedFile, algorithms, self.settings.copyChunkBytes, self.isCancelled,
+                                         progress, self.settings.sparseCopy, headBytes)
+                    stats.count("bytesSparse", result.sparseBytes)
+                    stats.count("copyStream")
+                else:
+                    from java.io import File
+                    from org.sleuthkit.autopsy.datamodel import ContentUtils
+                    ContentUtils.writeToFile(file, File(extractedFile))
+                    result = CopyResult(file.getSize(), {}, 0)
+                    stats.count("copyContentUtils")
+            stats.addTime("write", start)
+        except NoSpaceLeft:
+            # Not written, and neither are the duplicates waiting for this
+            # copy (they are counted when they find the export stopped)
+            stats.count("skippedNoSpace")
+            if(dedupIndex is not None):
+                dedupIndex.fileFailed(md5)
+            return None, None
+        except CopyCancelled:
+            stats.count("copiesCancelled")
+            self.log(Level.INFO, "Copy of %s cancelled", file.getName())
+            return None, None
+        except:
+            error = sys.exc_info()[1]
+            stats.countError("write", error)
+            self.log(Level.SEVERE, "Error writing File %s to %s", file.getName(), extractedFile)
+
+            # Only whole files stay in the export, an archive container
+            # removes a broken entry itself
+            if(archive is None and removePartial(extractedFile)):
+                stats.count("partialFilesRemoved")
+
+            # The disk is full: no more files are written
+            if(isNoSpace(error)):
+                self.session.space.diskFull(error)
+
+            # Duplicates that were waiting for this copy are written from the image
+            if(dedupIndex is not None):
+                dedupIndex.fileFailed(md5)
+            raise
+
+        stats.count("bytesCopied", file.getSize())
+
+        # Link duplicates that were waiting for this copy
+        if(dedupIndex is not None):
+            dedupIndex.fileWritten(md5)
+
+        # MD5 computed while writing
+        if(not md5 and result.digests.get("md5")):
+            if(dedupIndex is not None):
+                dedupIndex.addWritten(result.digests["md5"], extractedFile)
+            stats.count("hashedInline")
+        return extractedFile, result
+
+    # Copy straight from a raw image. Returns the CopyResult, or None if the
+    # file has to be copied the normal way (the reason is counted).
+    def copyZeroCopy(self, file, extractedFile, headBytes=0):
+        if(self.session.zeroCopy is None):
+            return None
+        result, reason = self.session.zeroCopy.copy(file, extractedFile, headBytes, self.isCancelled)
+        if(reason is not None):
+            self.session.count(reason)
+        return result
+
+    # Copy the first copy to a duplicate that could not be hardlinked (runs
+    # in an export writer thread). Returns False if there was no space or
+    # the copy was cancelled, other errors are raised.
+    def copyDuplicate(self, source, size, extractedFile):
+        stats = self.session.stats
+        try:
+            self.session.space.reserve(size, self.isCancelled)
+            self.session.dedupIndex.copyFile(source, extractedFile)
+        except NoSpaceLeft:
+            stats.count("skippedNoSpace")
+            return False
+        except CopyCancelled:
+            stats.count("copiesCancelled")
+            return False
+        except:
+            error = sys.exc_info()[1]
+            stats.countError("write", error)
+            self.log(Level.SEVERE, "Error copying %s to %s", source, extractedFile)
+            if(removePartial(extractedFile)):
+                stats.count("partialFilesRemoved")
+            if(isNoSpace(error)):
+                self.session.space.diskFull(error)
+            raise
+        stats.count("bytesCopied", size)
+        return True
+
+    # Progress of a large copy (every few seconds)
+    def logProgress(self, name, done, size):
+        self.log(Level.INFO, "Copying %s: %d of %d MB", name, done // 1048576, size // 1048576)
+
+    # Index artifacts for keyword search and fire one event for the batch
+    def postArtifacts(self, artifacts):
+        from java.util import ArrayList
+        from org.sleuthkit.datamodel import BlackboardArtifact
+        from org.sleuthkit.autopsy.casemodule import Case
+        from org.sleuthkit.autopsy.casemodule.services import Blackboard
+        from org.sleuthkit.autopsy.ingest import IngestServices
+        from org.sleuthkit.autopsy.ingest import ModuleDataEvent
+        blackboard = Case.getCurrentCase().getServices().getBlackboard()
+        stats = self.session.stats
+        for art in artifacts:
+            try:
+                start = time.time()
+                blackboard.indexArtifact(art)
+                stats.addTime("index", start)
+            except Blackboard.BlackboardException as e:
+                stats.countError("index", e)
+                self.log(Level.SEVERE, "Error indexing artifact %s", art.getDisplayName())
+
+        # UI
+        IngestServices.getInstance().fireModuleDataEvent(ModuleDataEvent(self.settings.moduleName, BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT, ArrayList(artifacts)))
@@ -0,0 +1,254 @@
+# File: exportZeroCopy.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Copies files in raw images (.001/.dd, single or split) that are stored on a
+# local disk straight from the image file to the export directory, instead of
+# reading them through Sleuth Kit and Java stream buffers:
+#
+# - file.getRanges() gives the byte ranges of the file in the image (the
+#   runs in tsk_file_layout). Fragmented files are copied range by range.
+# - The ranges must cover the file size. Sparse and compressed files (NTFS)
+#   have fewer bytes in the image than their size, resident files and
+#   derived files have no ranges: they are copied the normal way.
+# - The first and last bytes of the file are read through Sleuth Kit and
+#   compared with the same bytes of the image file, so files Sleuth Kit
+#   decrypts or decodes (BitLocker, pool volumes) are never copied raw.
+# - Under Jython each range is copied with FileChannel.transferTo, so the
+#   kernel moves the data without it passing through Java buffers. Under
+#   CPython (benchmark) os.sendfile is used where there is one, else a
+#   read/write loop.
+#
+# The image files of each data source are looked up once per job.
+#
+#   result, reason = zeroCopy.copy(file, extractedFile)
+#   result: CopyResult, or None (copy the file the normal way, reason is the
+#   counter to add, for example "zeroCopySparse", None for small files)
+
+import os
+import threading
+
+from ExportCommon.exportCopy import CopyCancelled
+from ExportCommon.exportCopy import CopyResult
+from ExportCommon.exportCopy import readBytes
+from ExportCommon.exportPaths import dataSourceKey
+
+# Java channels under Jython
+try:
+    from java.io import FileOutputStream
+    from java.io import RandomAccessFile
+except ImportError:
+    FileOutputStream = None
+    RandomAccessFile = None
+
+
+# Bytes moved per transferTo call (between cancel checks)
+transferBytes = 64 * 1024 * 1024
+
+# Bytes compared at the start and the end of the file
+verifyBytes = 4096
+
+
+# Segments of a raw image as (path, offset in the image, size), None if the
+# data source is not a raw image on a local disk
+def rawImageSegments(dataSource):
+    getPaths = getattr(dataSource, "getPaths", None)
+    if(getPaths is None or "RAW" not in str(dataSource.getType()).upper()):
+        return None
+    segments = []
+    offset = 0
+    for path in getPaths():
+        path = str(path)
+        if(path.startswith("\\\\") or not os.path.isfile(path)):
+            # Network share or not there
+            return None
+        size = os.path.getsize(path)
+        segments.append((path, offset, size))
+        offset = offset + size
+    return segments or None
+
+
+# Pieces (path, offset in the segment, length) of length bytes at offset in the image
+def segmentPieces(segments, offset, length):
+    pieces = []
+    for path, start, size in segments:
+        if(length <= 0):
+            break
+        if(offset >= start + size):
+            continue
+        pieceLength = min(length, start + size - offset)
+        pieces.append((path, offset - start, pieceLength))
+        offset = offset + pieceLength
+        length = length - pieceLength
+    if(length > 0):
+        raise ValueError("Range after the end of the image")
+    return pieces
+
+
+# Bytes of the image at the pieces
+def readPieces(pieces):
+    data = []
+    for path, offset, length in pieces:
+        f = open(path, "rb")
+        try:
+            f.seek(offset)
+            data.append(f.read(length))
+        finally:
+            f.close()
+    return b"".join(data)
+
+
+# Copy with FileChannel.transferTo (Jython)
+def _transferJava(pieces, extractedFile, isCancelled):
+    out = FileOutputStream(extractedFile)
+    try:
+        channel = out.getChannel()
+        for path, offset, length in pieces:
+            source = RandomAccessFile(path, "r")
+            try:
+                sourceChannel = source.getChannel()
+                while(length > 0):
+                    if(isCancelled is not None and isCancelled()):
+                        raise CopyCancelled(extractedFile)
+                    moved = sourceChannel.transferTo(offset, min(length, transferBytes), channel)
+                    if(moved <= 0):
+                        raise IOError("transferTo stopped at %d in %s" % (offset, path))
+                    offset = offset + moved
+                    length = length - moved
+            finally:
+                source.close()
+    finally:
+        out.close()
+
+
+# Copy with os.sendfile, or read and write (CPython)
+def _transferPython(pieces, extractedFile, isCancelled):
+    sendfile = getattr(os, "sendfile", None)
+    out = open(extractedFile, "wb")
+    try:
+        for path, offset, length in pieces:
+            source = open(path, "rb")
+            try:
+                while(length > 0):
+                    if(isCancelled is not None and isCancelled()):
+                        raise CopyCancelled(extractedFile)
+                    if(sendfile is not None):
+                        moved = sendfile(out.fileno(), source.fileno(), offset, min(length, transferBytes))
+                    else:
+                        source.seek(offset)
+                        data = source.read(min(length, transferBytes))
+                        out.write(data)
+                        moved = len(data)
+                    if(moved <= 0):
+                        raise IOError("Copy stopped at %d in %s" % (offset, path))
+                    offset = offset + moved
+                    length = length - moved
+            finally:
+                source.close()
+    finally:
+        out.close()
+
+
+# Zero Copy ------------------------------------------------------------------------------------------------------------------
+class ZeroCopy(object):
+
+    # minBytes: smaller files are not looked at (getRanges is a query)
+    def __init__(self, minBytes=0):
+        self.minBytes = minBytes
+        self._lock = threading.Lock()
+        self._segments = {}
+
+    # Image segments of the data source of file (looked up once)
+    def getSegments(self, file):
+        key = dataSourceKey(file)
+        if(key in self._segments):
+            return self._segments[key]
+        try:
+            segments = rawImageSegments(file.getDataSource())
+        except:
+            segments = None
+        self._lock.acquire()
+        try:
+            self._segments[key] = segments
+        finally:
+            self._lock.release()
+        return segments
+
+    # Pieces of the image the file is in, or (None, reason)
+    def getPieces(self, file, size):
+        segments = self.getSegments(file)
+        if(segments is None):
+            return None, "zeroCopyNotRawImage"
+        try:
+            ranges = sorted(file.getRanges(), key=lambda fileRange: fileRange.getSequence())
+        except:
+            ranges = []
+        if(not ranges):
+            return None, "zeroCopyNoRanges"
+        pieces = []
+        left = size
+        for fileRange in ranges:
+            if(left <= 0):
+                break
+            length = min(fileRange.getByteLen(), left)
+            pieces.extend(segmentPieces(segments, fileRange.getByteStart(), length))
+            left = left - length
+        if(left > 0):
+            return None, "zeroCopySparse"
+        return pieces, None
+
+    # Copy file to extractedFile from the image file. headBytes: first bytes
+    # of the file to keep in the result (media probe). Returns (CopyResult or
+    # None, reason or None).
+    def copy(self, file, extractedFile, headBytes=0, isCancelled=None):
+        size = file.getSize()
+        if(size < self.minBytes or size <= 0):
+            return None, None
+        try:
+            pieces, reason = self.getPieces(file, size)
+            if(pieces is None):
+                return None, reason
+
+            # Same bytes through Sleuth Kit and in the image file
+            head = readBytes(file, 0, min(max(headBytes, verifyBytes), size))
+            tailLength = min(verifyBytes, size)
+            tail = readBytes(file, size - tailLength, tailLength)
+            if(head[:verifyBytes] != readPieces(self.slice(pieces, 0, min(verifyBytes, size))) or
+               tail != readPieces(self.slice(pieces, size - tailLength, tailLength))):
+                return None, "zeroCopyMismatch"
+        except:
+            return None, "zeroCopyFailed"
+
+        try:
+            if(RandomAccessFile is not None):
+                _transferJava(pieces, extractedFile, isCancelled)
+            else:
+                _transferPython(pieces, extractedFile, isCancelled)
+        except CopyCancelled:
+            if(os.path.exists(extractedFile)):
+                os.remove(extractedFile)
+            raise
+        except:
+            # Copied the normal way instead
+            if(os.path.exists(extractedFile)):
+                os.remove(extractedFile)
+            return None, "zeroCopyFailed"
+        return CopyResult(size, {}, 0, head[:headBytes]), None
+
+    # Pieces for length bytes at offset in the file
+    def slice(self, pieces, offset, length):
+        result = []
+        for path, pieceOffset, pieceLength in pieces:
+            if(length <= 0):
+                break
+            if(offset >= pieceLength):
+                offset = offset - pieceLength
+                continue
+            part = min(pieceLength - offset, length)
+            result.append((path, pieceOffset + offset, part))
+            length = length - part
+            offset = 0
+        return result
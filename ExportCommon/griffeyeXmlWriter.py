@@ -0,0 +1,384 @@
+# File: griffeyeXmlWriter.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Streaming writer for the Griffeye XML files (<number><number>_images.xml and
+# <number><number>_movies.xml). The file is opened once, every <Image>/<Movie>
+# record is rendered from a precompiled template into one string, and the
+# records are kept in a buffer that is written out when it grows past
+# flushBytes or when flushSeconds has passed since the last write.
+#
+# One writer is shared by all ingest threads of a job (see exportSession.py),
+# so every method holds the writer lock.
+#
+# With maxRecords or maxBytes the records are written to shards instead of
+# one file: <number><number>_images_0001.xml, _0002.xml, .. Each shard is a
+# complete ReportIndex. When a shard is full it gets its footer and the next
+# one is started, so finished shards can be imported while the ingest is
+# still running. <number><number>_images_shards.txt lists the shards:
+#
+#   <shard file> TAB <records> TAB <bytes> TAB <complete or open>
+#
+# With snapshotSeconds or snapshotRecords the file on disk is kept closed
+# while the ingest runs: every write puts the new records where the footer
+# was and the footer after them (only the closing tag is rewritten, in the
+# same write). Buffered records are written every snapshotSeconds, every
+# snapshotRecords records and when flushBytes are buffered. Between writes the
+# file is a complete ReportIndex that Griffeye can import. getStatus() gives
+# the records and bytes on disk for the status file of the export.
+#
+# writeRecord(fields, written) calls written() when the record is on disk,
+# and flushed() is called after every write to disk. The export modules add a
+# file to the manifest from written() and flush the manifest from flushed(),
+# so the manifest never lists a file whose record was lost in a crash.
+#
+# The file is opened in binary mode and records are written as UTF-8 bytes
+# (the header of the file and of every shard declares utf-8), so the offsets used for the footer and when resuming are the same on
+# Windows (no \r\n translation).
+
+import os
+import threading
+import time
+
+
+# XML header and footer ------------------------------------------------------------------------------------------------------
+xmlHeader = ('<?xml version="1.0" encoding="utf-8"?>\n'
+             '	<ReportIndex version="2.0" source="Autopsy" dll="Autopsy To Griffeye 1.4">\n')
+
+xmlFooter = '	</ReportIndex>\n'
+
+
+# Text as the bytes written to the file
+def encodeXml(text):
+    if(isinstance(text, bytes)):
+        return text
+    return text.encode("utf-8")
+
+xmlHeaderBytes = encodeXml(xmlHeader)
+xmlFooterBytes = encodeXml(xmlFooter)
+
+
+# Record templates -----------------------------------------------------------------------------------------------------------
+imageTemplate = ("		<Image>\n"
+                 "			<path><![CDATA[%(path)s]]></path>\n"
+                 "			<picture>%(name)s</picture>\n"
+                 "			<category>0</category>\n"
+                 "			<id>%(id)s</id>\n"
+                 "			<fileoffset>0</fileoffset>\n"
+                 "			<fullpath><![CDATA[%(fullpath)s]]></fullpath>\n"
+                 "			<created>%(created)s</created>\n"
+                 "			<accessed>%(accessed)s</accessed>\n"
+                 "			<written>%(written)s</written>\n"
+                 "			<deleted>%(deleted)s</deleted>\n"
+                 "			<hash>%(hash)s</hash>\n"
+                 "			<encaseHash>0</encaseHash>\n"
+                 "			<myDescription>%(description)s</myDescription>\n"
+                 "			<physicalLocation>%(physicalLocation)s</physicalLocation>\n"
+                 "			<myUnique>0</myUnique>\n"
+                 "			<tagged>0</tagged>\n"
+                 "			<subCat></subCat>\n"
+                 "			<notes>%(notes)s</notes>\n"
+                 "			<fileSize>%(fileSize)s</fileSize>\n"
+                 "			<bitDepth>%(bitDepth)s</bitDepth>\n"
+                 "			<aspectRatio>%(aspectRatio)s</aspectRatio>\n"
+                 "		</Image>\n")
+
+movieTemplate = ("		<Movie>\n"
+                 "			<path><![CDATA[%(path)s]]></path>\n"
+                 "			<movie>%(name)s</movie>\n"
+                 "			<category>0</category>\n"
+                 "			<id>%(id)s</id>\n"
+                 "			<fileoffset>0</fileoffset>\n"
+                 "			<fullpath><![CDATA[%(fullpath)s]]></fullpath>\n"
+                 "			<created>%(created)s</created>\n"
+                 "			<accessed>%(accessed)s</accessed>\n"
+                 "			<written>%(written)s</written>\n"
+                 "			<deleted>%(deleted)s</deleted>\n"
+                 "			<hash>%(hash)s</hash>\n"
+                 "			<encaseHash>0</encaseHash>\n"
+                 "			<myDescription>%(description)s</myDescription>\n"
+                 "			<physicalLocation>%(physicalLocation)s</physicalLocation>\n"
+                 "			<myUnique>0</myUnique>\n"
+                 "			<tagged>0</tagged>\n"
+                 "			<subCat></subCat>\n"
+                 "			<notes>%(notes)s</notes>\n"
+                 "			<fileSize>%(fileSize)s</fileSize>\n"
+                 "		</Movie>\n")
+
+
+# Griffeye XML Writer --------------------------------------------------------------------------------------------------------
+class GriffeyeXmlWriter(object):
+
+    # Default flush thresholds
+    defaultFlushBytes = 256 * 1024
+    defaultFlushSeconds = 5.0
+
+    # Bytes read from the end of the file when resuming
+    tailBytes = 1024 * 1024
+
+    # maxRecords, maxBytes: size of a shard (0 = one file, no shards)
+    # snapshotSeconds, snapshotRecords: keep the file closed, write every
+    # snapshotSeconds or snapshotRecords records (0 and 0 = footer at close)
+    # flushed: called after every write to disk
+    def __init__(self, xmlFile, recordTemplate, flushBytes=None, flushSeconds=None, maxRecords=0, maxBytes=0,
+                 snapshotSeconds=0, snapshotRecords=0, flushed=None):
+        self.xmlFile = xmlFile
+        self.recordTemplate = recordTemplate
+        self.flushBytes = flushBytes or self.defaultFlushBytes
+        self.flushSeconds = snapshotSeconds or flushSeconds or self.defaultFlushSeconds
+        self.snapshotRecords = snapshotRecords
+        self.keepClosed = bool(snapshotSeconds or snapshotRecords)
+        self.flushed = flushed
+        self.countRecords = 0
+        self.countWritten = 0
+        self.maxRecords = maxRecords
+        self.maxBytes = maxBytes
+        self.baseFile = xmlFile
+        self.shards = []
+        self._shardRecords = 0
+        self._shardBytes = 0
+        self._file = None
+        self._footerAt = None
+        self._buffer = []
+        self._bufferSize = 0
+        self._written = []
+        self._lastFlush = time.time()
+        self._lock = threading.Lock()
+
+    # Open file and write XML header. With resume the records of an earlier
+    # run are kept: the closing tag (or a record cut off by a crash) is
+    # removed and new records are appended.
+    def open(self, resume=False):
+        if(self.isSharded()):
+            self._openShards(resume)
+            return
+        if(resume and self._truncateAfterLastRecord()):
+            self.countWritten = self._countRecords()
+            self._file = open(self.xmlFile, "ab")
+        else:
+            self._file = open(self.xmlFile, "wb")
+            self._file.write(xmlHeaderBytes)
+        self._flush()
+
+    def isSharded(self):
+        return bool(self.maxRecords or self.maxBytes)
+
+    # Shard file <base>_0001.xml for shard number 1
+    def getShardFile(self, number):
+        root, extension = os.path.splitext(self.baseFile)
+        return "%s_%04d%s" % (root, number, extension)
+
+    def getShardManifest(self):
+        return os.path.splitext(self.baseFile)[0] + "_shards.txt"
+
+    # Continue the last open shard of an earlier run (resume), or start the
+    # next one
+    def _openShards(self, resume):
+        self.shards = []
+        if(resume):
+            self._readShardManifest()
+        if(self.shards and self.shards[-1][3] == "open"):
+            name = self.shards.pop()[0]
+            self.xmlFile = os.path.join(os.path.dirname(self.baseFile), name)
+            if(self._truncateAfterLastRecord()):
+                self._shardRecords = self._countRecords()
+                self._shardBytes = os.path.getsize(self.xmlFile)
+                self.countWritten = sum(shard[1] for shard in self.shards) + self._shardRecords
+                self._file = open(self.xmlFile, "ab")
+                self._flush()
+                self._writeShardManifest()
+                return
+        self.countWritten = sum(shard[1] for shard in self.shards)
+        self._startShard()
+
+    # Start the next shard with the XML header
+    def _startShard(self):
+        self.xmlFile = self.getShardFile(len(self.shards) + 1)
+        self._file = open(self.xmlFile, "wb")
+        self._file.write(xmlHeaderBytes)
+        self._shardRecords = 0
+        self._shardBytes = len(xmlHeaderBytes)
+        self._flush()
+        self._writeShardManifest()
+
+    # Close the current shard with the XML footer
+    def _finishShard(self):
+        self._flush()
+        self._closeFile()
+        self.shards.append([os.path.basename(self.xmlFile), self._shardRecords, self._shardBytes + len(xmlFooterBytes), "complete"])
+
+    # Write the shard list, the current shard as open
+    def _writeShardManifest(self):
+        lines = ["%s\t%d\t%d\t%s\n" % tuple(shard) for shard in self.shards]
+        if(self._file is not None):
+            lines.append("%s\t%d\t%d\topen\n" % (os.path.basename(self.xmlFile), self._shardRecords, self._shardBytes))
+        f = open(self.getShardManifest(), "w")
+        try:
+            f.write("".join(lines))
+        finally:
+            f.close()
+
+    def _readShardManifest(self):
+        if(not os.path.exists(self.getShardManifest())):
+            return
+        f = open(self.getShardManifest(), "r")
+        try:
+            for line in f:
+                columns = line.rstrip("\n").split("\t")
+                if(len(columns) == 4):
+                    self.shards.append([columns[0], int(columns[1]), int(columns[2]), columns[3]])
+        finally:
+            f.close()
+
+    # Records in the current file (resume), read line by line
+    def _countRecords(self):
+        recordEnd = encodeXml(self.recordTemplate.rstrip().split("\n")[-1].strip())
+        count = 0
+        f = open(self.xmlFile, "rb")
+        try:
+            for line in f:
+                if(line.strip() == recordEnd):
+                    count = count + 1
+        finally:
+            f.close()
+        return count
+
+    # Cut the file after the last complete record (or the header). Returns
+    # False if the file does not exist or no record/header end was found.
+    def _truncateAfterLastRecord(self):
+        if(not os.path.exists(self.xmlFile)):
+            return False
+        recordEnd = self.recordTemplate.rstrip().split("\n")[-1].strip() + "\n"
+        headerEnd = xmlHeader.split("\n")[-2] + "\n"
+
+        f = open(self.xmlFile, "rb+")
+        try:
+            f.seek(0, 2)
+            size = f.tell()
+            start = max(0, size - self.tailBytes)
+            f.seek(start)
+            tail = f.read().decode("latin-1")
+
+            position = tail.rfind(recordEnd)
+            if(position >= 0):
+                position = position + len(recordEnd)
+            else:
+                position = tail.rfind(headerEnd)
+                if(position < 0):
+                    return False
+                position = position + len(headerEnd)
+
+            f.truncate(start + position)
+            return True
+        finally:
+            f.close()
+
+    # Render one record and add it to the buffer. Fields is a dict with the
+    # keys used in the record template. written() is called when the record
+    # is on disk.
+    def writeRecord(self, fields, written=None):
+        record = encodeXml(self.recordTemplate % fields)
+        self._lock.acquire()
+        try:
+            # Shard full: finish it and start the next one
+            if(self._shardRecords and ((self.maxRecords and self._shardRecords >= self.maxRecords) or
+                                       (self.maxBytes and self._shardBytes + len(record) + len(xmlFooterBytes) > self.maxBytes))):
+                self._finishShard()
+                self._startShard()
+            self._shardRecords = self._shardRecords + 1
+            self._shardBytes = self._shardBytes + len(record)
+
+            self._buffer.append(record)
+            self._bufferSize = self._bufferSize + len(record)
+            if(written is not None):
+                self._written.append(written)
+            self.countRecords = self.countRecords + 1
+
+            if(self._bufferSize >= self.flushBytes or time.time() - self._lastFlush >= self.flushSeconds or
+               (self.snapshotRecords and len(self._buffer) >= self.snapshotRecords)):
+                self._flush()
+        finally:
+            self._lock.release()
+
+    # Write buffered records to disk
+    def flush(self):
+        self._lock.acquire()
+        try:
+            self._flush()
+        finally:
+            self._lock.release()
+
+    def _flush(self):
+        if(self._buffer or (self.keepClosed and self._footerAt is None)):
+            data = b"".join(self._buffer)
+            if(self.keepClosed):
+                # Records where the footer was, then the footer again
+                if(self._footerAt is not None):
+                    self._file.seek(self._footerAt)
+                    self._file.truncate()
+                self._file.write(data + xmlFooterBytes)
+                self._file.flush()
+                self._footerAt = os.path.getsize(self.xmlFile) - len(xmlFooterBytes)
+            else:
+                self._file.write(data)
+            self.countWritten = self.countWritten + len(self._buffer)
+            self._buffer = []
+            self._bufferSize = 0
+            if(self.isSharded()):
+                self._writeShardManifest()
+        self._file.flush()
+        self._lastFlush = time.time()
+
+        # Records are on disk
+        written = self._written
+        self._written = []
+        for function in written:
+            function()
+        if(self.flushed is not None):
+            self.flushed()
+
+    # Write the footer (unless it is there) and close the file
+    def _closeFile(self):
+        try:
+            if(self._footerAt is None):
+                self._file.write(xmlFooterBytes)
+        finally:
+            self._file.close()
+            self._file = None
+            self._footerAt = None
+
+    # Records and bytes on disk, for the status file. The file is closed
+    # (a complete ReportIndex) when closed is True.
+    def getStatus(self):
+        self._lock.acquire()
+        try:
+            status = {"file": os.path.basename(self.xmlFile), "records": self.countWritten,
+                      "closed": self._file is None or self._footerAt is not None}
+            if(os.path.exists(self.xmlFile)):
+                status["bytes"] = os.path.getsize(self.xmlFile)
+            if(self.isSharded()):
+                status["shardsComplete"] = len(self.shards)
+                status["shardManifest"] = os.path.basename(self.getShardManifest())
+            return status
+        finally:
+            self._lock.release()
+
+    # Flush, write XML footer and close file
+    def close(self):
+        self._lock.acquire()
+        try:
+            if(self._file is None):
+                return
+            if(self.isSharded()):
+                self._finishShard()
+                self._writeShardManifest()
+                return
+            try:
+                self._flush()
+            finally:
+                self._closeFile()
+        finally:
+            self._lock.release()
@@ -0,0 +1,295 @@
+# File: mediaProbe.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# Reads width, height and bit depth of pictures and movies from their
+# headers, without decoding them, so the Griffeye XML can have bitDepth and
+# aspectRatio and Griffeye does not have to open every picture on import.
+#
+# - Pictures: JPEG (SOF), PNG (IHDR), GIF, BMP, TIFF (first IFD), WebP
+#   (VP8, VP8L, VP8X).
+# - Movies: MP4/QuickTime, width and height from the tkhd box of the first
+#   video track, codec and depth from its stsd box.
+#
+# The probe gets the first headBytes of the file, which the export copy
+# has read anyway (see copyContent). When a header is further into the
+# file (JPEG with a large EXIF block, MP4 with moov at the end) a few more
+# bytes are read with read(offset, length).
+#
+#   info = probeMedia(result.head, file.getSize(), read)
+#   info.width, info.height, info.bitDepth, info.getAspectRatio()
+
+import struct
+
+
+# Bytes of the start of the file given to the probe
+headBytes = 64 * 1024
+
+# Largest moov box read from a movie
+maxMovieHeaderBytes = 16 * 1024 * 1024
+
+
+# Result of probeMedia
+class MediaInfo(object):
+
+    __slots__ = ("width", "height", "bitDepth", "codec")
+
+    def __init__(self, width, height, bitDepth=None, codec=None):
+        self.width = width
+        self.height = height
+        self.bitDepth = bitDepth
+        self.codec = codec
+
+    # Width / height with two decimals, for example "1.33"
+    def getAspectRatio(self):
+        if(not self.width or not self.height):
+            return ""
+        return "%.2f" % (float(self.width) / self.height)
+
+    # For example "1920x1080" or "1920x1080 avc1"
+    def getDescription(self):
+        text = "%dx%d" % (self.width, self.height)
+        if(self.codec):
+            text = text + " " + self.codec
+        return text
+
+
+# Reads bytes of the file: the head, and read(offset, length) for the rest
+class _Source(object):
+
+    def __init__(self, head, size, read):
+        self.head = head
+        self.size = size
+        self.read = read
+
+    def get(self, offset, length):
+        if(offset + length <= len(self.head) or self.read is None):
+            return self.head[offset:offset + length]
+        if(offset >= self.size):
+            return b""
+        return self.read(offset, min(length, self.size - offset))
+
+
+# JPEG: walk the segments to the start of frame
+def _probeJpeg(source):
+    offset = 2
+    while(offset + 4 <= source.size):
+        segment = source.get(offset, 10)
+        if(len(segment) < 4 or segment[0:1] != b"\xff"):
+            return None
+        marker = ord(segment[1:2])
+        if(marker == 0xff):
+            # Fill byte
+            offset = offset + 1
+            continue
+        if(marker == 0x01 or 0xd0 <= marker <= 0xd7):
+            offset = offset + 2
+            continue
+        if(marker == 0xd9 or marker == 0xda):
+            # End of image or start of scan before a frame header
+            return None
+        length = struct.unpack(">H", segment[2:4])[0]
+        if(0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc)):
+            if(len(segment) < 10):
+                return None
+            precision, height, width, components = struct.unpack(">BHHB", segment[4:10])
+            return MediaInfo(width, height, precision * components)
+        offset = offset + 2 + length
+    return None
+
+
+# PNG: IHDR is the first chunk
+def _probePng(source):
+    header = source.get(16, 10)
+    if(len(header) < 10):
+        return None
+    width, height, depth, colorType = struct.unpack(">IIBB", header)
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(colorType, 1)
+    return MediaInfo(width, height, depth * channels)
+
+
+# GIF: logical screen descriptor
+def _probeGif(source):
+    header = source.get(6, 5)
+    if(len(header) < 5):
+        return None
+    width, height, packed = struct.unpack("<HHB", header)
+    bitDepth = 8
+    if(packed & 0x80):
+        bitDepth = (packed & 0x07) + 1
+    return MediaInfo(width, height, bitDepth)
+
+
+# BMP: BITMAPCOREHEADER or BITMAPINFOHEADER after the file header
+def _probeBmp(source):
+    header = source.get(14, 16)
+    if(len(header) < 12):
+        return None
+    headerSize = struct.unpack("<I", header[0:4])[0]
+    if(headerSize == 12):
+        width, height, planes, bitDepth = struct.unpack("<HHHH", header[4:12])
+    elif(len(header) >= 16):
+        width, height, planes, bitDepth = struct.unpack("<iiHH", header[4:16])
+    else:
+        return None
+    return MediaInfo(abs(width), abs(height), bitDepth)
+
+
+# TIFF: width, height, bits per sample and samples per pixel of the first IFD
+def _probeTiff(source):
+    order = "<" if source.get(0, 2) == b"II" else ">"
+    ifd = struct.unpack(order + "I", source.get(4, 4))[0]
+    countBytes = source.get(ifd, 2)
+    if(len(countBytes) < 2):
+        return None
+    count = struct.unpack(order + "H", countBytes)[0]
+    entries = source.get(ifd + 2, 12 * count)
+    tags = {}
+    for number in range(len(entries) // 12):
+        tag, fieldType, valueCount, value = struct.unpack(order + "HHI4s", entries[12 * number:12 * number + 12])
+        if(tag not in (0x100, 0x101, 0x102, 0x115)):
+            continue
+        if(fieldType == 3):
+            if(valueCount > 2):
+                # Values are stored at an offset, the first one is enough
+                value = source.get(struct.unpack(order + "I", value)[0], 2)
+            tags[tag] = struct.unpack(order + "H", value[0:2])[0]
+        elif(fieldType == 4):
+            tags[tag] = struct.unpack(order + "I", value)[0]
+    if(0x100 not in tags or 0x101 not in tags):
+        return None
+    return MediaInfo(tags[0x100], tags[0x101], tags.get(0x102, 1) * tags.get(0x115, 1))
+
+
+# WebP: lossy (VP8), lossless (VP8L) or extended (VP8X)
+def _probeWebp(source):
+    chunk = source.get(12, 18)
+    kind = chunk[0:4]
+    if(len(chunk) < (13 if kind == b"VP8L" else 18)):
+        return None
+    if(kind == b"VP8 "):
+        width, height = struct.unpack("<HH", chunk[14:18])
+        return MediaInfo(width & 0x3fff, height & 0x3fff, 24)
+    if(kind == b"VP8L"):
+        bits = struct.unpack("<I", chunk[9:13])[0]
+        alpha = (bits >> 28) & 1
+        return MediaInfo((bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1, 32 if alpha else 24)
+    if(kind == b"VP8X"):
+        flags = ord(chunk[8:9])
+        width = struct.unpack("<I", chunk[12:15] + b"\0")[0] + 1
+        height = struct.unpack("<I", chunk[15:18] + b"\0")[0] + 1
+        return MediaInfo(width, height, 32 if flags & 0x10 else 24)
+    return None
+
+
+# MP4/QuickTime boxes in data[start:end] as (type, data start, box end)
+def _boxes(data, start, end):
+    while(start + 8 <= end):
+        size, kind = struct.unpack(">I4s", data[start:start + 8])
+        headerSize = 8
+        if(size == 1):
+            if(start + 16 > end):
+                return
+            size = struct.unpack(">Q", data[start + 8:start + 16])[0]
+            headerSize = 16
+        elif(size == 0):
+            size = end - start
+        if(size < headerSize):
+            return
+        yield kind, start + headerSize, min(start + size, end)
+        start = start + size
+
+
+# MP4/QuickTime: find moov at the top level, then the first video track
+def _probeMovie(source):
+    offset = 0
+    moov = None
+    while(offset + 8 <= source.size):
+        header = source.get(offset, 16)
+        if(len(header) < 8):
+            return None
+        size, kind = struct.unpack(">I4s", header[0:8])
+        headerSize = 8
+        if(size == 1 and len(header) >= 16):
+            size = struct.unpack(">Q", header[8:16])[0]
+            headerSize = 16
+        elif(size == 0):
+            size = source.size - offset
+        if(size < 8):
+            return None
+        if(kind == b"moov"):
+            if(size > maxMovieHeaderBytes):
+                return None
+            moov = source.get(offset, size)
+            break
+        offset = offset + size
+    if(moov is None):
+        return None
+
+    for kind, start, end in _boxes(moov, headerSize, len(moov)):
+        if(kind != b"trak"):
+            continue
+        info = _probeTrack(moov, start, end)
+        if(info is not None):
+            return info
+    return None
+
+
+# Width and height from tkhd (16.16 fixed point, last 8 bytes), codec and
+# depth from the first sample description in mdia/minf/stbl/stsd
+def _probeTrack(moov, start, end):
+    width = height = 0
+    codec = None
+    bitDepth = None
+    for kind, boxStart, boxEnd in _boxes(moov, start, end):
+        if(kind == b"tkhd" and boxEnd - boxStart >= 8):
+            width, height = struct.unpack(">II", moov[boxEnd - 8:boxEnd])
+            width = width >> 16
+            height = height >> 16
+        elif(kind == b"mdia"):
+            for minf, minfStart, minfEnd in _boxes(moov, boxStart, boxEnd):
+                if(minf != b"minf"):
+                    continue
+                for stbl, stblStart, stblEnd in _boxes(moov, minfStart, minfEnd):
+                    if(stbl != b"stbl"):
+                        continue
+                    for stsd, stsdStart, stsdEnd in _boxes(moov, stblStart, stblEnd):
+                        # Version, flags and entry count, then the first entry
+                        entry = stsdStart + 8
+                        if(stsd == b"stsd" and entry + 84 <= stsdEnd):
+                            codec = moov[entry + 4:entry + 8].decode("latin-1")
+                            bitDepth = struct.unpack(">H", moov[entry + 82:entry + 84])[0]
+    if(not width or not height):
+        return None
+    return MediaInfo(width, height, bitDepth, codec)
+
+
+# Signature -> probe
+_probes = ((b"\xff\xd8", _probeJpeg),
+           (b"\x89PNG\r\n\x1a\n", _probePng),
+           (b"GIF8", _probeGif),
+           (b"BM", _probeBmp),
+           (b"II*\0", _probeTiff),
+           (b"MM\0*", _probeTiff))
+
+
+# Width, height and bit depth of a picture or movie as a MediaInfo, None if
+# the format is not known or the header is damaged.
+# head: first bytes of the file, size: size of the file, read(offset, length):
+# reads more of the file (None = only use head)
+def probeMedia(head, size, read=None):
+    source = _Source(head, size, read)
+    try:
+        for signature, probe in _probes:
+            if(head.startswith(signature)):
+                return probe(source)
+        if(head[0:4] == b"RIFF" and head[8:12] == b"WEBP"):
+            return _probeWebp(source)
+        if(head[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip")):
+            return _probeMovie(source)
+    except (struct.error, ValueError, IndexError):
+        return None
+    return None
@@ -0,0 +1,167 @@
+# File: exportProfiles.py
+# Version 1.0
+# Date 10:00 18.10.2026
+# Copyright (c) 2026 S. A. Ditlefsen
+# License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
+#
+# About:
+# This is a file-level ingest module that runs AutopsyToGriffeye,
+# ExportAllImagesVideoesAudio and ExportSystemFiles in one pass. Each file is
+# checked once against one rule table with the MIME types and file names of
+# all profiles, and the parent folder is looked up once (in the shared parent
+# path cache) and given to the profiles that want the file with
+# exportMatch(file, kind, parent). Use this module instead of enabling the
+# three modules one by one.
+#
+# Every profile keeps the session of its own module: one per job, shared by
+# the ingest threads, with the export folder, XML files, manifest, writer
+# threads, profile file and ingest message the module has when it runs alone.
+# The session of this module only has the time of the shared pass
+# (classify, known, uniquePath), in <number>_ExportProfiles_profile. A module
+# that is also enabled on its own gets the same session (same job), and the
+# files twice, so enable either this module or the three modules.
+#
+# The folders AutopsyToGriffeye, ExportAllImagesVideoesAudio, ExportSystemFiles
+# and ExportCommon have to be in the same python_modules folder as this one.
+
+
+from org.sleuthkit.datamodel import TskData
+from org.sleuthkit.autopsy.ingest import IngestModule
+from org.sleuthkit.autopsy.ingest import FileIngestModule
+from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
+from org.sleuthkit.autopsy.ingest import IngestMessage
+from org.sleuthkit.autopsy.ingest import IngestServices
+from org.sleuthkit.autopsy.coreutils import Logger
+from org.sleuthkit.autopsy.casemodule import Case
+
+import os
+import sys
+import time
+from java.util.logging import Level
+
+# Shared code in ExportCommon and the profile modules (placed next to this folder in python_modules)
+pythonModulesDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (pythonModulesDirectory,
+                  os.path.join(pythonModulesDirectory, "AutopsyToGriffeye"),
+                  os.path.join(pythonModulesDirectory, "ExportAllImagesVideoesAudio"),
+                  os.path.join(pythonModulesDirectory, "ExportSystemFiles")):
+    if(directory not in sys.path):
+        sys.path.append(directory)
+from ExportCommon.exportRules import ExportRules
+from ExportCommon.exportPaths import parentPathCache
+from ExportCommon.exportLog import ExportLogger
+from ExportCommon.exportSession import ExportSession
+from ExportCommon.exportSession import ExportSessionRegistry
+from AutopsyToGriffeye import AutopsyToGriffeye
+from exportAllImagesVideoesAudio import ExportAllImagesVideoesAudio
+from exportSystemFiles import ExportSystemFiles
+
+# Export Profiles Factory ---------------------------------------------------------------------------------------------------
+class ExportProfilesFactory(IngestModuleFactoryAdapter):
+
+    moduleName = "Export Profiles"
+
+    # Sessions with the time spent in the shared pass (classify, getUniquePath)
+    sessions = ExportSessionRegistry()
+
+    # Profile modules that can be run
+    profileClasses = {"AutopsyToGriffeye": AutopsyToGriffeye,
+                      "ExportAllImagesVideoesAudio": ExportAllImagesVideoesAudio,
+                      "ExportSystemFiles": ExportSystemFiles}
+
+    # Profiles to run
+    profiles = ["AutopsyToGriffeye", "ExportAllImagesVideoesAudio", "ExportSystemFiles"]
+
+    def getModuleDisplayName(self):
+        return self.moduleName
+
+    def getModuleDescription(self):
+        return "Runs AutopsyToGriffeye, Export All Images Videoes and Audio and Export System Files in one pass"
+
+    def getModuleVersionNumber(self):
+        return "1.0"
+
+    # Return true if module wants to get called for each file
+    def isFileIngestModuleFactory(self):
+        return True
+
+    # can return null if isFileIngestModuleFactory returns false
+    def createFileIngestModule(self, ingestOptions):
+        return ExportProfiles()
+
+# Export Profiles ----------------------------------------------------------------------------------------------------------
+class ExportProfiles(FileIngestModule):
+
+    _logger = ExportLogger(Logger.getLogger(ExportProfilesFactory.moduleName), Level.WARNING)
+
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
+
+    # Startup
+    def startUp(self, context):
+        # Start profiles and build one rule table for all of them
+        self.profiles = []
+        self.rules = ExportRules()
+        for name in ExportProfilesFactory.profiles:
+            profile = ExportProfilesFactory.profileClasses[name]()
+            profile.startUp(context)
+            profile.addRules(self.rules)
+            self.profiles.append(profile)
+        self.session = ExportProfilesFactory.sessions.acquire(context, ExportSession)
+        self.log(Level.INFO, "==> profiles=" + ", ".join(ExportProfilesFactory.profiles))
+
+        pass
+
+
+    # Process
+    def process(self, file):
+        # Skip non-files
+        if ((file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNALLOC_BLOCKS) or
+            (file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNUSED_BLOCKS) or
+            (file.isFile() == False)):
+            self.session.count("skippedNonFile")
+            return IngestModule.ProcessResult.OK
+
+        # Classify once
+        stats = self.session.stats
+        start = time.time()
+        matches = self.rules.classify(file.getMIMEType(), file.getName())
+        stats.addTime("classify", start)
+        if(not matches):
+            return IngestModule.ProcessResult.OK
+
+        # Known-good files, with the settings of each profile
+        start = time.time()
+        matches = [(profile, kind) for profile, kind in matches if not profile.skipKnown(file)]
+        stats.addTime("known", start)
+        if(not matches):
+            return IngestModule.ProcessResult.OK
+
+        # Give the file to every profile that wants it
+        start = time.time()
+        parent = parentPathCache.getParent(file)
+        stats.addTime("uniquePath", start)
+        for profile, kind in matches:
+            profile.exportMatch(file, kind, parent)
+
+        return IngestModule.ProcessResult.OK
+
+    # Shutdown
+    def shutDown(self):
+        for profile in self.profiles:
+            profile.shutDown()
+
+        # The last ingest thread reports the shared pass (the profiles report the rest)
+        if(not ExportProfilesFactory.sessions.release(self.session)):
+            return
+        case = Case.getCurrentCase()
+        profileFile = os.path.join(case.getExportDirectory(), str(case.getNumber()) + "_ExportProfiles_profile")
+        try:
+            self.session.stats.writeProfile(profileFile)
+        except:
+            self.log(Level.WARNING, "Could not write profile %s", profileFile)
+        self._logger.flush()
+        message = IngestMessage.createMessage(
+            IngestMessage.MessageType.DATA, ExportProfilesFactory.moduleName,
+                ", ".join(ExportProfilesFactory.profiles) + " done", self.session.stats.summary())
+        IngestServices.getInstance().postMessage(message)
@@ -3,7 +3,12 @@
 # Date 08:25 24.03.2020
 # Copyright (c) 2020 S. A. Ditlefsen
 # License: https://opensource.org/licenses/GPL-3.0 GNU General Public License version 3
-
+#
+# About:
+# Exports pagefile.sys, swapfile.sys and the registry hives SAM, SECURITY,
+# SOFTWARE and SYSTEM. Runs as a file ingest module, or with dataSourceMode as
+# a data source ingest module that asks the case database for the six names
+# instead of looking at every file in the image.
 
 
 from org.sleuthkit.datamodel import SleuthkitCase
@@ -15,6 +20,7 @@ from org.sleuthkit.datamodel import TskData
 from org.sleuthkit.autopsy.ingest import IngestModule
 from org.sleuthkit.autopsy.ingest.IngestModule import IngestModuleException
 from org.sleuthkit.autopsy.ingest import FileIngestModule
+from org.sleuthkit.autopsy.ingest import DataSourceIngestModule
 from org.sleuthkit.autopsy.ingest import IngestModuleFactoryAdapter
 from org.sleuthkit.autopsy.ingest import GenericIngestModuleJobSettings
 from org.sleuthkit.autopsy.ingest import IngestModuleIngestJobSettingsPanel
@@ -26,18 +32,99 @@ from org.sleuthkit.autopsy.coreutils import PlatformUtil
 from org.sleuthkit.autopsy.casemodule import Case
 from org.sleuthkit.autopsy.casemodule.services import Services
 from org.sleuthkit.autopsy.casemodule.services import FileManager
+from org.sleuthkit.autopsy.casemodule.services import Blackboard
 from org.sleuthkit.autopsy.datamodel import ContentUtils
 
 import os
+import sys
+import time
 from java.io import File
+from java.util import ArrayList
 from java.util.logging import Level
-import inspect
+
+# Shared code in ExportCommon (placed next to this folder in python_modules)
+pythonModulesDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if(pythonModulesDirectory not in sys.path):
+    sys.path.append(pythonModulesDirectory)
+from ExportCommon.exportSession import ExportSession
+from ExportCommon.exportSession import ExportSessionRegistry
+from ExportCommon.exportPaths import ExportPathMapper
+from ExportCommon.exportPaths import parentPathCache
+from ExportCommon.exportWorkers import ExportWorkerPool
+from ExportCommon.exportManifest import ExportManifest
+from ExportCommon.exportCopy import formatDigests
+from ExportCommon.exportZeroCopy import ZeroCopy
+from ExportCommon.exportSpace import ExportSpace
+from ExportCommon.exportSpace import NoSpaceLeft
+from ExportCommon.exportWrite import ExportWriter
+from ExportCommon.exportWrite import spaceEvent
+from ExportCommon.artifactBatcher import ArtifactBatcher
+from ExportCommon.exportRules import ExportRules
+from ExportCommon.exportLog import ExportLogger
+from ExportCommon.exportKnown import KnownFilter
+from ExportCommon.exportRules import systemFileNames
+from ExportCommon.exportRules import sqlWhere
 
 # Copy Multimedia Factory ---------------------------------------------------------------------------------------------------
 class ExportSystemFilesFactory(IngestModuleFactoryAdapter):
 
     moduleName = "Export System Files"
 
+    # Export sessions shared by all ingest threads of a job
+    sessions = ExportSessionRegistry()
+
+    # Threads writing exported files (0 = write in the ingest thread) and
+    # number of files that can wait for a writer before process() blocks
+    exportThreads = 4
+    exportQueueSize = 256
+
+    # Continue an earlier export: skip files listed in the manifest
+    # (False = start the export from scratch)
+    resumeExport = True
+
+    # Blackboard artifacts are indexed and announced to the UI in batches of
+    # artifactBatchSize, or every artifactBatchSeconds
+    artifactBatchSize = 100
+    artifactBatchSeconds = 5.0
+
+    # Hashes computed while copying, see exportWrite.py ([] = none)
+    inlineHashes = ["md5"]
+
+    # Skip files Hash Lookup has marked as known (NSRL) and files with an MD5
+    # in one of knownHashSetFiles (text files with one MD5 per line, or NSRL
+    # CSV), before any folder is made or anything is copied.
+    # Off by default: system files are wanted even when they are known
+    skipKnownFiles = False
+    knownHashSetFiles = []
+
+    # Export each data source (disk image, E01, logical file set, phone
+    # extraction) into its own folder named after the data source (False =
+    # all data sources into one tree)
+    dataSourceFolders = True
+
+    # Copy files of streamCopyBytes or more in chunks, runs of zeros as holes
+    streamCopyBytes = 64 * 1024 * 1024
+    copyChunkBytes = 8 * 1024 * 1024
+    sparseCopy = True
+
+    # Copy files of zeroCopyBytes or more straight from local raw images
+    zeroCopy = True
+    zeroCopyBytes = 1024 * 1024
+
+    # Free space to keep on the export disk, and seconds to wait for it
+    # before the export stops (0 = write until the disk is full)
+    minFreeBytes = 1024 * 1024 * 1024
+    spacePauseSeconds = 300
+
+    # Find the system files with one query per name and data source
+    # (FileManager.findFiles) instead of looking at every file
+    # (False = file ingest module)
+    dataSourceMode = False
+
+    # With dataSourceMode: folder a system file must be in, for example
+    # {"SAM": "Windows/System32/config"} (names not listed: any folder)
+    systemFileParentPaths = {}
+
     def getModuleDisplayName(self):
         return self.moduleName
 
@@ -49,34 +136,36 @@ class ExportSystemFilesFactory(IngestModuleFactoryAdapter):
 
     # Return true if module wants to get called for each file
     def isFileIngestModuleFactory(self):
-        return True
+        return not self.dataSourceMode
 
     # can return null if isFileIngestModuleFactory returns false
     def createFileIngestModule(self, ingestOptions):
         return ExportSystemFiles()
 
-# Copy Multimedia ----------------------------------------------------------------------------------------------------------
-class ExportSystemFiles(FileIngestModule):
+    # Return true if module wants to get called once for each data source
+    def isDataSourceIngestModuleFactory(self):
+        return self.dataSourceMode
 
-    _logger = Logger.getLogger(ExportSystemFilesFactory.moduleName)
+    # can return null if isDataSourceIngestModuleFactory returns false
+    def createDataSourceIngestModule(self, ingestOptions):
+        return ExportSystemFilesDataSource()
 
-    def log(self, level, msg):
-        self._logger.logp(level, self.__class__.__name__, inspect.stack()[1][3], msg)
+# Copy Multimedia Session --------------------------------------------------------------------------------------------------
+class ExportSystemFilesSession(ExportSession):
 
-    # Startup
-    def startUp(self, context):
-        self.filesFound = 0
+    _logger = ExportLogger(Logger.getLogger(ExportSystemFilesFactory.moduleName), Level.WARNING)
 
-        # List of system files we want to copy out
-        self.listOfFileNames = ['pagefile.sys','swapfile.sys', 'SAM', 'SECURITY', 'SOFTWARE',
-                                'SYSTEM']
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
 
+    # Open (first ingest thread of the job)
+    def open(self):
         # Export directory (C:\Users\user\Documents\cases\1568795\Autopsy\1568795_2020_5060_90_1_sofias_pc\Export)
         exportDirectory = Case.getCurrentCase().getExportDirectory()
         caseName = Case.getCurrentCase().getName()
         number = Case.getCurrentCase().getNumber()
 
-	# Export make C:\Users\user\Documents\cases\1568795\
+        # Export make C:\Users\user\Documents\cases\1568795\
         exportDirectory = exportDirectory.replace("\\Autopsy", "");
         exportDirectory = exportDirectory.replace("\\" + str(number), "");
         exportDirectory = exportDirectory.replace("\\Export", "");
@@ -86,7 +175,7 @@ class ExportSystemFiles(FileIngestModule):
         except:
                 pass
 
-	# Export make C:\Users\user\Documents\cases\1568795\System_files
+        # Export make C:\Users\user\Documents\cases\1568795\System_files
         exportDirectory = os.path.join(exportDirectory, "System_files")
         self.log(Level.INFO, "==> 2) exportDirectory=" + str(exportDirectory) + " number=" + str(number))
         try: 
@@ -94,7 +183,7 @@ class ExportSystemFiles(FileIngestModule):
         except:
                 pass
 
-	# Export make C:\Users\user\Documents\cases\1568795\System_files\1568795_2020_5060_90_1_sofias_pc
+        # Export make C:\Users\user\Documents\cases\1568795\System_files\1568795_2020_5060_90_1_sofias_pc
         exportDirectory = os.path.join(exportDirectory, number)
         self.log(Level.INFO, "==> 3) exportDirectory=" + str(exportDirectory) + " number=" + str(number))
         try: 
@@ -102,12 +191,106 @@ class ExportSystemFiles(FileIngestModule):
         except:
                 pass
 
+        # Manifest of exported files
+        self.manifest = ExportManifest(os.path.join(exportDirectory, str(number) + "_manifest.txt"))
+        self.manifest.open(ExportSystemFilesFactory.resumeExport)
+
+        # Free space on the disk of the export, and will the files in the
+        # case database fit (less what is exported already)
+        self.space = ExportSpace(exportDirectory, ExportSystemFilesFactory.minFreeBytes, ExportSystemFilesFactory.spacePauseSeconds,
+                                  spaceEvent(ExportSystemFilesFactory.moduleName, self.log))
+        try:
+            self.space.checkStart(Case.getCurrentCase().getSleuthkitCase(), sqlWhere(names=systemFileNames), self.context.getDataSource(),
+                                  sum(entry.size for entry in self.manifest.entries.values()))
+        except:
+            self.log(Level.WARNING, "Could not estimate the size of the export: %s", sys.exc_info()[1])
+
+        # Export paths, one folder per data source
+        self.pathMapper = ExportPathMapper(exportDirectory, ExportSystemFilesFactory.dataSourceFolders)
+
+        # Parent folder cache shared by the export modules (object ids are per case)
+        parentPathCache.useCase(Case.getCurrentCase().getCaseDirectory())
+        self.parentCacheStats = parentPathCache.getStats()
+
+        # Known-good files are skipped (hash sets are read once per job)
+        self.knownFilter = KnownFilter(TskData.FileKnown.KNOWN if ExportSystemFilesFactory.skipKnownFiles else None, ExportSystemFilesFactory.knownHashSetFiles)
+        for hashSetFile, error in self.knownFilter.load():
+            self.log(Level.WARNING, "Could not read known hash set %s: %s", hashSetFile, error)
+        if(self.knownFilter.hashSet.count):
+            self.log(Level.INFO, "==> %d hashes in known hash sets", self.knownFilter.hashSet.count)
+
+        # Export writer threads
+        self.exportPool = ExportWorkerPool(ExportSystemFilesFactory.moduleName, ExportSystemFilesFactory.exportThreads, ExportSystemFilesFactory.exportQueueSize)
+        self.exportPool.start()
+
+        # Copies straight from raw images (image files looked up once per job)
+        self.zeroCopy = None
+        if(ExportSystemFilesFactory.zeroCopy):
+            self.zeroCopy = ZeroCopy(ExportSystemFilesFactory.zeroCopyBytes)
+
+        # Pass parameter
+        self.exportDirectoryGlobal = exportDirectory;
+        self.profileFileGlobal = os.path.join(exportDirectory, str(number) + "_profile")
+
+    # Close (last ingest thread of the job)
+    def close(self):
+        # Wait for the export writers
+        self.exportPool.close()
+        self.manifest.close()
+
+        # Write profile of the job (time per stage, counters, errors)
+        for name, value in parentPathCache.getStatsSince(self.parentCacheStats).items():
+            self.count(name, value)
+        self.count("writeFailures", self.exportPool.countFailures)
+        self.count("bytesReserved", self.space.bytesReserved)
+        self.count("spacePauses", self.space.countPauses)
+        try:
+            self.stats.writeProfile(self.profileFileGlobal)
+        except:
+            self.log(Level.WARNING, "Could not write profile %s", self.profileFileGlobal)
+
+        # Log summaries of repeated errors
+        self._logger.flush()
 
-	# Pass parameter
-	self.exportDirectoryGlobal = exportDirectory;
+
+# Copy Multimedia ----------------------------------------------------------------------------------------------------------
+class ExportSystemFiles(FileIngestModule):
+
+    # Same logger as the session, so repeated errors are counted for the whole job
+    _logger = ExportSystemFilesSession._logger
+
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
+
+    # Startup
+    def startUp(self, context):
+        # System files
+        self.rules = ExportRules()
+        self.addRules(self.rules)
+
+        # Export session shared with the other ingest threads of this job
+        self.session = ExportSystemFilesFactory.sessions.acquire(context, ExportSystemFilesSession)
+
+        # Writes the files (large copies stop when the job is cancelled)
+        self.writer = ExportWriter(self.session, ExportSystemFilesFactory, self.log, context.fileIngestIsCancelled)
+
+        # Artifacts made by this ingest thread
+        self.artifacts = ArtifactBatcher(self.writer.postArtifacts, ExportSystemFilesFactory.artifactBatchSize, ExportSystemFilesFactory.artifactBatchSeconds)
 
         pass
 
+    # Add the files this module wants to the rule table (also used by Export Profiles)
+    def addRules(self, rules):
+        rules.addNames(systemFileNames, self, "System files")
+
+
+    # Skip a known-good file (counted as skippedKnown or skippedHashSet)
+    def skipKnown(self, file):
+        reason = self.session.knownFilter.check(file)
+        if(reason is None):
+            return False
+        self.session.count(reason)
+        return True
 
     # Process
     def process(self, file):
@@ -115,75 +298,178 @@ class ExportSystemFiles(FileIngestModule):
         if ((file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNALLOC_BLOCKS) or
             (file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNUSED_BLOCKS) or
             (file.isFile() == False)):
+            self.session.count("skippedNonFile")
+            return IngestModule.ProcessResult.OK
+
+        # System files
+        stats = self.session.stats
+        start = time.time()
+        matches = self.rules.classify(None, file.getName())
+        stats.addTime("classify", start)
+        if(not matches):
             return IngestModule.ProcessResult.OK
 
-        # Blackboard
-        blackboard = Case.getCurrentCase().getServices().getBlackboard()
-
-
-
-
-        # For an example, we will flag files with .txt in the name and make a blackboard artifact.
-        if(file.getName() in self.listOfFileNames):
-
-                # Recreate path
-                uniquePathFullLinux = file.getUniquePath();
-                
-                # Recreate path Windows
-                uniquePathFullWindows = uniquePathFullLinux.replace("/", "\\")
-                uniquePathFullWindows = uniquePathFullWindows[1:]
-                
-                fileName = os.path.basename(uniquePathFullWindows)
-                uniquePathWindows = uniquePathFullWindows.replace(fileName, "");
-		
-		# uniquePathWindows = img_1568795_2020_5060_90_1_sofias_pc.001\vol_vol3\ProgramData\Microsoft\Windows\SystemData\S-1-5-21-1960575443-3642755368-4161086620-1001\ReadOnly\LockScreen_W\
-		# Remove "img_1568795_2020_5060_90_1_sofias_pc.001\"
-                # self.log(Level.INFO, "==> 4) uniquePathWindows=" + str(uniquePathWindows))
-		replaceImgName = "img_" + str(Case.getCurrentCase().getNumber()) + ".001\\"
-                uniquePathWindows = uniquePathWindows.replace(replaceImgName, "");
-		
-
-                # Create directory
-                splitDir = uniquePathWindows.split("\\")
-                pathToCreate = os.path.join(self.exportDirectoryGlobal, "")
-                for directory in splitDir:
-                        directory = directory.replace(":", "")
-                        pathToCreate = os.path.join(pathToCreate, directory)
-                        # self.log(Level.INFO, "==> directory=" + str(directory) + " pathToCreate=" + str(pathToCreate))
-
-                        try: 
-                                os.mkdir(pathToCreate)
-                        except:
-                                pass
-
-                # Write file
-                try:
-                        extractedFile = os.path.join(pathToCreate, file.getName())
-                        ContentUtils.writeToFile(file, File(extractedFile))
-                except:
-                        self.log(Level.SEVERE, "Error writing File " + file.getName() + " to " + extractedFile)
-
-                # Make artifact on blackboard
-                art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
-                att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, ExportSystemFilesFactory.moduleName, "System files")
-                art.addAttribute(att)
-
-                # Index artifact
-                try:
-                        # index the artifact for keyword search
-                        blackboard.indexArtifact(art)
-                except Blackboard.BlackboardException as e:
-                        self.log(Level.SEVERE, "Error indexing artifact " + art.getDisplayName())
-
-                # UI
-                IngestServices.getInstance().fireModuleDataEvent(ModuleDataEvent(ExportSystemFilesFactory.moduleName, BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT, None))
+        # Known-good files
+        start = time.time()
+        skip = self.skipKnown(file)
+        stats.addTime("known", start)
+        if(skip):
+            return IngestModule.ProcessResult.OK
+
+        start = time.time()
+        parent = parentPathCache.getParent(file)
+        stats.addTime("uniquePath", start)
+        for profile, kind in matches:
+            self.exportMatch(file, kind, parent)
 
         return IngestModule.ProcessResult.OK
 
+    # Export a system file
+    def exportMatch(self, file, kind, parent):
+        # Skip files exported by an earlier run
+        if(self.session.manifest.contains(file.getId(), file.getSize(), file.getMd5Hash())):
+            self.session.count("skippedExported")
+            return
+
+        # Write file (the directory is created by the path mapper)
+        extractedFile = file.getName()
+        try:
+                if(self.session.space.stopped):
+                        raise NoSpaceLeft(self.session.space.message)
+                start = time.time()
+                extractedFile = self.session.pathMapper.getExportFileForParent(parent, file.getName())
+                self.session.stats.addTime("directory", start)
+                self.session.exportPool.submit(extractedFile, self.writeFile, file, extractedFile)
+        except NoSpaceLeft:
+                self.session.count("skippedNoSpace")
+        except:
+                self.session.stats.countError("directory", sys.exc_info()[1])
+                self.log(Level.SEVERE, "Error writing File %s to %s", file.getName(), extractedFile)
+
+        # Count
+        self.session.count("filesFound")
+
+        # Make artifact on blackboard
+        art = file.newArtifact(BlackboardArtifact.ARTIFACT_TYPE.TSK_INTERESTING_FILE_HIT)
+        att = BlackboardAttribute(BlackboardAttribute.ATTRIBUTE_TYPE.TSK_SET_NAME, ExportSystemFilesFactory.moduleName, kind)
+        art.addAttribute(att)
+
+        # Index artifact and update UI (in batches)
+        self.artifacts.add(art)
+
+    # Write file (runs in an export writer thread)
+    def writeFile(self, file, extractedFile):
+        md5 = file.getMd5Hash()
+        extractedFile, result = self.writer.writeFile(file, extractedFile, md5, self.writer.getAlgorithms(md5))
+        if(result is None):
+            return
+
+        # The MD5 is computed while writing when Hash Lookup has not given one
+        start = time.time()
+        self.session.manifest.add(file.getId(), file.getSize(), md5 or result.digests.get("md5"), extractedFile, formatDigests(result.digests))
+        self.session.stats.addTime("manifest", start)
+
     # Shutdown
     def shutDown(self):
-        # As a final part of this example, we'll send a message to the ingest inbox with the number of files found (in this thread)
+        # Post artifacts made by this ingest thread
+        self.artifacts.flush()
+
+        # Only the last ingest thread of the job reports
+        if(not ExportSystemFilesFactory.sessions.release(self.session)):
+            return
+
+        # As a final part, we'll send a message to the ingest inbox with the number of files found (in all threads)
+        messageType = IngestMessage.MessageType.DATA
+        spaceMessage = ""
+        if(self.session.space.stopped):
+            messageType = IngestMessage.MessageType.ERROR
+            spaceMessage = self.session.space.message + ", " + str(self.session.getCount("skippedNoSpace")) + " files not written. "
         message = IngestMessage.createMessage(
-            IngestMessage.MessageType.DATA, ExportSystemFilesFactory.moduleName,
-                str(self.filesFound) + " files found")
+            messageType, ExportSystemFilesFactory.moduleName,
+                spaceMessage + str(self.session.getCount("filesFound")) + " files found, " + str(self.session.exportPool.countFailures) + " could not be written, " + str(self.session.getCount("skippedExported")) + " exported before, " + str(self.session.getCount("skippedKnown") + self.session.getCount("skippedHashSet")) + " known skipped",
+                self.session.stats.summary())
         ingestServices = IngestServices.getInstance().postMessage(message)
+
+
+# Export System Files (data source) ----------------------------------------------------------------------------------------
+class ExportSystemFilesDataSource(DataSourceIngestModule):
+
+    _logger = ExportSystemFilesSession._logger
+
+    def log(self, level, msg, *args):
+        self._logger.log(level, msg, args, self.__class__.__name__)
+
+    # Startup
+    def startUp(self, context):
+        self.context = context
+
+        # Files are exported by the file ingest module
+        self.module = ExportSystemFiles()
+        self.module.startUp(context)
+        self.module.writer.isCancelled = context.dataSourceIngestIsCancelled
+
+        pass
+
+    # Process
+    def process(self, dataSource, progressBar):
+        stats = self.module.session.stats
+
+        # Query the system files
+        start = time.time()
+        fileManager = Case.getCurrentCase().getServices().getFileManager()
+        files = self.findSystemFiles(fileManager, dataSource)
+        stats.addTime("query", start)
+        self.log(Level.INFO, "==> %d system files in %s", len(files), dataSource.getName())
+
+        # Export them (written by the export writer threads, large copies
+        # show their progress in the progress bar text)
+        progressBar.switchToDeterminate(len(files))
+        self.module.writer.reportProgress = lambda name, done, size: progressBar.progress("Copying %s: %d of %d MB" % (name, done // 1048576, size // 1048576))
+        for number, file in enumerate(files):
+            if(self.context.dataSourceIngestIsCancelled()):
+                return IngestModule.ProcessResult.OK
+
+            start = time.time()
+            skip = self.module.skipKnown(file)
+            stats.addTime("known", start)
+            if(skip):
+                progressBar.progress(number + 1)
+                continue
+
+            start = time.time()
+            parent = parentPathCache.getParent(file)
+            stats.addTime("uniquePath", start)
+            self.module.exportMatch(file, "System files", parent)
+            progressBar.progress(number + 1)
+
+        return IngestModule.ProcessResult.OK
+
+    # Files named like a system file (any case), in the folder from
+    # systemFileParentPaths if the name is listed there
+    def findSystemFiles(self, fileManager, dataSource):
+        files = []
+        seen = set()
+        for name in sorted(systemFileNames):
+            parentPath = ExportSystemFilesFactory.systemFileParentPaths.get(name)
+            if(parentPath):
+                found = fileManager.findFiles(dataSource, name, parentPath)
+            else:
+                found = fileManager.findFiles(dataSource, name)
+
+            for file in found:
+                # findFiles uses LIKE, keep exact names only
+                if(file.getName().lower() != name.lower()):
+                    continue
+                if ((file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNALLOC_BLOCKS) or
+                    (file.getType() == TskData.TSK_DB_FILES_TYPE_ENUM.UNUSED_BLOCKS) or
+                    (file.isFile() == False)):
+                    continue
+                if(file.getId() in seen):
+                    continue
+                seen.add(file.getId())
+                files.append(file)
+        return files
+
+    # Shutdown
+    def shutDown(self):
+        self.module.shutDown()